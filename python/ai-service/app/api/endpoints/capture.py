@@ -0,0 +1,96 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form
+from typing import Optional
+
+from ...core.concurrency import ocr_limiter, speech_limiter
+from ...models.schemas import CaptureResponse
+from ...services.notes_client import NotesServiceError, get_notes_client
+from ...services.ocr_service import ocr_service
+from ...services.speech_to_text_service import speech_service
+from ...utils.uploads import ingest_upload
+from .ocr import IMAGE_EXTENSIONS
+from .speech_to_text import AUDIO_EXTENSIONS
+
+router = APIRouter()
+
+
+async def _save_text(notes, source, text, language, note_id, title, include_text):
+    text = text.strip()
+    if not text:
+        raise HTTPException(status_code=422, detail=f"No text found in the {source} capture")
+
+    try:
+        if note_id is not None:
+            note = await notes.append_to_note(note_id, text)
+        else:
+            default_title = "Voice memo" if source == "speech" else "Scanned text"
+            note = await notes.create_note(
+                title or f"{default_title} {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+                text
+            )
+    except NotesServiceError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    return CaptureResponse(
+        note_id=note["id"],
+        version=note.get("version"),
+        created=note_id is None,
+        source=source,
+        language=language,
+        text_length=len(text),
+        text=text if include_text else None
+    )
+
+
+@router.post("/audio", response_model=CaptureResponse)
+async def capture_audio(
+        audio_file: UploadFile = File(..., description="Audio file to transcribe into a note"),
+        language: Optional[str] = Form(None, description="Language code (e.g., 'en', 'es', 'fr')"),
+        note_id: Optional[int] = Form(None, description="Append to this note instead of creating one"),
+        title: Optional[str] = Form(None, description="Title of the new note"),
+        include_text: bool = Form(False, description="Also return the transcribed text"),
+        notes=Depends(get_notes_client)
+):
+
+    async with ingest_upload(audio_file, AUDIO_EXTENSIONS) as upload:
+        async with speech_limiter.slot():
+            try:
+                result = await speech_service.transcribe_audio(
+                    str(upload.path),
+                    language=language,
+                    audio_hash=upload.sha256
+                )
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+
+    # Saved after the speech slot is released: the backend is free for the
+    # next request while the note is written
+    return await _save_text(
+        notes, "speech", result["text"], result.get("language"), note_id, title, include_text
+    )
+
+
+@router.post("/image", response_model=CaptureResponse)
+async def capture_image(
+        image_file: UploadFile = File(..., description="Image file to extract text into a note"),
+        language: str = Form("eng", description="Language code (e.g., 'eng', 'spa', 'fra')"),
+        note_id: Optional[int] = Form(None, description="Append to this note instead of creating one"),
+        title: Optional[str] = Form(None, description="Title of the new note"),
+        include_text: bool = Form(False, description="Also return the extracted text"),
+        notes=Depends(get_notes_client)
+):
+
+    async with ingest_upload(image_file, IMAGE_EXTENSIONS) as upload:
+        async with ocr_limiter.slot():
+            try:
+                result = await ocr_service.extract_text(
+                    str(upload.path),
+                    language=language,
+                    detailed=False
+                )
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+
+    return await _save_text(
+        notes, "ocr", result["text"], language, note_id, title, include_text
+    )
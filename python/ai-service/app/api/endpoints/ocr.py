@@ -1,14 +1,15 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form
 from typing import Optional
-import os
-import tempfile
-from pathlib import Path
 
+from ...core.concurrency import ocr_limiter
 from ...models.schemas import OCRResponse, OCRDetailedResponse, ErrorResponse
 from ...services.ocr_service import ocr_service
+from ...utils.uploads import ingest_upload
 
 router = APIRouter()
 
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.gif'}
+
 
 @router.post("/extract-text", response_model=OCRResponse)
 async def extract_text_from_image(
@@ -16,51 +17,22 @@ async def extract_text_from_image(
         language: str = Form("eng", description="Language code (e.g., 'eng', 'spa', 'fra')")
 ):
 
-    # Validate file
-    if not image_file.filename:
-        raise HTTPException(status_code=400, detail="No file provided")
-
-    # Check file extension
-    allowed_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.gif'}
-    file_ext = Path(image_file.filename).suffix.lower()
-
-    if file_ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file format. Allowed formats: {', '.join(allowed_extensions)}"
-        )
-
-    # Save uploaded file temporarily
-    temp_file = None
-    try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-            content = await image_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-
-        # Extract text from image
-        result = await ocr_service.extract_text(
-            temp_file_path,
-            language=language,
-            detailed=False
-        )
-
-        return OCRResponse(
-            text=result["text"],
-            confidence=result.get("confidence")
-        )
+    async with ingest_upload(image_file, IMAGE_EXTENSIONS) as upload, ocr_limiter.slot():
+        try:
+            # Extract text from image
+            result = await ocr_service.extract_text(
+                str(upload.path),
+                language=language,
+                detailed=False
+            )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+            return OCRResponse(
+                text=result["text"],
+                confidence=result.get("confidence")
+            )
 
-    finally:
-        # Clean up temporary file
-        if temp_file:
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/extract-text-detailed", response_model=OCRDetailedResponse)
@@ -69,52 +41,23 @@ async def extract_text_from_image_detailed(
         language: str = Form("eng", description="Language code (e.g., 'eng', 'spa', 'fra')")
 ):
 
-    # Validate file
-    if not image_file.filename:
-        raise HTTPException(status_code=400, detail="No file provided")
-
-    # Check file extension
-    allowed_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.gif'}
-    file_ext = Path(image_file.filename).suffix.lower()
-
-    if file_ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file format. Allowed formats: {', '.join(allowed_extensions)}"
-        )
-
-    # Save uploaded file temporarily
-    temp_file = None
-    try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-            content = await image_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-
-        # Extract text from image with detailed information
-        result = await ocr_service.extract_text(
-            temp_file_path,
-            language=language,
-            detailed=True
-        )
-
-        return OCRDetailedResponse(
-            text=result["text"],
-            confidence=result.get("confidence"),
-            words=result.get("words", [])
-        )
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-    finally:
-        # Clean up temporary file
-        if temp_file:
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
+    async with ingest_upload(image_file, IMAGE_EXTENSIONS) as upload, ocr_limiter.slot():
+        try:
+            # Extract text from image with detailed information
+            result = await ocr_service.extract_text(
+                str(upload.path),
+                language=language,
+                detailed=True
+            )
+
+            return OCRDetailedResponse(
+                text=result["text"],
+                confidence=result.get("confidence"),
+                words=result.get("words", [])
+            )
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/languages")
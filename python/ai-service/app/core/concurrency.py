@@ -0,0 +1,193 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from .config import settings
+
+
+class ServiceBusy(Exception):
+    """Raised when a request cannot get a slot: the wait queue is full or its deadline passed."""
+
+    def __init__(self, service: str, detail: str, retry_after: int, status_code: int = 429):
+        super().__init__(detail)
+        self.service = service
+        self.detail = detail
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class ConcurrencyLimiter:
+    """Caps how many requests use one backend at a time, with a bounded FIFO wait queue.
+
+    Use as ``async with limiter.slot():`` around the backend call. At most
+    ``max_concurrency`` holders run at once; up to ``max_queue`` more wait,
+    each for at most ``queue_timeout`` seconds. Anything beyond that fails fast
+    with :class:`ServiceBusy` carrying a ``Retry-After`` estimate, so a burst
+    turns into quick 429s instead of every request slowing down together.
+    ``service`` is the ``ENABLED_SERVICES`` entry the limiter belongs to, if
+    it is not ``name``.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float,
+                 service: Optional[str] = None):
+        self.name = name
+        self.service = service or name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+
+        self._running = 0
+        self._waiters = deque()
+        self._service_time = None  # moving average of how long a slot is held
+
+        # Counters exposed on /metrics
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the queue length and recent service times."""
+        service_time = self._service_time or 1.0
+        ahead = self.waiting + 1
+        return max(1, math.ceil(service_time * ahead / self.max_concurrency))
+
+    async def acquire(self):
+        start = time.monotonic()
+        if self._running < self.max_concurrency and not self._waiters:
+            self._running += 1
+            self._admit(0.0)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise ServiceBusy(
+                self.name,
+                f"The {self.name} service is busy, try again later",
+                self.retry_after()
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise ServiceBusy(
+                    self.name,
+                    f"Timed out after {self.queue_timeout:g}s waiting for the {self.name} service",
+                    self.retry_after(),
+                    status_code=503
+                ) from None
+            raise
+
+        # release() handed its slot straight to us, so _running is unchanged
+        self._admit(time.monotonic() - start)
+
+    def release(self, held_for: Optional[float] = None):
+        if held_for is not None:
+            # Exponential moving average, weighted towards recent requests
+            if self._service_time is None:
+                self._service_time = held_for
+            else:
+                self._service_time = 0.8 * self._service_time + 0.2 * held_for
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._running -= 1
+
+    def _admit(self, waited: float):
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        acquired_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - acquired_at)
+
+    def stats(self) -> dict:
+        return {
+            "service": self.name,
+            "running": self._running,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+            "service_seconds_avg": round(self._service_time or 0.0, 6),
+        }
+
+
+def prometheus_metrics(limiters) -> str:
+    """Render limiter stats in the Prometheus text exposition format."""
+    metrics = (
+        ("ai_service_running", "gauge", "Requests currently using the backend", "running"),
+        ("ai_service_queue_depth", "gauge", "Requests waiting for a backend slot", "waiting"),
+        ("ai_service_max_concurrency", "gauge", "Configured backend concurrency", "max_concurrency"),
+        ("ai_service_max_queue", "gauge", "Configured wait queue length", "max_queue"),
+        ("ai_service_admitted_total", "counter", "Requests admitted to the backend", "admitted"),
+        ("ai_service_rejected_total", "counter", "Requests rejected with a full queue", "rejected"),
+        ("ai_service_queue_timeouts_total", "counter", "Requests that gave up waiting", "timed_out"),
+        ("ai_service_queue_wait_seconds_total", "counter", "Total time spent waiting", "wait_seconds_total"),
+        ("ai_service_queue_wait_seconds_max", "gauge", "Longest wait so far", "wait_seconds_max"),
+        ("ai_service_service_seconds_avg", "gauge", "Moving average time a slot is held", "service_seconds_avg"),
+    )
+    stats = [limiter.stats() for limiter in limiters]
+    lines = []
+    for name, kind, help_text, key in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for entry in stats:
+            lines.append(f'{name}{{service="{entry["service"]}"}} {entry[key]}')
+    return "\n".join(lines) + "\n"
+
+
+# Global instances, one per backend. Wrapped around the backend call in the
+# endpoints, after the upload has been received.
+speech_limiter = ConcurrencyLimiter(
+    "speech", settings.STT_MAX_CONCURRENCY, settings.STT_MAX_QUEUE, settings.STT_QUEUE_TIMEOUT
+)
+ocr_limiter = ConcurrencyLimiter(
+    "ocr", settings.OCR_MAX_CONCURRENCY, settings.OCR_MAX_QUEUE, settings.OCR_QUEUE_TIMEOUT
+)
+tts_limiter = ConcurrencyLimiter(
+    "tts", settings.TTS_MAX_CONCURRENCY, settings.TTS_MAX_QUEUE, settings.TTS_QUEUE_TIMEOUT
+)
+language_id_limiter = ConcurrencyLimiter(
+    "language-id", settings.LANGUAGE_ID_MAX_CONCURRENCY, settings.LANGUAGE_ID_MAX_QUEUE,
+    settings.LANGUAGE_ID_QUEUE_TIMEOUT, service="speech"
+)
+
+LIMITERS = (speech_limiter, ocr_limiter, tts_limiter, language_id_limiter)
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,10 +13,72 @@ class Settings:
     # File Upload Configuration
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
     OUTPUT_DIR: str = os.getenv("OUTPUT_DIR", "outputs")
-    MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB
+    MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", 50 * 1024 * 1024))  # 50MB
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+    # Multipart boundaries and form fields on top of the file itself
+    MAX_REQUEST_OVERHEAD: int = 64 * 1024
+
+    # Services this process serves: any of speech, ocr, tts, capture. Each
+    # one's router (and, on first use, its backend) is only imported if
+    # enabled, so an OCR-only pod never loads torch.
+    ENABLED_SERVICES: List[str] = [
+        name.strip() for name in os.getenv("ENABLED_SERVICES", "speech,ocr,tts,capture").split(",") if name.strip()
+    ]
+
+    # Export-service the capture endpoints save notes to, over a pooled
+    # client. "local" keeps notes in memory instead (tests, local runs).
+    NOTES_SERVICE_URL: str = os.getenv("NOTES_SERVICE_URL", "http://localhost:5000")
+    NOTES_SERVICE_TIMEOUT: float = float(os.getenv("NOTES_SERVICE_TIMEOUT", 10))
+    NOTES_SERVICE_MAX_CONNECTIONS: int = int(os.getenv("NOTES_SERVICE_MAX_CONNECTIONS", 20))
 
     # Whisper Configuration
     WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "base")  # tiny, base, small, medium, large
+    # Per-language model overrides for transcription, e.g. "en=base.en,es=small"
+    WHISPER_LANGUAGE_MODELS: Dict[str, str] = dict(
+        entry.strip().split("=", 1)
+        for entry in os.getenv("WHISPER_LANGUAGE_MODELS", "").split(",") if "=" in entry
+    )
+
+    # Language identification before transcription when no language is given:
+    # the smallest multilingual model on the first LANGUAGE_ID_SECONDS only.
+    # Below LANGUAGE_ID_MIN_PROBABILITY the transcription model decides itself.
+    LANGUAGE_ID_ENABLED: bool = os.getenv("LANGUAGE_ID_ENABLED", "true").lower() in ("1", "true", "yes")
+    LANGUAGE_ID_MODEL: str = os.getenv("LANGUAGE_ID_MODEL", "tiny")
+    LANGUAGE_ID_SECONDS: float = float(os.getenv("LANGUAGE_ID_SECONDS", 10))
+    LANGUAGE_ID_MIN_PROBABILITY: float = float(os.getenv("LANGUAGE_ID_MIN_PROBABILITY", 0.5))
+    LANGUAGE_ID_CACHE_SIZE: int = int(os.getenv("LANGUAGE_ID_CACHE_SIZE", 1024))
+
+    # Memory-map the weights from an fp32 checkpoint in WHISPER_SHARED_DIR so
+    # every uvicorn worker shares one copy through the page cache
+    WHISPER_SHARE_WEIGHTS: bool = os.getenv("WHISPER_SHARE_WEIGHTS", "false").lower() in ("1", "true", "yes")
+    WHISPER_SHARED_DIR: str = os.getenv("WHISPER_SHARED_DIR", "models")
+    # Load the model while the worker starts instead of on the first request
+    WHISPER_PRELOAD: bool = os.getenv("WHISPER_PRELOAD", "false").lower() in ("1", "true", "yes")
+
+    # Concurrency per backend. Requests beyond *_MAX_CONCURRENCY wait in a
+    # queue of *_MAX_QUEUE for up to *_QUEUE_TIMEOUT seconds, then get a 429/503
+    # with Retry-After. Whisper runs on one shared model per process, so speech
+    # defaults to one transcription at a time using every core.
+    CPU_COUNT: int = os.cpu_count() or 1
+    STT_MAX_CONCURRENCY: int = int(os.getenv("STT_MAX_CONCURRENCY", 1))
+    STT_MAX_QUEUE: int = int(os.getenv("STT_MAX_QUEUE", 8))
+    STT_QUEUE_TIMEOUT: float = float(os.getenv("STT_QUEUE_TIMEOUT", 60))
+    OCR_MAX_CONCURRENCY: int = int(os.getenv("OCR_MAX_CONCURRENCY", CPU_COUNT))
+    OCR_MAX_QUEUE: int = int(os.getenv("OCR_MAX_QUEUE", 32))
+    OCR_QUEUE_TIMEOUT: float = float(os.getenv("OCR_QUEUE_TIMEOUT", 30))
+    TTS_MAX_CONCURRENCY: int = int(os.getenv("TTS_MAX_CONCURRENCY", 8))
+    TTS_MAX_QUEUE: int = int(os.getenv("TTS_MAX_QUEUE", 32))
+    TTS_QUEUE_TIMEOUT: float = float(os.getenv("TTS_QUEUE_TIMEOUT", 30))
+    # /detect-language has its own queue, so short language checks do not wait
+    # behind full transcriptions; calls on the one language-ID model run one
+    # at a time anyway
+    LANGUAGE_ID_MAX_CONCURRENCY: int = int(os.getenv("LANGUAGE_ID_MAX_CONCURRENCY", 1))
+    LANGUAGE_ID_MAX_QUEUE: int = int(os.getenv("LANGUAGE_ID_MAX_QUEUE", 16))
+    LANGUAGE_ID_QUEUE_TIMEOUT: float = float(os.getenv("LANGUAGE_ID_QUEUE_TIMEOUT", 30))
+
+    # Threads per job, sized so the concurrent jobs together fill the CPU once
+    STT_THREADS: int = int(os.getenv("STT_THREADS", max(1, CPU_COUNT // STT_MAX_CONCURRENCY)))
+    OCR_THREADS: int = int(os.getenv("OCR_THREADS", max(1, CPU_COUNT // OCR_MAX_CONCURRENCY)))
 
     # Google Cloud Configuration
     GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -0,0 +1,75 @@
+import resource
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class StartupReport:
+    """Import timings and RSS growth for the pieces loaded at startup or on first use.
+
+    Printed once the app has started and exported on ``/metrics``, so cold-start
+    regressions (a heavy import creeping into a module every pod loads) show up
+    as numbers rather than as slower deploys.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.ready_seconds = None
+        self.entries: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def measure(self, name: str):
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.entries[name] = {
+                "seconds": round(time.perf_counter() - start, 4),
+                "rss_delta_mb": round((current_rss_mb() or 0) - (rss_before or 0), 1),
+            }
+
+    def mark_ready(self):
+        self.ready_seconds = round(time.perf_counter() - self.started_at, 4)
+
+    def summary(self) -> str:
+        lines = [f"Startup: ready in {self.ready_seconds}s, RSS {current_rss_mb()}MB"]
+        for name, entry in self.entries.items():
+            lines.append(f"  {name:<24} {entry['seconds']:>8.3f}s  {entry['rss_delta_mb']:+.1f}MB")
+        return "\n".join(lines)
+
+    def prometheus_metrics(self) -> str:
+        lines = [
+            "# HELP ai_service_startup_seconds Time from process import to app ready",
+            "# TYPE ai_service_startup_seconds gauge",
+            f"ai_service_startup_seconds {self.ready_seconds or 0}",
+            "# HELP ai_service_resident_memory_mb Resident set size of this process",
+            "# TYPE ai_service_resident_memory_mb gauge",
+            f"ai_service_resident_memory_mb {current_rss_mb()}",
+            "# HELP ai_service_import_seconds Time spent importing a component",
+            "# TYPE ai_service_import_seconds gauge",
+        ]
+        for name, entry in self.entries.items():
+            lines.append(f'ai_service_import_seconds{{component="{name}"}} {entry["seconds"]}')
+        lines.append("# HELP ai_service_import_rss_delta_mb RSS growth while importing a component")
+        lines.append("# TYPE ai_service_import_rss_delta_mb gauge")
+        for name, entry in self.entries.items():
+            lines.append(f'ai_service_import_rss_delta_mb{{component="{name}"}} {entry["rss_delta_mb"]}')
+        return "\n".join(lines) + "\n"
+
+
+# Global instance; created when main.py first imports it, which is as close
+# to process start as the app gets
+startup_report = StartupReport()
@@ -9,10 +9,23 @@ class SpeechToTextResponse(BaseModel):
     duration: Optional[float] = None
 
 
+class TranscriptionWord(BaseModel):
+    word: str
+    start: float
+    end: float
+    probability: Optional[float] = None
+
+
 class TranscriptionSegment(BaseModel):
     start: float
     end: float
     text: str
+    # Whisper's decoder confidence: low avg_logprob or high no_speech_prob
+    # flags a segment worth reviewing
+    avg_logprob: Optional[float] = None
+    no_speech_prob: Optional[float] = None
+    compression_ratio: Optional[float] = None
+    words: Optional[List[TranscriptionWord]] = None
 
 
 class DetailedTranscriptionResponse(BaseModel):
@@ -22,6 +35,18 @@ class DetailedTranscriptionResponse(BaseModel):
     duration: Optional[float] = None
 
 
+class LanguageCandidate(BaseModel):
+    language: str
+    probability: float
+
+
+class LanguageDetectionResponse(BaseModel):
+    language: str
+    probability: float
+    candidates: List[LanguageCandidate] = []
+    cached: bool = False
+
+
 # OCR Models
 class OCRResponse(BaseModel):
     text: str
@@ -34,6 +59,17 @@ class OCRDetailedResponse(BaseModel):
     confidence: Optional[float] = None
 
 
+# Capture Models
+class CaptureResponse(BaseModel):
+    note_id: int
+    version: Optional[int] = None
+    created: bool
+    source: str  # "speech" or "ocr"
+    language: Optional[str] = None
+    text_length: int
+    text: Optional[str] = None  # only when include_text was set
+
+
 # Text to Speech Models
 class TextToSpeechRequest(BaseModel):
     text: str = Field(..., description="Text to convert to speech")
@@ -0,0 +1,156 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+
+import httpx
+
+from ..core.config import settings
+
+
+class NotesServiceError(Exception):
+    """Raised when a note cannot be created or appended to; ``status_code`` is what the caller should return."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class NotesClient:
+    """Creates and appends to notes in the export-service over one pooled HTTP client.
+
+    The ``httpx.AsyncClient`` is created on first use and reused for every
+    request, so captures share keep-alive connections instead of paying a
+    TCP (and TLS) handshake each time. An append is a single PATCH that
+    sends only the new text; the export-service adds it to the note's
+    current content.
+    """
+
+    # Times an append is retried when another write to the note landed at the same moment
+    APPEND_ATTEMPTS = 3
+
+    def __init__(self, base_url: str, timeout: float, max_connections: int):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        try:
+            return await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            raise NotesServiceError(502, f"Notes service unavailable: {str(e)}")
+
+    @staticmethod
+    def _data(response: httpx.Response) -> Dict:
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.is_success and body.get("success"):
+            return body["data"]
+        detail = body.get("error") or f"Notes service returned {response.status_code}"
+        # Pass a missing note through; anything else is the notes service's fault
+        raise NotesServiceError(404 if response.status_code == 404 else 502, detail)
+
+    async def create_note(self, title: str, content: str) -> Dict:
+        response = await self._request("POST", "/api/notes", json={"title": title, "content": content})
+        return self._data(response)
+
+    async def append_to_note(self, note_id: int, text: str, separator: str = "\n\n") -> Dict:
+        """Append ``text`` to the end of note ``note_id`` and return its new metadata."""
+        for _ in range(self.APPEND_ATTEMPTS):
+            response = await self._request("PATCH", f"/api/notes/{note_id}", json={
+                "append": text,
+                "separator": separator
+            })
+            if response.status_code != 409:
+                return self._data(response)
+        raise NotesServiceError(409, f"Note {note_id} kept changing, append not applied")
+
+
+class LocalNotesClient:
+    """In-memory stand-in for :class:`NotesClient`, for tests and running without the export-service.
+
+    Set ``NOTES_SERVICE_URL=local`` to use it, or override the
+    ``get_notes_client`` dependency with an instance.
+    """
+
+    def __init__(self):
+        self.notes: Dict[int, Dict] = {}
+        self._lock = asyncio.Lock()
+
+    async def aclose(self):
+        pass
+
+    @staticmethod
+    def _metadata(note: Dict) -> Dict:
+        return {
+            "id": note["id"],
+            "title": note["title"],
+            "version": note["version"],
+            "created_at": note["created_at"],
+            "updated_at": note["updated_at"],
+            "content_length": len(note["content"])
+        }
+
+    async def create_note(self, title: str, content: str) -> Dict:
+        async with self._lock:
+            now = datetime.utcnow().isoformat()
+            note = {
+                "id": len(self.notes) + 1,
+                "title": title,
+                "content": content,
+                "version": 1,
+                "created_at": now,
+                "updated_at": now
+            }
+            self.notes[note["id"]] = note
+            return {**self._metadata(note), "content": content}
+
+    async def append_to_note(self, note_id: int, text: str, separator: str = "\n\n") -> Dict:
+        async with self._lock:
+            note = self.notes.get(note_id)
+            if note is None:
+                raise NotesServiceError(404, f"Note {note_id} not found")
+            note["content"] += separator + text if note["content"] else text
+            note["version"] += 1
+            note["updated_at"] = datetime.utcnow().isoformat()
+            return self._metadata(note)
+
+
+def _make_notes_client():
+    if settings.NOTES_SERVICE_URL == "local":
+        return LocalNotesClient()
+    return NotesClient(
+        settings.NOTES_SERVICE_URL,
+        settings.NOTES_SERVICE_TIMEOUT,
+        settings.NOTES_SERVICE_MAX_CONNECTIONS
+    )
+
+
+# Global instance
+notes_client = _make_notes_client()
+
+
+def get_notes_client():
+    """FastAPI dependency; override it to run the capture endpoints against a stand-in."""
+    return notes_client
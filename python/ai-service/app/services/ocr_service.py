@@ -1,15 +1,32 @@
-import pytesseract
-from PIL import Image
+import asyncio
 import os
+import threading
 from typing import Optional, Dict, List
 from ..core.config import settings
+from ..core.startup import startup_report
 
 
 class OCRService:
     def __init__(self):
-        # Set Tesseract command path if specified in config
-        if settings.TESSERACT_CMD:
-            pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
+        self.tesseract = None
+        self._load_lock = threading.Lock()
+
+    def load_backend(self):
+        """Import and configure pytesseract on first use."""
+        with self._load_lock:
+            if self.tesseract is None:
+                with startup_report.measure("backend:pytesseract"):
+                    import pytesseract
+
+                # Set Tesseract command path if specified in config
+                if settings.TESSERACT_CMD:
+                    pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
+
+                # Environment for the tesseract subprocesses only: cap its OpenMP
+                # threads so concurrent OCR jobs don't oversubscribe the CPU
+                pytesseract.pytesseract.environ = {**os.environ, "OMP_THREAD_LIMIT": str(settings.OCR_THREADS)}
+                self.tesseract = pytesseract
+        return self.tesseract
 
     async def extract_text(
             self,
@@ -17,6 +34,13 @@ class OCRService:
             language: str = "eng",
             detailed: bool = False
     ) -> Dict:
+        # Tesseract runs as a blocking subprocess, so keep it off the event loop
+        return await asyncio.to_thread(self._extract_text, image_path, language, detailed)
+
+    def _extract_text(self, image_path: str, language: str, detailed: bool) -> Dict:
+        from PIL import Image
+
+        pytesseract = self.load_backend()
 
         try:
             # Open the image
@@ -79,7 +103,7 @@ class OCRService:
     def get_available_languages(self) -> List[str]:
 
         try:
-            languages = pytesseract.get_languages()
+            languages = self.load_backend().get_languages()
             return languages
         except Exception as e:
             return ["eng"]  # Return default if unable to get languages
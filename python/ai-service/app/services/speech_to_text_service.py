@@ -1,64 +1,215 @@
-import whisper
+import asyncio
 import os
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
 from typing import Optional, Dict
 import tempfile
 from pathlib import Path
+from ..core.config import settings
+from ..core.startup import startup_report
+from .whisper_weights import load_shared_model
 
 
 class SpeechToTextService:
     def __init__(self, model_name: str = "base"):
 
         self.model_name = model_name
-        self.model = None
+        self.models = {}
+        self._load_lock = threading.Lock()
+        # Whisper installs its kv-cache hooks on the model for the duration of
+        # each transcribe() call, so calls on one model must not overlap
+        self._model_locks = {}
+        # Language-ID results keyed by (audio sha256, model, clip length)
+        self._language_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def get_model(self, name: Optional[str] = None):
+        """Return the Whisper model called ``name`` (the default model if ``None``), loading it once."""
+        name = name or self.model_name
+        with self._load_lock:
+            model = self.models.get(name)
+            if model is None:
+                # Imported here rather than at module load: whisper pulls in
+                # torch, which costs seconds and hundreds of MB. Only the first
+                # import is timed; for later models it is a sys.modules lookup
+                first_import = "whisper" not in sys.modules
+                with startup_report.measure("backend:whisper") if first_import else nullcontext():
+                    import torch
+                    import whisper
+
+                # Size torch's intra-op pool for the configured concurrency
+                torch.set_num_threads(settings.STT_THREADS)
+                print(f"Loading Whisper model: {name}")
+                with startup_report.measure(f"model:whisper-{name}"):
+                    if settings.WHISPER_SHARE_WEIGHTS:
+                        model = load_shared_model(name, settings.WHISPER_SHARED_DIR)
+                    else:
+                        model = whisper.load_model(name)
+                self.models[name] = model
+            return model
 
     def load_model(self):
-        if self.model is None:
-            print(f"Loading Whisper model: {self.model_name}")
-            self.model = whisper.load_model(self.model_name)
+        return self.get_model()
 
-    async def transcribe_audio(
+    def _model_lock(self, name: str) -> threading.Lock:
+        with self._load_lock:
+            return self._model_locks.setdefault(name, threading.Lock())
+
+    def model_for(self, language: Optional[str], task: str) -> str:
+        """Model to transcribe ``language`` with: a per-language override, else the default."""
+        if language and task == "transcribe":
+            return settings.WHISPER_LANGUAGE_MODELS.get(language, self.model_name)
+        return self.model_name
+
+    @staticmethod
+    def _load_clip(audio_path: str, seconds: float):
+        """Decode only the first ``seconds`` of ``audio_path`` to 16kHz mono float32.
+
+        whisper.load_audio() decodes the whole file, which for a long
+        recording costs more than the language ID itself.
+        """
+        import numpy as np
+        from whisper.audio import SAMPLE_RATE
+
+        cmd = [
+            "ffmpeg", "-nostdin", "-threads", "0", "-i", audio_path, "-t", str(seconds),
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"
+        ]
+        output = subprocess.run(cmd, capture_output=True, check=True).stdout
+        return np.frombuffer(output, np.int16).flatten().astype(np.float32) / 32768.0
+
+    def _language_probs(self, model, audio_path: str) -> Dict[str, float]:
+        import whisper
+
+        audio = whisper.pad_or_trim(self._load_clip(audio_path, settings.LANGUAGE_ID_SECONDS))
+        mel = whisper.log_mel_spectrogram(audio, n_mels=model.dims.n_mels).to(model.device)
+        _, probs = model.detect_language(mel)
+        return probs
+
+    def _detect_language(self, audio_path: str, audio_hash: Optional[str] = None) -> Dict:
+        # Runs in a worker thread
+        key = (audio_hash, settings.LANGUAGE_ID_MODEL, settings.LANGUAGE_ID_SECONDS)
+        if audio_hash is not None:
+            with self._cache_lock:
+                probs = self._language_cache.get(key)
+                if probs is not None:
+                    self._language_cache.move_to_end(key)
+        else:
+            probs = None
+
+        cached = probs is not None
+        if not cached:
+            model = self.get_model(settings.LANGUAGE_ID_MODEL)
+            with self._model_lock(settings.LANGUAGE_ID_MODEL):
+                probs = self._language_probs(model, audio_path)
+            if audio_hash is not None:
+                with self._cache_lock:
+                    self._language_cache[key] = probs
+                    while len(self._language_cache) > settings.LANGUAGE_ID_CACHE_SIZE:
+                        self._language_cache.popitem(last=False)
+
+        ranked = sorted(probs.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "language": ranked[0][0],
+            "probability": ranked[0][1],
+            "candidates": [
+                {"language": code, "probability": probability}
+                for code, probability in ranked[:5]
+            ],
+            "cached": cached
+        }
+
+    async def detect_language(self, audio_path: str, audio_hash: Optional[str] = None) -> Dict:
+        """Identify the spoken language from the start of the audio with the small language-ID model."""
+        try:
+            return await asyncio.to_thread(self._detect_language, audio_path, audio_hash)
+        except Exception as e:
+            raise Exception(f"Language detection failed: {str(e)}")
+
+    def _transcribe(
             self,
             audio_path: str,
-            language: Optional[str] = None,
-            task: str = "transcribe"
+            language: Optional[str],
+            task: str,
+            word_timestamps: bool = False,
+            audio_hash: Optional[str] = None
     ) -> Dict:
+        # Runs in a worker thread: loading and decoding are blocking
+        if language is None and settings.LANGUAGE_ID_ENABLED:
+            detected = self._detect_language(audio_path, audio_hash)
+            # A confident answer from the small model picks the model and saves
+            # the big one its own detection pass; otherwise let it decide
+            if detected["probability"] >= settings.LANGUAGE_ID_MIN_PROBABILITY:
+                language = detected["language"]
 
-        self.load_model()
-
-        try:
-            # Transcribe the audio
-            result = self.model.transcribe(
+        name = self.model_for(language, task)
+        model = self.get_model(name)
+        with self._model_lock(name):
+            return model.transcribe(
                 audio_path,
                 language=language,
                 task=task,
-                verbose=False
+                verbose=False,
+                # Not free: Whisper aligns the words of each segment with
+                # find_alignment(), an extra forward pass over the segment's
+                # tokens to read the cross-attention, followed by DTW.
+                # Compare stt_words with stt_detailed in the load test
+                # (--backend real) for the cost
+                word_timestamps=word_timestamps
+            )
+
+    @staticmethod
+    def _segment(seg: Dict, word_timestamps: bool) -> Dict:
+        segment = {
+            "start": seg["start"],
+            "end": seg["end"],
+            "text": seg["text"].strip(),
+            "avg_logprob": seg.get("avg_logprob"),
+            "no_speech_prob": seg.get("no_speech_prob"),
+            "compression_ratio": seg.get("compression_ratio")
+        }
+        if word_timestamps:
+            segment["words"] = [
+                {
+                    "word": word["word"].strip(),
+                    "start": word["start"],
+                    "end": word["end"],
+                    "probability": word.get("probability")
+                }
+                for word in seg.get("words", [])
+            ]
+        return segment
+
+    async def transcribe_audio(
+            self,
+            audio_path: str,
+            language: Optional[str] = None,
+            task: str = "transcribe",
+            word_timestamps: bool = False,
+            audio_hash: Optional[str] = None
+    ) -> Dict:
+
+        try:
+            # Transcribe the audio off the event loop
+            result = await asyncio.to_thread(
+                self._transcribe, audio_path, language, task, word_timestamps, audio_hash
             )
 
             return {
                 "text": result["text"].strip(),
                 "language": result.get("language"),
                 "segments": [
-                    {
-                        "start": seg["start"],
-                        "end": seg["end"],
-                        "text": seg["text"].strip()
-                    }
+                    self._segment(seg, word_timestamps)
                     for seg in result.get("segments", [])
                 ]
             }
         except Exception as e:
             raise Exception(f"Transcription failed: {str(e)}")
 
-    async def transcribe_audio_simple(
-            self,
-            audio_path: str,
-            language: Optional[str] = None
-    ) -> str:
-
-        result = await self.transcribe_audio(audio_path, language)
-        return result["text"]
-
 
 # Global instance
-speech_service = SpeechToTextService()
+speech_service = SpeechToTextService(settings.WHISPER_MODEL)
 
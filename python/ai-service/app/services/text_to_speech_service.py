@@ -1,14 +1,16 @@
-from gtts import gTTS
+import asyncio
 import os
 from typing import Optional, Dict
 import base64
 import io
 from ..core.config import settings
+from ..core.startup import startup_report
 
 
 class TextToSpeechService:
     def __init__(self):
         """Initialize the Text-to-Speech service using gTTS"""
+        self.gtts = None  # gTTS class, imported on first use
         # Map common language codes to gTTS language codes
         self.language_map = {
             "en-US": "en",
@@ -28,6 +30,13 @@ class TextToSpeechService:
             "hi-IN": "hi",
         }
 
+    def load_backend(self):
+        if self.gtts is None:
+            with startup_report.measure("backend:gtts"):
+                from gtts import gTTS
+            self.gtts = gTTS
+        return self.gtts
+
     def _get_language_code(self, lang_code: str) -> str:
         return self.language_map.get(lang_code, lang_code.split('-')[0])
 
@@ -48,11 +57,12 @@ class TextToSpeechService:
             use_slow = speaking_rate < 0.8
 
             # Generate speech using gTTS
-            tts = gTTS(text=text, lang=gtts_lang, slow=use_slow)
+            tts = self.load_backend()(text=text, lang=gtts_lang, slow=use_slow)
 
-            # Save to a BytesIO object
+            # Save to a BytesIO object; the request to Google blocks, so it
+            # runs in a worker thread
             audio_buffer = io.BytesIO()
-            tts.write_to_fp(audio_buffer)
+            await asyncio.to_thread(tts.write_to_fp, audio_buffer)
             audio_buffer.seek(0)
 
             # Read audio content
@@ -0,0 +1,65 @@
+import dataclasses
+import os
+import tempfile
+from pathlib import Path
+
+
+def shared_checkpoint_path(model_name: str, directory: str) -> Path:
+    return Path(directory) / f"whisper-{model_name}.fp32.pt"
+
+
+def export_shared_checkpoint(model_name: str, path: Path) -> Path:
+    """Write ``model_name``'s weights as an fp32 checkpoint that can be memory-mapped.
+
+    Published checkpoints are fp16 and get converted while loading, so their
+    bytes can't back the model directly; this file holds the weights exactly
+    as the CPU model uses them. Written atomically, so workers starting at the
+    same time can race on it safely.
+    """
+    import torch
+    import whisper
+
+    model = whisper.load_model(model_name, device="cpu")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            torch.save({
+                "dims": dataclasses.asdict(model.dims),
+                "model_state_dict": model.state_dict()
+            }, tmp)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def load_shared_model(model_name: str, directory: str):
+    """Load a Whisper model whose weights are memory-mapped from disk.
+
+    Every process that loads the same file maps the same page-cache pages
+    (copy-on-write, and inference never writes them), so N uvicorn workers
+    hold one physical copy of the weights instead of N. Needs torch >= 2.1
+    for ``mmap=True`` and ``assign=True``.
+    """
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+
+    path = shared_checkpoint_path(model_name, directory)
+    if not path.exists():
+        export_shared_checkpoint(model_name, path)
+
+    checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    model = Whisper(ModelDimensions(**checkpoint["dims"]))
+    # assign=True keeps the mapped tensors instead of copying them into the
+    # freshly allocated parameters, which are freed here
+    model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+    model.eval()
+
+    # Same word-alignment heads whisper.load_model() would set
+    alignment_heads = getattr(whisper, "_ALIGNMENT_HEADS", {}).get(model_name)
+    if alignment_heads is not None:
+        model.set_alignment_heads(alignment_heads)
+    return model
@@ -0,0 +1,96 @@
+import atexit
+import io
+import os
+import shutil
+import sys
+import tempfile
+import wave
+from pathlib import Path
+
+# Settings are read when the app is imported: keep uploads out of the tree,
+# use the in-memory notes client and a small upload limit
+_TMP = tempfile.mkdtemp(prefix='ai-service-tests-')
+atexit.register(shutil.rmtree, _TMP, ignore_errors=True)
+os.environ['UPLOAD_DIR'] = os.path.join(_TMP, 'uploads')
+os.environ['OUTPUT_DIR'] = os.path.join(_TMP, 'outputs')
+os.environ['NOTES_SERVICE_URL'] = 'local'
+os.environ['MAX_UPLOAD_SIZE'] = str(256 * 1024)
+os.environ['WHISPER_PRELOAD'] = 'false'
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(SERVICE_DIR))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from PIL import Image  # noqa: E402
+
+
+@pytest.fixture
+def stub_backends(monkeypatch):
+    """Replace Whisper, Tesseract and gTTS with the benchmark stubs, at no simulated cost."""
+    from app.services.ocr_service import ocr_service
+    from app.services.speech_to_text_service import speech_service
+    from app.services.text_to_speech_service import tts_service
+    from benchmarks.stubs import StubTesseract, StubWhisperModel, make_stub_gtts
+
+    model = StubWhisperModel(rtf=0)
+    calls = []
+
+    def language_probs(model, audio_path):
+        calls.append(audio_path)
+        return model.language_probs(audio_path)
+
+    monkeypatch.setattr(speech_service, 'get_model', lambda name=None: model)
+    monkeypatch.setattr(speech_service, '_language_probs', language_probs)
+    monkeypatch.setattr(speech_service, '_language_cache', type(speech_service._language_cache)())
+    monkeypatch.setattr(ocr_service, 'tesseract', StubTesseract(0))
+    monkeypatch.setattr(tts_service, 'gtts', make_stub_gtts(0))
+    return calls
+
+
+@pytest.fixture
+def app():
+    from main import app
+    yield app
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(app, stub_backends):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def notes(app):
+    """The in-memory notes client, in place of the export-service."""
+    from app.services.notes_client import LocalNotesClient, get_notes_client
+
+    notes = LocalNotesClient()
+    app.dependency_overrides[get_notes_client] = lambda: notes
+    return notes
+
+
+@pytest.fixture
+def upload_dir():
+    from app.core.config import settings
+    return Path(settings.UPLOAD_DIR)
+
+
+@pytest.fixture
+def wav_audio():
+    """One second of silence as a WAV file."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b'\0\0' * 8000)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def png_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 32), 'white').save(buffer, 'PNG')
+    return buffer.getvalue()
@@ -0,0 +1,93 @@
+import json
+
+import httpx
+
+from app.services.notes_client import NotesClient, get_notes_client
+
+
+def _capture_audio(client, wav_audio, **form):
+    return client.post('/api/v1/capture/audio', files={'audio_file': ('memo.wav', wav_audio)}, data=form)
+
+
+def _capture_image(client, png_image, **form):
+    return client.post('/api/v1/capture/image', files={'image_file': ('scan.png', png_image)}, data=form)
+
+
+def test_audio_capture_creates_a_note(client, notes, wav_audio):
+    response = _capture_audio(client, wav_audio, title='Standup', include_text='true')
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['created'] and body['source'] == 'speech' and body['language'] == 'en'
+    assert body['text'] == 'segment 0'
+    assert notes.notes[body['note_id']]['title'] == 'Standup'
+    assert notes.notes[body['note_id']]['content'] == 'segment 0'
+
+
+def test_image_capture_creates_a_note(client, notes, png_image):
+    response = _capture_image(client, png_image)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['created'] and body['source'] == 'ocr' and body['version'] == 1
+    assert notes.notes[body['note_id']]['title'].startswith('Scanned text')
+    assert notes.notes[body['note_id']]['content'] == 'stub ocr text'
+
+
+def test_capture_appends_to_an_existing_note(client, notes, wav_audio, png_image):
+    note_id = _capture_image(client, png_image).json()['note_id']
+
+    response = _capture_audio(client, wav_audio, note_id=str(note_id))
+
+    assert response.status_code == 200
+    assert not response.json()['created']
+    assert response.json()['version'] == 2
+    assert notes.notes[note_id]['content'] == 'stub ocr text\n\nsegment 0'
+
+
+def test_capture_to_a_missing_note_is_404(client, notes, png_image):
+    response = _capture_image(client, png_image, note_id='99')
+
+    assert response.status_code == 404
+    assert notes.notes == {}
+
+
+def _http_notes_client(app, handler):
+    """A real NotesClient whose requests are answered by ``handler``."""
+    notes = NotesClient('http://notes', timeout=5, max_connections=1)
+    notes._client = httpx.AsyncClient(base_url='http://notes', transport=httpx.MockTransport(handler))
+    app.dependency_overrides[get_notes_client] = lambda: notes
+    return notes
+
+
+def test_append_is_retried_after_a_conflict(app, client, png_image):
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.path, request.read()))
+        if len(requests) == 1:
+            return httpx.Response(409, json={'success': False, 'error': 'modified', 'current_version': 3})
+        return httpx.Response(200, json={'success': True, 'data': {'id': 7, 'version': 4}})
+
+    _http_notes_client(app, handler)
+    response = _capture_image(client, png_image, note_id='7')
+
+    assert response.status_code == 200
+    assert response.json()['version'] == 4
+    # One PATCH per attempt, no GET of the note
+    assert [(method, path) for method, path, _ in requests] == [('PATCH', '/api/notes/7')] * 2
+    assert json.loads(requests[0][2]) == {'append': 'stub ocr text', 'separator': '\n\n'}
+
+
+def test_append_gives_up_after_repeated_conflicts(app, client, png_image):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(409, json={'success': False, 'error': 'modified'})
+
+    _http_notes_client(app, handler)
+    response = _capture_image(client, png_image, note_id='7')
+
+    assert response.status_code == 409
+    assert len(requests) == NotesClient.APPEND_ATTEMPTS
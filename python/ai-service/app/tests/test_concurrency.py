@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.core.concurrency import ConcurrencyLimiter, ServiceBusy
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_full_queue_is_rejected_with_429():
+    async def scenario():
+        limiter = ConcurrencyLimiter('test', max_concurrency=1, max_queue=0, queue_timeout=1)
+        await limiter.acquire()
+        with pytest.raises(ServiceBusy) as busy:
+            await limiter.acquire()
+        return limiter, busy.value
+
+    limiter, busy = _run(scenario())
+
+    assert busy.status_code == 429
+    assert busy.retry_after >= 1
+    assert limiter.rejected == 1
+    assert limiter.running == 1
+
+
+def test_queue_timeout_is_503():
+    async def scenario():
+        limiter = ConcurrencyLimiter('test', max_concurrency=1, max_queue=1, queue_timeout=0.05)
+        await limiter.acquire()
+        with pytest.raises(ServiceBusy) as busy:
+            await limiter.acquire()
+        return limiter, busy.value
+
+    limiter, busy = _run(scenario())
+
+    assert busy.status_code == 503
+    assert busy.retry_after >= 1
+    assert limiter.timed_out == 1
+    assert limiter.waiting == 0
+    assert limiter.running == 1
+
+
+def test_waiter_cancelled_after_the_handoff_does_not_leak_the_slot():
+    async def scenario():
+        limiter = ConcurrencyLimiter('test', max_concurrency=1, max_queue=2, queue_timeout=5)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 2
+
+        # The slot is handed to the first waiter, which is cancelled before it runs
+        limiter.release(0.01)
+        first.cancel()
+        try:
+            await first
+            kept = True  # the handoff won over the cancellation
+        except asyncio.CancelledError:
+            kept = False
+        await asyncio.sleep(0)
+        # Otherwise the slot went on to the next waiter, not back to nobody
+        assert second.done() is not kept
+        assert limiter.running == 1
+
+        if kept:
+            limiter.release(0.01)
+            await second
+        limiter.release(0.01)
+        return limiter
+
+    limiter = _run(scenario())
+
+    assert limiter.running == 0
+    assert limiter.waiting == 0
+
+
+def test_busy_response_carries_retry_after(client, monkeypatch):
+    from app.core.concurrency import tts_limiter
+
+    monkeypatch.setattr(tts_limiter, 'max_queue', 0)
+    monkeypatch.setattr(tts_limiter, '_running', tts_limiter.max_concurrency)
+
+    response = client.post('/api/v1/tts/synthesize', json={'text': 'hello'})
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
@@ -0,0 +1,47 @@
+from app.core.config import settings
+
+
+def _detect(client, audio, filename='memo.wav'):
+    return client.post('/api/v1/speech/detect-language', files={'audio_file': (filename, audio)})
+
+
+def test_detect_language(client, stub_backends, wav_audio, upload_dir):
+    response = _detect(client, wav_audio)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['language'] == 'en' and body['probability'] == 0.92
+    assert [candidate['language'] for candidate in body['candidates']] == ['en', 'es', 'de']
+    assert body['cached'] is False
+    assert len(stub_backends) == 1
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_detect_language_is_cached_by_content(client, stub_backends, wav_audio):
+    other_audio = wav_audio[:-1] + b'\1'
+
+    first = _detect(client, wav_audio).json()
+    # Same bytes under another name: answered from the cache
+    second = _detect(client, wav_audio, filename='copy.wav').json()
+    other = _detect(client, other_audio).json()
+
+    assert [first['cached'], second['cached'], other['cached']] == [False, True, False]
+    assert second['language'] == first['language'] and second['candidates'] == first['candidates']
+    assert len(stub_backends) == 2
+
+
+def test_detect_language_cache_evicts_the_least_recent(client, stub_backends, wav_audio, monkeypatch):
+    monkeypatch.setattr(settings, 'LANGUAGE_ID_CACHE_SIZE', 1)
+    other_audio = wav_audio[:-1] + b'\1'
+
+    cached = [_detect(client, audio).json()['cached'] for audio in (wav_audio, other_audio, wav_audio)]
+
+    assert cached == [False, False, False]
+    assert len(stub_backends) == 3
+
+
+def test_detect_language_rejects_other_formats(client, stub_backends):
+    response = _detect(client, b'not audio', filename='notes.txt')
+
+    assert response.status_code == 400
+    assert stub_backends == []
@@ -0,0 +1,111 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+from app.utils.uploads import ingest_upload
+
+BOUNDARY = 'test-boundary'
+LIMIT = settings.MAX_UPLOAD_SIZE + settings.MAX_REQUEST_OVERHEAD
+
+
+def _multipart(data, filename='memo.wav'):
+    return (
+        f'--{BOUNDARY}\r\n'
+        f'Content-Disposition: form-data; name="audio_file"; filename="{filename}"\r\n'
+        'Content-Type: application/octet-stream\r\n\r\n'
+    ).encode() + data + f'\r\n--{BOUNDARY}--\r\n'.encode()
+
+
+def _chunks(body, size=16 * 1024):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def _post(client, content, **headers):
+    return client.post(
+        '/api/v1/speech/transcribe',
+        content=content,
+        headers={'Content-Type': f'multipart/form-data; boundary={BOUNDARY}', **headers},
+    )
+
+
+def test_oversized_upload_with_a_content_length_is_413(client, upload_dir):
+    body = _multipart(b'\0' * LIMIT)
+
+    response = _post(client, body)
+
+    assert response.status_code == 413
+    assert response.json()['detail'].startswith('Request body is too large')
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_oversized_chunked_upload_is_413(client, upload_dir):
+    body = _multipart(b'\0' * LIMIT)
+
+    response = _post(client, _chunks(body))
+
+    assert response.request.headers.get('content-length') is None
+    assert response.status_code == 413
+    assert response.json()['detail'].startswith('Request body is too large')
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_upload_over_the_file_limit_is_413(client, upload_dir):
+    # Fits in the request overhead, so it is ingest_upload that refuses it
+    response = _post(client, _multipart(b'\0' * (settings.MAX_UPLOAD_SIZE + 1)))
+
+    assert response.status_code == 413
+    assert response.json()['detail'].startswith('File is too large')
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_accepted_upload_leaves_no_temp_file(client, upload_dir, wav_audio):
+    response = _post(client, _chunks(_multipart(wav_audio)))
+
+    assert response.status_code == 200
+    assert list(upload_dir.iterdir()) == []
+
+
+def _upload(data, filename='memo.wav'):
+    # No size, as for a chunked part: the limit is only found while copying
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+
+def test_ingest_upload_removes_the_temp_file_when_too_large(upload_dir):
+    async def ingest():
+        async with ingest_upload(_upload(b'\0' * 100), {'.wav'}, max_size=64, chunk_size=16):
+            pass
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(ingest())
+
+    assert error.value.status_code == 413
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_ingest_upload_removes_the_temp_file_on_exit(upload_dir):
+    async def ingest():
+        async with ingest_upload(_upload(b'abc' * 10), {'.wav'}, chunk_size=4) as upload:
+            assert upload.path.parent == upload_dir
+            assert upload.path.read_bytes() == b'abc' * 10
+            assert upload.size == 30
+            return upload.path
+
+    path = asyncio.run(ingest())
+
+    assert not path.exists()
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_ingest_upload_removes_the_temp_file_when_the_block_fails(upload_dir):
+    async def ingest():
+        async with ingest_upload(_upload(b'abc'), {'.wav'}):
+            raise RuntimeError('endpoint failed')
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(ingest())
+
+    assert list(upload_dir.iterdir()) == []
@@ -0,0 +1,168 @@
+import hashlib
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Optional
+
+import aiofiles
+import aiofiles.os
+import aiofiles.tempfile
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+from ..core.config import settings
+
+
+class IngestedUpload:
+    """An upload copied to a temporary file on disk.
+
+    ``sha256`` is computed while copying, so callers can key caches on the
+    content without reading the file a second time.
+    """
+
+    def __init__(self, path: Path, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+    def __repr__(self):
+        return f"<IngestedUpload {self.filename} {self.size} bytes>"
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File is too large (max {max_size // (1024 * 1024)}MB)"
+    )
+
+
+@asynccontextmanager
+async def ingest_upload(
+        upload: UploadFile,
+        allowed_extensions: Iterable[str],
+        max_size: Optional[int] = None,
+        chunk_size: Optional[int] = None
+) -> AsyncIterator[IngestedUpload]:
+    """Validate ``upload`` and stream it to a temporary file.
+
+    The file is copied ``chunk_size`` bytes at a time, so a request never
+    holds more than one chunk in memory, and the copy stops with a 413 as
+    soon as it passes ``max_size``. The temporary file is removed when the
+    ``async with`` block exits.
+    """
+    max_size = settings.MAX_UPLOAD_SIZE if max_size is None else max_size
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    # Validate file
+    if not upload.filename:
+        raise HTTPException(status_code=400, detail="No file provided")
+
+    allowed_extensions = set(allowed_extensions)
+    file_ext = Path(upload.filename).suffix.lower()
+    if file_ext not in allowed_extensions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file format. Allowed formats: {', '.join(sorted(allowed_extensions))}"
+        )
+
+    if upload.size is not None and upload.size > max_size:
+        raise _too_large(max_size)
+
+    digest = hashlib.sha256()
+    size = 0
+    async with aiofiles.tempfile.NamedTemporaryFile(
+            'wb', delete=False, dir=settings.UPLOAD_DIR, suffix=file_ext
+    ) as temp_file:
+        temp_path = Path(temp_file.name)
+        try:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise _too_large(max_size)
+                digest.update(chunk)
+                await temp_file.write(chunk)
+        except BaseException:
+            await temp_file.close()
+            await aiofiles.os.remove(temp_path)
+            raise
+
+    try:
+        yield IngestedUpload(temp_path, upload.filename, size, digest.hexdigest())
+    finally:
+        try:
+            await aiofiles.os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class _BodyTooLarge(HTTPException):
+    # An HTTPException so FastAPI's body parsing re-raises it as-is instead of
+    # turning it into a generic 400
+    def __init__(self, max_size: int):
+        super().__init__(
+            status_code=413,
+            detail=f"Request body is too large (max {max_size // (1024 * 1024)}MB)"
+        )
+
+
+class RequestSizeLimitMiddleware:
+    """Reject request bodies larger than ``max_body_size`` while they stream in.
+
+    Starlette parses multipart bodies before the endpoint runs, so without
+    this an oversized upload would be read in full before ``ingest_upload``
+    ever saw it. A declared ``Content-Length`` over the limit is refused
+    up front; chunked bodies are counted as they arrive.
+    """
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", ()):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    break
+                if declared > self.max_body_size:
+                    await self._reject(scope, receive, send)
+                    return
+                break
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise _BodyTooLarge(self.max_body_size)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        error = _BodyTooLarge(self.max_body_size)
+        response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+        await response(scope, receive, send)
@@ -0,0 +1,101 @@
+"""Deterministic fixture media for the ai-service benchmarks.
+
+Everything is generated from parameters (no network, no binary files in the
+repo), so two runs on different machines send byte-identical uploads.
+"""
+import io
+import math
+import random
+import struct
+import wave
+from PIL import Image, ImageDraw, ImageFont
+
+SAMPLE_RATE = 16000
+
+SAMPLE_TEXT = (
+    "The quick brown fox jumps over the lazy dog. Meeting moved to Thursday at "
+    "ten; bring the budget review and the revised roadmap. Action items: send "
+    "the draft to Ana, book the room, follow up with the customer on pricing."
+)
+
+
+def _wav_bytes(samples, sample_rate=SAMPLE_RATE):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b''.join(struct.pack('<h', int(max(-1.0, min(1.0, s)) * 32767)) for s in samples))
+    return buffer.getvalue()
+
+
+def tone_wav(seconds, frequency=440.0, amplitude=0.3, sample_rate=SAMPLE_RATE):
+    """A pure sine tone, useful as a no-speech input."""
+    step = 2 * math.pi * frequency / sample_rate
+    return _wav_bytes((amplitude * math.sin(step * i) for i in range(int(seconds * sample_rate))), sample_rate)
+
+
+def speechlike_wav(seconds, seed=0, sample_rate=SAMPLE_RATE):
+    """Syllable-rate bursts of formant-like harmonics separated by pauses.
+
+    Not intelligible speech, but it has the energy envelope and spectrum
+    shape that exercise Whisper's decoder rather than its silence path.
+    """
+    rng = random.Random(seed)
+    samples = []
+    total = int(seconds * sample_rate)
+    while len(samples) < total:
+        # One "syllable": 80-250 ms voiced, then 20-150 ms (sometimes longer) of silence
+        pitch = rng.uniform(90, 220)
+        formants = (rng.uniform(300, 900), rng.uniform(900, 2500))
+        voiced = int(rng.uniform(0.08, 0.25) * sample_rate)
+        for i in range(voiced):
+            t = i / sample_rate
+            envelope = math.sin(math.pi * i / voiced)
+            value = 0.5 * math.sin(2 * math.pi * pitch * t)
+            value += 0.3 * math.sin(2 * math.pi * formants[0] * t)
+            value += 0.2 * math.sin(2 * math.pi * formants[1] * t)
+            samples.append(0.4 * envelope * value)
+        pause = rng.uniform(0.3, 0.6) if rng.random() < 0.1 else rng.uniform(0.02, 0.15)
+        samples.extend([0.0] * int(pause * sample_rate))
+    return _wav_bytes(samples[:total], sample_rate)
+
+
+def wav_duration(data):
+    """Duration in seconds of WAV ``data`` (bytes)."""
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+def text_image(text=SAMPLE_TEXT, font_size=12, dpi=300, width_inches=6.5, image_format='PNG'):
+    """Render ``text`` as a scanned-page-like image.
+
+    ``font_size`` is in points, so the same text gets more pixels per glyph as
+    ``dpi`` goes up, which is what drives Tesseract's cost.
+    """
+    scale = dpi / 72
+    font = ImageFont.load_default(size=max(1, round(font_size * scale)))
+    width = int(width_inches * dpi)
+    margin = int(0.5 * dpi)
+
+    # Greedy word wrap to the page width
+    draw = ImageDraw.Draw(Image.new('L', (1, 1)))
+    lines, line = [], ''
+    for word in text.split():
+        candidate = f'{line} {word}'.strip()
+        if line and draw.textlength(candidate, font=font) > width - 2 * margin:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    lines.append(line)
+
+    line_height = int(font_size * scale * 1.4)
+    image = Image.new('L', (width, 2 * margin + line_height * len(lines)), color=255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((margin, margin + i * line_height), line, font=font, fill=0)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, dpi=(dpi, dpi))
+    return buffer.getvalue()
@@ -0,0 +1,128 @@
+"""Compare JSON serialization paths for the large ai-service responses.
+
+Builds a long detailed transcript (``--segments`` segments of
+``--words-per-segment`` word timestamps) and a detailed OCR result
+(``--ocr-words`` word boxes), validates them into the response models as
+the endpoints do, then times each way of turning the model into JSON:
+
+* ``jsonable_encoder+json``   FastAPI's ``JSONResponse`` (and any route on FastAPI < 0.130)
+* ``jsonable_encoder+orjson`` ``ORJSONResponse`` as ``default_response_class``
+* ``pydantic_dump_json``      FastAPI >= 0.130 with a response model and no custom response class
+
+Usage (from python/ai-service)::
+
+    python -m benchmarks.json_benchmark --segments 2000 --output json.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+def transcript(segments, words_per_segment, seed):
+    rng = random.Random(seed)
+    result = []
+    for i in range(segments):
+        start = i * 5.0
+        words = [
+            {
+                'word': rng.choice(('the', 'note', 'meeting', 'tomorrow', 'project', 'update')),
+                'start': start + n * 5.0 / words_per_segment,
+                'end': start + (n + 1) * 5.0 / words_per_segment,
+                'probability': rng.random(),
+            }
+            for n in range(words_per_segment)
+        ]
+        result.append({
+            'start': start,
+            'end': start + 5.0,
+            'text': ' '.join(word['word'] for word in words),
+            'avg_logprob': -rng.random(),
+            'no_speech_prob': rng.random() / 10,
+            'compression_ratio': 1 + rng.random(),
+            'words': words,
+        })
+    return result
+
+
+def ocr_words(count, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            'text': rng.choice(('Invoice', 'Total', '12.50', 'Date', 'Paid')),
+            'confidence': rng.uniform(60, 99),
+            'left': rng.randrange(2000),
+            'top': rng.randrange(3000),
+            'width': rng.randrange(20, 200),
+            'height': rng.randrange(10, 40),
+        }
+        for _ in range(count)
+    ]
+
+
+def timed(fn, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(fn())
+        timings.append(time.perf_counter() - start)
+    return {'p50_ms': round(statistics.median(timings) * 1000, 2), 'bytes': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--segments', type=int, default=2000, help='about 2.8 hours of audio at 5s per segment')
+    parser.add_argument('--words-per-segment', type=int, default=14)
+    parser.add_argument('--ocr-words', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(SERVICE_DIR))
+    import orjson
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from app.models.schemas import DetailedTranscriptionResponse, OCRDetailedResponse
+
+    payloads = {
+        'transcript': DetailedTranscriptionResponse(
+            text='...', language='en', segments=transcript(args.segments, args.words_per_segment, args.seed)
+        ),
+        'ocr': OCRDetailedResponse(text='...', confidence=90.0, words=ocr_words(args.ocr_words, args.seed)),
+    }
+
+    results = {}
+    for name, model in payloads.items():
+        adapter = TypeAdapter(type(model))
+        paths = {
+            # What JSONResponse.render does
+            'jsonable_encoder+json': lambda: json.dumps(
+                jsonable_encoder(model), ensure_ascii=False, allow_nan=False, separators=(',', ':')
+            ).encode('utf-8'),
+            'jsonable_encoder+orjson': lambda: orjson.dumps(jsonable_encoder(model)),
+            'pydantic_dump_json': lambda: adapter.dump_json(model),
+        }
+        results[name] = {path: timed(fn, args.repeat) for path, fn in paths.items()}
+        baseline = results[name]['jsonable_encoder+json']['p50_ms']
+        for path, result in results[name].items():
+            result['speedup'] = round(baseline / result['p50_ms'], 2)
+            print(f'{name:<10} {path:<24} {json.dumps(result)}')
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            'python': platform.python_version(),
+            'settings': vars(args),
+            'results': results,
+        }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
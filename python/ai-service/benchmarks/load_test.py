@@ -0,0 +1,274 @@
+"""Load-testing harness for the ai-service endpoints.
+
+Builds deterministic fixtures (see ``benchmarks/fixtures.py``), then drives
+the speech, OCR and TTS endpoints at each requested concurrency and reports
+p50/p95/p99 latency, throughput, real-time factor (processing time / audio
+duration, for speech) and RSS. ``stt_words`` is ``stt_detailed`` with word
+timestamps on; comparing the two with ``--backend real`` gives the cost of
+the word alignment. ``lang_id`` is the standalone language detection. Its
+results are cached by content hash, so after the warm-up pass it measures
+the cache; use ``--backend real`` with ``LANGUAGE_ID_CACHE_SIZE=0`` for the
+model cost. ``capture_audio``/``capture_image`` go through the capture
+pipeline, saving each result as a note; with the stub backend the notes go
+to the in-memory ``LocalNotesClient``.
+
+By default the app runs in-process with the backends replaced by the stubs in
+``benchmarks/stubs.py``, so the harness works offline and measures the
+service's own overhead and concurrency behaviour. Use ``--backend real`` to
+run the real Whisper/Tesseract/gTTS, or ``--url`` to load-test a running
+server (pass ``--server-pid`` to sample its RSS).
+
+Usage (from python/ai-service)::
+
+    python -m benchmarks.load_test --concurrency 1 4 16 --output bench.json
+    python -m benchmarks.load_test --backend real --scenarios ocr --image-dpi 150 300
+    python -m benchmarks.load_test --url http://localhost:8000 --server-pid 1234
+    python -m benchmarks.load_test --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = (
+    'stt', 'stt_detailed', 'stt_words', 'lang_id', 'ocr', 'ocr_detailed', 'tts',
+    'capture_audio', 'capture_image',
+)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def build_requests(scenario, args):
+    """Return ``(label, method, path, kwargs, audio_seconds)`` tuples for one scenario."""
+    from benchmarks import fixtures
+
+    requests = []
+    if scenario in ('stt', 'stt_detailed', 'stt_words', 'lang_id', 'capture_audio'):
+        path = {
+            'stt': '/api/v1/speech/transcribe',
+            'lang_id': '/api/v1/speech/detect-language',
+            'capture_audio': '/api/v1/capture/audio',
+        }.get(scenario, '/api/v1/speech/transcribe-detailed')
+        for seconds in args.audio_seconds:
+            clips = {
+                f'speech_{seconds}s': fixtures.speechlike_wav(seconds, seed=args.seed),
+                f'tone_{seconds}s': fixtures.tone_wav(seconds),
+            }
+            for label, data in clips.items():
+                form = {'language': 'en'} if args.language and scenario != 'lang_id' else {}
+                if scenario == 'stt_words':
+                    form['word_timestamps'] = 'true'
+                requests.append((label, 'POST', path, {
+                    'files': {'audio_file': (f'{label}.wav', data, 'audio/wav')},
+                    'data': form,
+                }, seconds))
+    elif scenario in ('ocr', 'ocr_detailed', 'capture_image'):
+        path = {
+            'ocr': '/api/v1/ocr/extract-text',
+            'ocr_detailed': '/api/v1/ocr/extract-text-detailed',
+            'capture_image': '/api/v1/capture/image',
+        }[scenario]
+        for dpi in args.image_dpi:
+            for font_size in args.font_sizes:
+                label = f'{font_size}pt_{dpi}dpi'
+                data = fixtures.text_image(font_size=font_size, dpi=dpi)
+                requests.append((label, 'POST', path, {
+                    'files': {'image_file': (f'{label}.png', data, 'image/png')},
+                    'data': {'language': 'eng'},
+                }, None))
+    else:
+        for length in args.tts_chars:
+            text = (fixtures.SAMPLE_TEXT * (length // len(fixtures.SAMPLE_TEXT) + 1))[:length]
+            requests.append((f'{length}_chars', 'POST', '/api/v1/tts/synthesize', {
+                'json': {'text': text, 'language_code': 'en-US'},
+            }, None))
+    return requests
+
+
+def rss_mb(pid='self'):
+    """Current and peak resident set size of ``pid`` in MB, from /proc."""
+    values = {}
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    key, amount, _ = line.split()
+                    values[key[:-1]] = round(int(amount) / 1024, 1)
+    except OSError:
+        if pid == 'self':
+            return {'VmHWM': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+        return {}
+    return values
+
+
+async def run_level(client, requests, concurrency, repeat):
+    """Send every request ``repeat`` times from ``concurrency`` concurrent clients."""
+    queue = asyncio.Queue()
+    for _ in range(repeat):
+        for item in requests:
+            queue.put_nowait(item)
+
+    samples = []
+    errors = {}
+
+    async def worker():
+        while True:
+            try:
+                label, method, path, kwargs, audio_seconds = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            elapsed = time.perf_counter() - start
+            if response.status_code == 200:
+                samples.append((label, elapsed, audio_seconds))
+            else:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall_time = time.perf_counter() - start
+
+    latencies = sorted(elapsed for _, elapsed, _ in samples)
+    result = {
+        'requests': len(samples),
+        'errors': errors,
+        'wall_time_s': round(wall_time, 4),
+        'throughput_rps': round(len(samples) / wall_time, 3) if wall_time else None,
+    }
+    for q in (50, 95, 99):
+        value = percentile(latencies, q)
+        result[f'p{q}_ms'] = round(value * 1000, 2) if value is not None else None
+
+    per_fixture = {}
+    for label, elapsed, audio_seconds in samples:
+        per_fixture.setdefault(label, []).append((elapsed, audio_seconds))
+    result['fixtures'] = {}
+    for label, values in sorted(per_fixture.items()):
+        times = sorted(elapsed for elapsed, _ in values)
+        entry = {'p50_ms': round(percentile(times, 50) * 1000, 2)}
+        audio_seconds = values[0][1]
+        if audio_seconds:
+            entry['rtf'] = round(percentile(times, 50) / audio_seconds, 4)
+        result['fixtures'][label] = entry
+
+    audio = [(elapsed, seconds) for _, elapsed, seconds in samples if seconds]
+    if audio:
+        result['rtf'] = round(sum(e for e, _ in audio) / sum(s for _, s in audio), 4)
+    return result
+
+
+async def run(args):
+    if args.url:
+        transport = None
+        base_url = args.url.rstrip('/')
+    else:
+        sys.path.insert(0, str(SERVICE_DIR))
+        if args.backend == 'stub':
+            from benchmarks import stubs
+            stubs.install(args.stub_speech_rtf, args.stub_ocr_seconds_per_mpix, args.stub_tts_seconds_per_char)
+        from main import app
+        if args.backend == 'stub':
+            from app.services.notes_client import LocalNotesClient, get_notes_client
+            local_notes = LocalNotesClient()
+            app.dependency_overrides[get_notes_client] = lambda: local_notes
+        transport = httpx.ASGITransport(app=app)
+        base_url = 'http://ai-service'
+
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        for scenario in args.scenarios:
+            requests = build_requests(scenario, args)
+            # One untimed pass so model loading and first-call costs are not measured
+            await run_level(client, requests, 1, 1)
+            results[scenario] = {}
+            for concurrency in args.concurrency:
+                result = await run_level(client, requests, concurrency, args.repeat)
+                result['rss_mb'] = rss_mb(args.server_pid) if args.url else rss_mb()
+                results[scenario][str(concurrency)] = result
+                print(f'{scenario:<13} c={concurrency:<3} p50 {result["p50_ms"]} ms  '
+                      f'p95 {result["p95_ms"]} ms  p99 {result["p99_ms"]} ms  '
+                      f'{result["throughput_rps"]} req/s  rtf {result.get("rtf", "-")}  '
+                      f'errors {result["errors"] or "-"}')
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVICE_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())['results']
+    print(f'\nCompared with {baseline_path}:')
+    for scenario, levels in results.items():
+        for concurrency, result in levels.items():
+            before = baseline.get(scenario, {}).get(concurrency)
+            if not before or not before.get('p50_ms') or not result.get('p50_ms'):
+                continue
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+            print(f'  {scenario:<13} c={concurrency:<3} p50 {before["p50_ms"]:>10.2f} -> '
+                  f'{result["p50_ms"]:>10.2f} ms ({change:+.1f}%)  '
+                  f'throughput {before["throughput_rps"]} -> {result["throughput_rps"]} req/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--repeat', type=int, default=3, help='passes over the fixtures per level')
+    parser.add_argument('--backend', choices=('stub', 'real'), default='stub')
+    parser.add_argument('--url', help='load-test a running server instead of the in-process app')
+    parser.add_argument('--server-pid', help='pid of the server given with --url, to sample its RSS')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--audio-seconds', type=float, nargs='+', default=[5, 30])
+    parser.add_argument('--language', action='store_true', help="send language='en' instead of auto-detect")
+    parser.add_argument('--image-dpi', type=int, nargs='+', default=[150, 300])
+    parser.add_argument('--font-sizes', type=int, nargs='+', default=[10, 14])
+    parser.add_argument('--tts-chars', type=int, nargs='+', default=[200, 2000])
+    parser.add_argument('--stub-speech-rtf', type=float, default=0.05)
+    parser.add_argument('--stub-ocr-seconds-per-mpix', type=float, default=0.05)
+    parser.add_argument('--stub-tts-seconds-per-char', type=float, default=0.0005)
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
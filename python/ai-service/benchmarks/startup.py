@@ -0,0 +1,84 @@
+"""Cold-start benchmark: import time and RSS per ENABLED_SERVICES setting.
+
+Each configuration is measured in a fresh interpreter, ``--runs`` times.
+With ``--load-backends`` the child also loads each enabled backend (whisper
+and its model, pytesseract, gTTS) the way the first request would, so the
+cost of the lazy imports is reported separately from app startup.
+
+Usage (from python/ai-service)::
+
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --configs ocr speech --load-backends
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+import main
+from app.core.startup import current_rss_mb, startup_report
+result = {"import_seconds": time.perf_counter() - start, "rss_mb": current_rss_mb()}
+if LOAD_BACKENDS:
+    from app.core.config import settings
+    if "speech" in settings.ENABLED_SERVICES:
+        from app.services.speech_to_text_service import speech_service
+        speech_service.load_model()
+    if "ocr" in settings.ENABLED_SERVICES:
+        from app.services.ocr_service import ocr_service
+        ocr_service.load_backend()
+    if "tts" in settings.ENABLED_SERVICES:
+        from app.services.text_to_speech_service import tts_service
+        tts_service.load_backend()
+    result["loaded_rss_mb"] = current_rss_mb()
+result["components"] = startup_report.entries
+result["heavy_modules"] = sorted(m for m in ("torch", "whisper", "pytesseract", "gtts", "PIL") if m in sys.modules)
+print(json.dumps(result))
+'''
+
+
+def measure(config, load_backends):
+    env = dict(os.environ, ENABLED_SERVICES=config)
+    output = subprocess.check_output(
+        [sys.executable, '-c', CHILD.replace('LOAD_BACKENDS', str(load_backends))],
+        cwd=SERVICE_DIR, env=env, text=True
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--configs', nargs='+', default=['speech', 'ocr', 'tts', 'speech,ocr,tts'])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--load-backends', action='store_true')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    results = {}
+    for config in args.configs:
+        runs = [measure(config, args.load_backends) for _ in range(args.runs)]
+        result = {
+            'import_seconds_median': round(statistics.median(r['import_seconds'] for r in runs), 4),
+            'rss_mb_median': round(statistics.median(r['rss_mb'] for r in runs), 1),
+            'heavy_modules': runs[-1]['heavy_modules'],
+            'components': runs[-1]['components'],
+        }
+        if args.load_backends:
+            result['loaded_rss_mb_median'] = round(statistics.median(r['loaded_rss_mb'] for r in runs), 1)
+        results[config] = result
+        print(f'{config:<16} import {result["import_seconds_median"]:.3f}s  RSS {result["rss_mb_median"]}MB  '
+              f'loaded {result.get("loaded_rss_mb_median", "-")}MB  modules {", ".join(result["heavy_modules"]) or "-"}')
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
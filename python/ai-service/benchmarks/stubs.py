@@ -0,0 +1,143 @@
+"""Offline stand-ins for the ai-service backends.
+
+Each stub answers with the same shape as the real library and burns a
+configurable, input-proportional amount of blocking time, so the service's
+request handling, upload path and concurrency behaviour can be measured
+without model weights, a Tesseract binary or network access to Google.
+"""
+import time
+import types
+import wave
+from PIL import Image
+
+
+def _audio_duration(audio_path):
+    try:
+        with wave.open(str(audio_path), 'rb') as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError):
+        # Compressed formats: assume ~128 kbit/s
+        with open(audio_path, 'rb') as f:
+            return len(f.read()) / 16000
+
+
+class StubWhisperModel:
+    """Mimics ``whisper.model.Whisper.transcribe`` at ``rtf`` seconds per audio second."""
+
+    def __init__(self, rtf=0.05, segment_seconds=5.0):
+        self.rtf = rtf
+        self.segment_seconds = segment_seconds
+
+    def transcribe(self, audio, language=None, task='transcribe', verbose=None, **kwargs):
+        duration = _audio_duration(audio)
+        time.sleep(duration * self.rtf)
+
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.segment_seconds, duration)
+            segment = {
+                'id': len(segments),
+                'start': start,
+                'end': end,
+                'text': f' segment {len(segments)}',
+                'avg_logprob': -0.25,
+                'no_speech_prob': 0.02,
+                'compression_ratio': 1.2,
+                'temperature': 0.0,
+            }
+            if kwargs.get('word_timestamps'):
+                middle = (start + end) / 2
+                segment['words'] = [
+                    {'word': ' segment', 'start': start, 'end': middle, 'probability': 0.9},
+                    {'word': f' {len(segments)}', 'start': middle, 'end': end, 'probability': 0.8},
+                ]
+            segments.append(segment)
+            start = end
+
+        return {
+            'text': ''.join(s['text'] for s in segments),
+            'language': language or 'en',
+            'segments': segments,
+        }
+
+    def language_probs(self, audio_path):
+        # The language-ID model only sees the start of the clip and is the
+        # smallest model, so charge a fraction of a short transcription
+        from app.core.config import settings
+
+        time.sleep(min(_audio_duration(audio_path), settings.LANGUAGE_ID_SECONDS) * self.rtf / 4)
+        return {'en': 0.92, 'es': 0.05, 'de': 0.03}
+
+
+class StubTesseract:
+    """Mimics the parts of :mod:`pytesseract` the OCR service uses.
+
+    Cost is ``seconds_per_mpix`` per megapixel, per call.
+    """
+
+    class Output:
+        DICT = 'dict'
+
+    def __init__(self, seconds_per_mpix=0.05):
+        self.seconds_per_mpix = seconds_per_mpix
+        self.pytesseract = types.SimpleNamespace(tesseract_cmd='tesseract')
+
+    def _work(self, image):
+        if not isinstance(image, Image.Image):
+            image = Image.open(image)
+        width, height = image.size
+        time.sleep(width * height / 1e6 * self.seconds_per_mpix)
+        return width, height
+
+    def image_to_string(self, image, lang=None, **kwargs):
+        self._work(image)
+        return 'stub ocr text\n'
+
+    def image_to_data(self, image, lang=None, output_type=None, **kwargs):
+        width, height = self._work(image)
+        words = ['stub', 'ocr', 'text']
+        step = width // (len(words) + 1)
+        return {
+            'text': words,
+            'conf': ['95'] * len(words),
+            'left': [i * step for i in range(len(words))],
+            'top': [0] * len(words),
+            'width': [step] * len(words),
+            'height': [height // 10] * len(words),
+        }
+
+    def get_languages(self, **kwargs):
+        return ['eng']
+
+
+def make_stub_gtts(seconds_per_char=0.0005):
+    """Return a ``gTTS`` replacement class with the given per-character cost."""
+
+    class StubGTTS:
+        def __init__(self, text, lang='en', slow=False, **kwargs):
+            self.text = text
+
+        def write_to_fp(self, fp):
+            time.sleep(len(self.text) * seconds_per_char)
+            # Roughly gTTS's output size: ~1 KB of 32 kbit/s MP3 per character
+            fp.write(b'\xff\xfb\x90\x00' * (len(self.text) * 256))
+
+    return StubGTTS
+
+
+def install(speech_rtf=0.05, ocr_seconds_per_mpix=0.05, tts_seconds_per_char=0.0005):
+    """Swap every backend for its stub. Call before the app handles requests.
+
+    The services load their backends lazily, so the real libraries are never
+    imported and stub runs work where torch or Tesseract are not installed.
+    """
+    from app.services.ocr_service import ocr_service
+    from app.services.speech_to_text_service import speech_service
+    from app.services.text_to_speech_service import tts_service
+
+    model = StubWhisperModel(rtf=speech_rtf)
+    speech_service.get_model = lambda name=None: model
+    speech_service._language_probs = lambda model, audio_path: model.language_probs(audio_path)
+    ocr_service.tesseract = StubTesseract(ocr_seconds_per_mpix)
+    tts_service.gtts = make_stub_gtts(tts_seconds_per_char)
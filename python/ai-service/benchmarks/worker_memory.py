@@ -0,0 +1,136 @@
+"""Per-worker memory of the speech service with and without shared Whisper weights.
+
+Starts ``uvicorn main:app --workers N`` with the model preloaded in every
+worker, once with ``WHISPER_SHARE_WEIGHTS=false`` (each worker loads its own
+copy) and once with ``true`` (weights memory-mapped from one fp32 file).
+For every worker it reads ``/proc/<pid>/smaps_rollup`` and reports RSS, PSS
+(RSS with shared pages split between the processes sharing them) and
+private memory. PSS/private per worker is what actually limits how many
+workers fit on a node. Linux only; needs the real whisper/torch installed.
+
+Usage (from python/ai-service)::
+
+    python -m benchmarks.worker_memory --workers 4 --model base --output memory.json
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+def smaps_rollup(pid):
+    """Memory summary of ``pid`` in MB: Rss, Pss, Shared_Clean and Private (clean + dirty)."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss_mb': round(values.get('Rss', 0), 1),
+        'pss_mb': round(values.get('Pss', 0), 1),
+        'shared_clean_mb': round(values.get('Shared_Clean', 0), 1),
+        'private_mb': round(values.get('Private_Clean', 0) + values.get('Private_Dirty', 0), 1),
+    }
+
+
+def child_pids(parent):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                # Field 4 is the parent pid; the command name may contain spaces
+                fields = stat.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            children.append(int(entry))
+    return children
+
+
+def run(args, share):
+    env = dict(
+        os.environ,
+        ENABLED_SERVICES='speech',
+        WHISPER_MODEL=args.model,
+        WHISPER_PRELOAD='true',
+        WHISPER_SHARE_WEIGHTS='true' if share else 'false',
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(args.port), '--workers', str(args.workers)],
+        cwd=SERVICE_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+
+    ready = []
+
+    def watch_output():
+        for line in server.stdout:
+            if line.startswith('Startup: ready'):
+                ready.append(line)
+
+    threading.Thread(target=watch_output, daemon=True).start()
+    try:
+        deadline = time.monotonic() + args.timeout
+        while len(ready) < args.workers:
+            if time.monotonic() > deadline or server.poll() is not None:
+                raise RuntimeError(f'{args.workers} workers did not become ready')
+            time.sleep(0.5)
+        urllib.request.urlopen(f'http://127.0.0.1:{args.port}/health', timeout=10).read()
+        # Let allocator activity from startup settle
+        time.sleep(args.settle)
+
+        # uvicorn's supervisor spawns the workers, plus multiprocessing's
+        # resource tracker, which is not a worker
+        workers = []
+        for pid in child_pids(server.pid):
+            with open(f'/proc/{pid}/cmdline', 'rb') as cmdline:
+                if b'resource_tracker' in cmdline.read():
+                    continue
+            workers.append(smaps_rollup(pid))
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    return {
+        'workers': workers,
+        'total_rss_mb': round(sum(w['rss_mb'] for w in workers), 1),
+        'total_pss_mb': round(sum(w['pss_mb'] for w in workers), 1),
+        'mean_private_mb': round(sum(w['private_mb'] for w in workers) / max(len(workers), 1), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--settle', type=float, default=3.0)
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    results = {}
+    for mode, share in (('private', False), ('shared', True)):
+        results[mode] = run(args, share)
+        print(f'{mode:<8} {len(results[mode]["workers"])} workers  total RSS {results[mode]["total_rss_mb"]}MB  '
+              f'total PSS {results[mode]["total_pss_mb"]}MB  private/worker {results[mode]["mean_private_mb"]}MB')
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'settings': vars(args), 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
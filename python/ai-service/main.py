@@ -1,11 +1,62 @@
-from fastapi import FastAPI
+from app.core.startup import startup_report
+
+import asyncio
+import importlib
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import speech_to_text, ocr, text_to_speech
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.core.config import settings
+from app.core.concurrency import LIMITERS, ServiceBusy, prometheus_metrics
+from app.utils.uploads import RequestSizeLimitMiddleware
+
+# uvicorn only configures its own loggers; give the root logger a stderr
+# handler (unless the server set one up) and let this module log at INFO
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# name in ENABLED_SERVICES: (router module, prefix, tag, name shown on /)
+SERVICE_ROUTERS = {
+    "speech": ("app.api.endpoints.speech_to_text", "/api/v1/speech", "Speech-to-Text", "speech-to-text"),
+    "ocr": ("app.api.endpoints.ocr", "/api/v1/ocr", "OCR", "ocr"),
+    "tts": ("app.api.endpoints.text_to_speech", "/api/v1/tts", "Text-to-Speech", "text-to-speech"),
+    "capture": ("app.api.endpoints.capture", "/api/v1/capture", "Capture", "capture"),
+}
+
+unknown_services = set(settings.ENABLED_SERVICES) - set(SERVICE_ROUTERS)
+if unknown_services:
+    raise ValueError(
+        f"Unknown ENABLED_SERVICES: {', '.join(sorted(unknown_services))} "
+        f"(expected any of {', '.join(SERVICE_ROUTERS)})"
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.WHISPER_PRELOAD and "speech" in settings.ENABLED_SERVICES:
+        from app.services.speech_to_text_service import speech_service
+        await asyncio.to_thread(speech_service.load_model)
+        if settings.LANGUAGE_ID_ENABLED:
+            await asyncio.to_thread(speech_service.get_model, settings.LANGUAGE_ID_MODEL)
+    startup_report.mark_ready()
+    logger.info(startup_report.summary())
+    yield
+    if "capture" in settings.ENABLED_SERVICES:
+        from app.services.notes_client import notes_client
+        await notes_client.aclose()
 
+
+# No default_response_class: for routes with a response model FastAPI (>= 0.130)
+# serializes straight to JSON bytes with Pydantic's Rust core, and setting any
+# custom class, ORJSONResponse included, turns that off. For long transcripts
+# it is ~30x faster than the JSONResponse path; see benchmarks/json_benchmark.py.
 app = FastAPI(
     title="AI Services API",
     description="FastAPI backend for AI services including Speech-to-Text, OCR, and Text-to-Speech",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -17,23 +68,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(speech_to_text.router, prefix="/api/v1/speech", tags=["Speech-to-Text"])
-app.include_router(ocr.router, prefix="/api/v1/ocr", tags=["OCR"])
-app.include_router(text_to_speech.router, prefix="/api/v1/tts", tags=["Text-to-Speech"])
+# Refuse oversized uploads while they stream in, before multipart parsing
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_body_size=settings.MAX_UPLOAD_SIZE + settings.MAX_REQUEST_OVERHEAD
+)
+
+# Include routers for the enabled services only. Their backends (whisper
+# and torch, pytesseract, gTTS) are imported on first use.
+for service in settings.ENABLED_SERVICES:
+    module_name, prefix, tag, _ = SERVICE_ROUTERS[service]
+    with startup_report.measure(f"router:{service}"):
+        module = importlib.import_module(module_name)
+    app.include_router(module.router, prefix=prefix, tags=[tag])
 
 @app.get("/")
 async def root():
     return {
         "message": "AI Services API",
         "version": "1.0.0",
-        "services": ["speech-to-text", "ocr", "text-to-speech"]
+        "services": [SERVICE_ROUTERS[service][3] for service in settings.ENABLED_SERVICES]
     }
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Queue depth and wait times per backend, for autoscaling, plus
+    # startup/import costs to catch cold-start regressions
+    limiters = [limiter for limiter in LIMITERS if limiter.service in settings.ENABLED_SERVICES]
+    return prometheus_metrics(limiters) + startup_report.prometheus_metrics()
+
+@app.exception_handler(ServiceBusy)
+async def service_busy_handler(request: Request, exc: ServiceBusy):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
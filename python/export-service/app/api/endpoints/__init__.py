@@ -1,5 +1,5 @@
 from flask import Blueprint
-from notes import notes_bp
-from export import export_bp
+from .notes import notes_bp
+from .export import export_bp
 
 __all__ = ['notes_bp', 'export_bp']
@@ -1,31 +1,139 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context, url_for
 from pathlib import Path
-from ...core.database import db
+from ...core.config import Config
+from ...core.database import db, read_count, read_stream
 from ...models.note import Note
-from ...services.export_service import ExportService
+from ...services.export_service import ExportService, ExportedFile, InvalidFilename
+from ...services.export_jobs import ExportJobService, ExportQueueFull
+from ...services.exporters import EXPORTERS, EXPORT_FORMATS
+from ...services.pdf_themes import THEMES, DEFAULT_THEME
 
 export_bp = Blueprint('export', __name__)
 export_service = ExportService()
+export_job_service = ExportJobService(export_service)
+
+
+def _attachment(chunks, mimetype, filename, size=None):
+    response = Response(chunks, mimetype=mimetype, direct_passthrough=True)
+    response.headers.set('Content-Disposition', 'attachment', filename=filename)
+    if size is not None:
+        response.headers['Content-Length'] = str(size)
+    return response
+
+
+def _send_export(exported):
+    """Stream a finished export back in chunks; spooled buffers are released afterwards.
+
+    Output size and build time go in ``X-Export-*`` headers, so clients can
+    weigh ``compact`` against build time per request.
+    """
+    size = exported.size
+    response = _attachment(
+        exported.iter_chunks(Config.EXPORT_STREAM_CHUNK_SIZE),
+        'application/pdf',
+        exported.filename,
+        size=size
+    )
+    response.headers['X-Export-Size'] = str(size)
+    if exported.build_seconds is not None:
+        response.headers['X-Export-Build-Time'] = f'{exported.build_seconds:.3f}'
+    if exported.compact is not None:
+        response.headers['X-Export-Compact'] = 'true' if exported.compact else 'false'
+    response.call_on_close(exported.close)
+    return response
+
+
+def _compact_option(data):
+    """The request's ``compact`` flag, or ``None`` for the configured default."""
+    compact = data.get('compact')
+    return None if compact is None else bool(compact)
+
+
+def _stream_notes(export_format, notes, filename):
+    """Stream a multi-note export in one of the non-PDF formats as it is generated."""
+    exporter = EXPORTERS[export_format]
+    # The generator keeps reading from the database cursor while the response
+    # is sent, so it needs the request context to stay alive.
+    return _attachment(
+        stream_with_context(exporter.stream_notes(notes)),
+        exporter.mimetype,
+        filename or exporter.default_filename()
+    )
+
+
+def _invalid_format_response(export_format):
+    if export_format in EXPORT_FORMATS:
+        return None
+    return jsonify({
+        'success': False,
+        'error': f"Unknown format '{export_format}'. Available formats: {', '.join(EXPORT_FORMATS)}"
+    }), 400
+
+
+def _invalid_theme_response(theme):
+    if theme is None or theme in THEMES:
+        return None
+    return jsonify({
+        'success': False,
+        'error': f"Unknown theme '{theme}'. Available themes: {', '.join(sorted(THEMES))}"
+    }), 400
+
+
+@export_bp.route('/themes', methods=['GET'])
+def list_themes():
+    return jsonify({
+        'success': True,
+        'data': sorted(THEMES),
+        'default': DEFAULT_THEME
+    }), 200
+
+
+@export_bp.route('/formats', methods=['GET'])
+def list_formats():
+    return jsonify({
+        'success': True,
+        'data': list(EXPORT_FORMATS),
+        'default': 'pdf'
+    }), 200
 
 
 @export_bp.route('/note/<int:note_id>', methods=['POST'])
 def export_note(note_id):
     try:
-        note = Note.query.get_or_404(note_id)
+        note = Note.get_or_404(note_id)
 
         # Get optional filename from request (silent=True handles empty body)
         data = request.get_json(silent=True) or {}
         filename = data.get('filename')
+        theme = data.get('theme')
+        persist = data.get('persist')
+        export_format = data.get('format', 'pdf')
 
-        # Generate PDF
-        pdf_path = export_service.export_note_to_pdf(note, filename)
+        invalid = _invalid_format_response(export_format) or _invalid_theme_response(theme)
+        if invalid:
+            return invalid
 
-        return send_file(
-            str(pdf_path),
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=pdf_path.name
+        if export_format != 'pdf':
+            exporter = EXPORTERS[export_format]
+            content = exporter.render_note(note)
+            return _attachment(
+                [content],
+                exporter.mimetype,
+                filename or exporter.default_filename(note),
+                size=len(content)
+            )
+
+        # Generate PDF
+        exported = export_service.export_note_to_pdf(
+            note, filename, theme=theme, persist=persist, compact=_compact_option(data)
         )
+
+        return _send_export(exported)
+    except InvalidFilename as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -39,6 +147,9 @@ def export_notes():
         data = request.get_json(silent=True) or {}
         note_ids = data.get('note_ids', [])
         filename = data.get('filename')
+        theme = data.get('theme')
+        persist = data.get('persist')
+        export_format = data.get('format', 'pdf')
 
         if not note_ids:
             return jsonify({
@@ -46,24 +157,45 @@ def export_notes():
                 'error': 'note_ids array is required'
             }), 400
 
-        # Fetch notes
-        notes = Note.query.filter(Note.id.in_(note_ids)).all()
+        invalid = _invalid_format_response(export_format) or _invalid_theme_response(theme)
+        if invalid:
+            return invalid
+
+        # Stream just the columns the export needs instead of loading every note
+        statement = Note.export_rows().where(Note.id.in_(note_ids))
+        total = read_count(statement)
 
-        if not notes:
+        if not total:
             return jsonify({
                 'success': False,
                 'error': 'No notes found with the provided IDs'
             }), 404
 
-        # Generate PDF
-        pdf_path = export_service.export_multiple_notes_to_pdf(notes, filename)
+        if export_format != 'pdf':
+            return _stream_notes(
+                export_format,
+                read_stream(statement, Config.EXPORT_STREAM_BATCH_SIZE),
+                filename
+            )
 
-        return send_file(
-            str(pdf_path),
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=pdf_path.name
+        # Generate PDF
+        exported = export_service.export_multiple_notes_to_pdf(
+            read_stream(statement, Config.EXPORT_STREAM_BATCH_SIZE),
+            filename,
+            theme=theme,
+            persist=persist,
+            parallel=data.get('parallel'),
+            bookmarks=bool(data.get('bookmarks', False)),
+            total=total,
+            compact=_compact_option(data)
         )
+
+        return _send_export(exported)
+    except InvalidFilename as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -74,9 +206,11 @@ def export_notes():
 @export_bp.route('/all', methods=['POST'])
 def export_all_notes():
     try:
-        notes = Note.query.order_by(Note.created_at.desc()).all()
+        # Stream just the columns the export needs instead of loading every note
+        statement = Note.export_rows().order_by(Note.created_at.desc())
+        total = read_count(statement)
 
-        if not notes:
+        if not total:
             return jsonify({
                 'success': False,
                 'error': 'No notes available to export'
@@ -85,19 +219,151 @@ def export_all_notes():
         # Get optional filename from request (silent=True handles empty body)
         data = request.get_json(silent=True) or {}
         filename = data.get('filename')
+        theme = data.get('theme')
+        persist = data.get('persist')
+        export_format = data.get('format', 'pdf')
+
+        invalid = _invalid_format_response(export_format) or _invalid_theme_response(theme)
+        if invalid:
+            return invalid
+
+        if export_format != 'pdf':
+            return _stream_notes(
+                export_format,
+                read_stream(statement, Config.EXPORT_STREAM_BATCH_SIZE),
+                filename
+            )
 
         # Generate PDF
-        pdf_path = export_service.export_multiple_notes_to_pdf(notes, filename)
+        exported = export_service.export_multiple_notes_to_pdf(
+            read_stream(statement, Config.EXPORT_STREAM_BATCH_SIZE),
+            filename,
+            theme=theme,
+            persist=persist,
+            parallel=data.get('parallel'),
+            bookmarks=bool(data.get('bookmarks', False)),
+            total=total,
+            compact=_compact_option(data)
+        )
 
-        return send_file(
-            str(pdf_path),
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=pdf_path.name
+        return _send_export(exported)
+    except InvalidFilename as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@export_bp.route('/jobs', methods=['POST'])
+def create_export_job():
+    try:
+        data = request.get_json(silent=True) or {}
+        note_ids = data.get('note_ids')
+        filename = data.get('filename')
+        theme = data.get('theme')
+
+        if note_ids is not None and (not isinstance(note_ids, list) or not note_ids):
+            return jsonify({
+                'success': False,
+                'error': 'note_ids must be a non-empty array when provided'
+            }), 400
+
+        invalid = _invalid_theme_response(theme)
+        if invalid:
+            return invalid
+
+        job = export_job_service.submit(
+            current_app._get_current_object(),
+            note_ids=note_ids,
+            filename=filename,
+            theme=theme,
+            bookmarks=bool(data.get('bookmarks', False)),
+            compact=_compact_option(data)
         )
+
+        response = jsonify({
+            'success': True,
+            'data': job.to_dict(),
+            'message': 'Export job accepted'
+        })
+        response.status_code = 202
+        response.headers['Location'] = url_for('export.get_export_job', job_id=job.id)
+        return response
+    except ExportQueueFull as e:
+        response = jsonify({
+            'success': False,
+            'error': str(e)
+        })
+        response.status_code = 429
+        response.headers['Retry-After'] = '30'
+        return response
+    except InvalidFilename as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+
+@export_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_export_job(job_id):
+    try:
+        job = export_job_service.get(job_id)
+
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': 'Export job not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@export_bp.route('/jobs/<job_id>/download', methods=['GET'])
+def download_export_job(job_id):
+    try:
+        job = export_job_service.get(job_id)
+
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': 'Export job not found'
+            }), 404
+
+        if job.status != job.COMPLETED:
+            return jsonify({
+                'success': False,
+                'error': f'Export job is {job.status}',
+                'data': job.to_dict()
+            }), 409
+
+        path = export_job_service.result_path(job)
+        if path is None:
+            return jsonify({
+                'success': False,
+                'error': 'Export file has expired'
+            }), 410
+
+        return _send_export(ExportedFile(job.filename, path=path))
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -1,18 +1,38 @@
+import math
 from flask import Blueprint, request, jsonify
-from ...core.database import db
-from ...models.note import Note
+from sqlalchemy.orm.exc import StaleDataError
+from ...core.database import db, read_rows
+from ...models.note import Note, NoteListItem
+from ...services.note_changes import NoteChangeFeed, ChangesExpired
+from ...services.note_revisions import NoteRevisionService, InvalidEdit, apply_ops, diff_ops
 
 notes_bp = Blueprint('notes', __name__)
+revision_service = NoteRevisionService()
+change_feed = NoteChangeFeed()
+
+
+def _version_conflict(current_version):
+    return jsonify({
+        'success': False,
+        'error': 'Note has been modified since the given version',
+        'current_version': current_version
+    }), 409
 
 
 @notes_bp.route('', methods=['GET'])
 def get_notes():
     try:
-        notes = Note.query.order_by(Note.updated_at.desc()).all()
+        # Read before the list, so changes made while it is read are not skipped
+        # by a client that continues from here with /changes
+        change_seq = change_feed.current_seq()
+        # Plain rows instead of ORM objects, serialized without per-note dicts
+        rows = read_rows(Note.list_rows().order_by(Note.updated_at.desc()))
+        notes = [NoteListItem(*row) for row in rows]
         return jsonify({
             'success': True,
-            'data': [note.to_dict() for note in notes],
-            'count': len(notes)
+            'data': notes,
+            'count': len(notes),
+            'change_seq': change_seq
         }), 200
     except Exception as e:
         return jsonify({
@@ -21,10 +41,64 @@ def get_notes():
         }), 500
 
 
+@notes_bp.route('/changes', methods=['GET'])
+def get_changes():
+    """Notes created, updated or deleted after ``since``, for incremental sync.
+
+    Query parameters: ``since`` (the ``next_since`` of the previous page, or 0
+    for everything), ``limit`` and ``wait``. With ``wait`` > 0 and nothing
+    new, the request is held for up to that many seconds until a change
+    arrives (long-poll). When the worker already has
+    ``NOTE_CHANGES_MAX_WAITERS`` long-polls waiting, the empty page is
+    returned at once with a ``Retry-After`` header instead. Deleted notes
+    come back as tombstones. Keep calling with ``next_since`` while
+    ``has_more`` is true. A 410 means ``since`` is older than the kept
+    tombstones and the client must sync from 0.
+    """
+    try:
+        since = request.args.get('since', 0, type=int)
+        limit = request.args.get('limit', type=int)
+        wait = request.args.get('wait', 0, type=float)
+
+        if since < 0:
+            return jsonify({
+                'success': False,
+                'error': 'since must not be negative'
+            }), 400
+
+        notes, has_more = change_feed.changes(since, limit)
+        headers = {}
+        if not notes and wait > 0:
+            with change_feed.wait_slot() as waiting:
+                if not waiting:
+                    headers['Retry-After'] = str(math.ceil(min(wait, change_feed.max_wait)))
+                elif change_feed.wait_for_changes(since, wait):
+                    notes, has_more = change_feed.changes(since, limit)
+
+        return jsonify({
+            'success': True,
+            'data': [note.to_change_dict() for note in notes],
+            'count': len(notes),
+            'next_since': notes[-1].change_seq if notes else since,
+            'has_more': has_more
+        }), 200, headers
+    except ChangesExpired as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'purged_through': e.purged_through
+        }), 410
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @notes_bp.route('/<int:note_id>', methods=['GET'])
 def get_note(note_id):
     try:
-        note = Note.query.get_or_404(note_id)
+        note = Note.get_or_404(note_id)
         return jsonify({
             'success': True,
             'data': note.to_dict()
@@ -53,6 +127,8 @@ def create_note():
         )
 
         db.session.add(note)
+        db.session.flush()
+        revision_service.record_created(note)
         db.session.commit()
 
         return jsonify({
@@ -71,7 +147,7 @@ def create_note():
 @notes_bp.route('/<int:note_id>', methods=['PUT'])
 def update_note(note_id):
     try:
-        note = Note.query.get_or_404(note_id)
+        note = Note.get_or_404(note_id)
         data = request.get_json()
 
         if not data:
@@ -80,11 +156,22 @@ def update_note(note_id):
                 'error': 'No data provided'
             }), 400
 
+        # Optional optimistic concurrency check, as on PATCH
+        if 'version' in data and data['version'] != note.version:
+            return _version_conflict(note.version)
+
+        previous_version, previous_title, previous_content = note.version, note.title, note.content
         if 'title' in data:
             note.title = data['title']
         if 'content' in data:
             note.content = data['content']
 
+        if note.title != previous_title or note.content != previous_content:
+            db.session.flush()
+            revision_service.record_update(
+                note, previous_version, previous_title, previous_content,
+                diff_ops(previous_content, note.content)
+            )
         db.session.commit()
 
         return jsonify({
@@ -92,6 +179,95 @@ def update_note(note_id):
             'data': note.to_dict(),
             'message': 'Note updated successfully'
         }), 200
+    except StaleDataError:
+        db.session.rollback()
+        return _version_conflict(db.session.get(Note, note_id).version)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404 if '404' in str(e) else 500
+
+
+@notes_bp.route('/<int:note_id>', methods=['PATCH'])
+def patch_note(note_id):
+    """Apply edit operations to a note instead of resending its content.
+
+    Body: ``{"base_version": 7, "ops": [{"start": 10, "end": 12, "text": "new"}],
+    "title": "optional"}``. Offsets refer to the content at ``base_version``;
+    if the note has moved on since, nothing is applied and 409 is returned
+    with the current version so the client can rebase. The response carries
+    the new version but not the content, which the client already has.
+
+    Offsets count Unicode code points. JavaScript clients, whose string
+    indexes count UTF-16 code units, send ``"offset_unit": "utf-16"``; the
+    two only differ after characters outside the BMP such as emoji.
+
+    ``{"append": "text", "separator": "\\n\\n"}`` instead of ``ops`` adds
+    text to the end of whatever the note holds now, joined by ``separator``
+    (default two newlines) unless the note is empty, so ``base_version``
+    is optional. A 409 then only means another write landed at the same
+    moment; sending it again is safe.
+    """
+    try:
+        note = Note.get_or_404(note_id)
+        data = request.get_json()
+
+        appending = bool(data) and 'append' in data
+        if not data or ('base_version' not in data and not appending):
+            return jsonify({
+                'success': False,
+                'error': 'base_version is required'
+            }), 400
+
+        if 'base_version' in data and data['base_version'] != note.version:
+            return _version_conflict(note.version)
+
+        if appending:
+            text, separator = data['append'], data.get('separator', '\n\n')
+            if 'ops' in data or not isinstance(text, str) or not isinstance(separator, str):
+                return jsonify({
+                    'success': False,
+                    'error': 'append and separator must be strings, and cannot be combined with ops'
+                }), 400
+            end = len(note.content)
+            requested_ops, offset_unit = [[end, end, separator + text if end else text]], 'codepoint'
+        else:
+            requested_ops, offset_unit = data.get('ops', []), data.get('offset_unit', 'codepoint')
+
+        try:
+            content, ops = apply_ops(note.content, requested_ops, offset_unit)
+        except InvalidEdit as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        previous_version, previous_title, previous_content = note.version, note.title, note.content
+        if 'title' in data:
+            if not data['title']:
+                return jsonify({
+                    'success': False,
+                    'error': 'Title cannot be empty'
+                }), 400
+            note.title = data['title']
+        note.content = content
+
+        if note.title != previous_title or note.content != previous_content:
+            db.session.flush()
+            revision_service.record_update(note, previous_version, previous_title, previous_content, ops)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'data': note.to_dict(include_content=False),
+            'message': 'Note updated successfully'
+        }), 200
+    except StaleDataError:
+        # Another request saved a new version between our read and write
+        db.session.rollback()
+        return _version_conflict(db.session.get(Note, note_id).version)
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -100,11 +276,59 @@ def update_note(note_id):
         }), 404 if '404' in str(e) else 500
 
 
+@notes_bp.route('/<int:note_id>/revisions', methods=['GET'])
+def get_note_revisions(note_id):
+    try:
+        Note.get_or_404(note_id)
+        revisions = revision_service.history(note_id)
+        return jsonify({
+            'success': True,
+            'data': [revision.to_dict() for revision in revisions],
+            'count': len(revisions)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404 if '404' in str(e) else 500
+
+
+@notes_bp.route('/<int:note_id>/revisions/<int:version>', methods=['GET'])
+def get_note_revision(note_id, version):
+    try:
+        Note.get_or_404(note_id)
+        found = revision_service.at_version(note_id, version)
+        if found is None:
+            return jsonify({
+                'success': False,
+                'error': f'Version {version} of note {note_id} not found'
+            }), 404
+
+        revision, content = found
+        return jsonify({
+            'success': True,
+            'data': {
+                'id': note_id,
+                'version': revision.version,
+                'title': revision.title,
+                'content': content,
+                'created_at': revision.created_at.isoformat() if revision.created_at else None
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404 if '404' in str(e) else 500
+
+
 @notes_bp.route('/<int:note_id>', methods=['DELETE'])
 def delete_note(note_id):
     try:
-        note = Note.query.get_or_404(note_id)
-        db.session.delete(note)
+        note = Note.get_or_404(note_id)
+        revision_service.delete_history(note_id)
+        # Kept as a tombstone so clients can sync the deletion
+        change_feed.delete(note)
         db.session.commit()
 
         return jsonify({
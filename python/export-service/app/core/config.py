@@ -5,11 +5,134 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
+def _normalize_database_url(url):
+    # SQLAlchemy 2.x no longer accepts the legacy 'postgres://' scheme
+    if url and url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{BASE_DIR}/notes.db'
+    SQLALCHEMY_DATABASE_URI = _normalize_database_url(os.environ.get('DATABASE_URL')) or f'sqlite:///{BASE_DIR}/notes.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     EXPORT_DIR = BASE_DIR / 'exports'
 
+    # Optional read replica used by the list/export queries
+    DATABASE_REPLICA_URL = _normalize_database_url(os.environ.get('DATABASE_REPLICA_URL'))
+
+    # SQLite tuning (ignored for other backends)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+    # Note history: every Nth version (or any edit bigger than half the
+    # note) is stored in full, the rest as compressed edit deltas
+    NOTE_REVISION_SNAPSHOT_INTERVAL = int(os.environ.get('NOTE_REVISION_SNAPSHOT_INTERVAL', 25))
+
+    # Sync change feed (/api/notes/changes): page sizes, the long-poll cap and
+    # how often it checks for changes, and how long tombstones of deleted
+    # notes are kept for clients to sync
+    NOTE_CHANGES_PAGE_SIZE = int(os.environ.get('NOTE_CHANGES_PAGE_SIZE', 200))
+    NOTE_CHANGES_MAX_PAGE_SIZE = int(os.environ.get('NOTE_CHANGES_MAX_PAGE_SIZE', 1000))
+    NOTE_CHANGES_MAX_WAIT_SECONDS = float(os.environ.get('NOTE_CHANGES_MAX_WAIT_SECONDS', 30))
+    NOTE_CHANGES_POLL_INTERVAL_SECONDS = float(os.environ.get('NOTE_CHANGES_POLL_INTERVAL_SECONDS', 0.5))
+    NOTE_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('NOTE_TOMBSTONE_RETENTION_DAYS', 90))
+
+    # JSON provider for API responses: 'orjson' (falls back to 'stdlib' when
+    # orjson is not installed) or 'stdlib'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+    # Sort dict keys in JSON output, as Flask does by default. Turning it off
+    # saves a little time on large responses.
+    JSON_SORT_KEYS = os.environ.get('JSON_SORT_KEYS', 'true').lower() in ('1', 'true', 'yes')
+
+    # Connection pool tuning for server databases (Postgres)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+
+    # Production server (gunicorn) settings, see gunicorn.conf.py
+    WEB_BIND = os.environ.get('WEB_BIND', '0.0.0.0:5000')
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', (os.cpu_count() or 1) * 2 + 1))
+    # Threads per worker (gthread when > 1); long-polls of the change feed
+    # park a thread each while they wait
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', 4))
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', 120))
+    WEB_GRACEFUL_TIMEOUT = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+    WEB_KEEPALIVE = int(os.environ.get('WEB_KEEPALIVE', 5))
+    WEB_MAX_REQUESTS = int(os.environ.get('WEB_MAX_REQUESTS', 1000))
+    WEB_MAX_REQUESTS_JITTER = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', 100))
+
+    # Long-polls of the change feed allowed to wait at once per process;
+    # beyond this, and always on single-threaded workers, ``wait`` is
+    # ignored and the request is answered straight away
+    NOTE_CHANGES_MAX_WAITERS = int(os.environ.get('NOTE_CHANGES_MAX_WAITERS', WEB_THREADS // 2))
+
+    # Exports are built in a spooled buffer and streamed back; writing them to
+    # EXPORT_DIR is opt-in and subject to the retention policy below.
+    EXPORT_PERSIST = os.environ.get('EXPORT_PERSIST', 'false').lower() in ('1', 'true', 'yes')
+    EXPORT_SPOOL_MAX_MEMORY = int(os.environ.get('EXPORT_SPOOL_MAX_MEMORY', 8 * 1024 * 1024))
+    EXPORT_STREAM_CHUNK_SIZE = int(os.environ.get('EXPORT_STREAM_CHUNK_SIZE', 64 * 1024))
+    EXPORT_RETENTION_SECONDS = int(os.environ.get('EXPORT_RETENTION_SECONDS', 24 * 60 * 60))
+    EXPORT_DIR_MAX_BYTES = int(os.environ.get('EXPORT_DIR_MAX_BYTES', 500 * 1024 * 1024))
+
+    # Compact PDFs (per-request "compact" overrides): page streams
+    # recompressed without ReportLab's ASCII85 layer, and fonts shared by
+    # stitched-together parts stored once. About a sixth smaller, for some
+    # extra build time.
+    EXPORT_COMPACT = os.environ.get('EXPORT_COMPACT', 'false').lower() in ('1', 'true', 'yes')
+
+    # Bulk exports stream notes from the database in batches of this size
+    EXPORT_STREAM_BATCH_SIZE = int(os.environ.get('EXPORT_STREAM_BATCH_SIZE', 200))
+
+    # Large multi-note exports are rendered in groups across a process pool
+    # and stitched together; below EXPORT_PARALLEL_MIN_NOTES they stay serial.
+    # Every web worker owns its own pool, so the default splits the CPUs
+    # between the WEB_CONCURRENCY workers (1, i.e. serial, with the default
+    # worker count); see gunicorn.conf.py.
+    EXPORT_PARALLEL_WORKERS = int(os.environ.get(
+        'EXPORT_PARALLEL_WORKERS', max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)
+    ))
+    EXPORT_PARALLEL_MIN_NOTES = int(os.environ.get('EXPORT_PARALLEL_MIN_NOTES', 200))
+    EXPORT_PARALLEL_CHUNK_SIZE = int(os.environ.get('EXPORT_PARALLEL_CHUNK_SIZE', 50))
+
+    # Rendered per-note PDF fragments, reused until a note's updated_at
+    # changes (note numbers are stamped on at merge time). Off by default:
+    # it pays off for repeated exports of mostly unchanged notes, and costs
+    # disk and a cache write per note otherwise.
+    EXPORT_FRAGMENT_CACHE = os.environ.get('EXPORT_FRAGMENT_CACHE', 'false').lower() in ('1', 'true', 'yes')
+    EXPORT_FRAGMENT_CACHE_DIR = Path(os.environ.get('EXPORT_FRAGMENT_CACHE_DIR', BASE_DIR / 'cache' / 'fragments'))
+    EXPORT_FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get('EXPORT_FRAGMENT_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+    # Background export jobs: worker threads per process, how many jobs may
+    # wait behind them, and when an unfinished job is considered dead.
+    # Rendering holds the GIL, so more than one job thread per web worker
+    # only slows the others down.
+    EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', 1))
+    EXPORT_JOB_MAX_PENDING = int(os.environ.get('EXPORT_JOB_MAX_PENDING', 8))
+    EXPORT_JOB_TIMEOUT_SECONDS = int(os.environ.get('EXPORT_JOB_TIMEOUT_SECONDS', 60 * 60))
+
     # Create export directory if it doesn't exist
     EXPORT_DIR.mkdir(exist_ok=True)
+
+
+def engine_options(config, url):
+    """Build SQLAlchemy engine options for ``url`` from the tuning knobs in ``config``."""
+    if url.startswith('sqlite'):
+        # The busy timeout is also applied as a pragma on connect; passing it
+        # to the driver covers the window before the pragma runs.
+        return {
+            'connect_args': {
+                'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+                'check_same_thread': False,
+            },
+        }
+
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
@@ -1,3 +1,110 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, func, inspect, select, text
+from .config import engine_options
 
 db = SQLAlchemy()
+
+
+def init_db(app):
+    """Apply engine tuning from the app config and bind ``db`` to ``app``."""
+    config = app.config
+    primary_url = config['SQLALCHEMY_DATABASE_URI']
+
+    config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(config, primary_url))
+
+    replica_url = config.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds.setdefault('replica', {
+            'url': replica_url,
+            **engine_options(config, replica_url),
+        })
+        config['SQLALCHEMY_BINDS'] = binds
+
+    db.init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                _register_sqlite_pragmas(engine, config)
+
+
+def add_missing_columns():
+    """Add columns that exist on the models but not yet in the database.
+
+    ``db.create_all()`` only creates missing tables. Until the service has
+    real migrations, this covers purely additive column changes: each
+    missing column is added with its ``server_default`` (required for
+    NOT NULL columns, so existing rows get a value), followed by the
+    table's indexes that cover it.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            added = set()
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                added.add(column.name)
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}'
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    ddl += f" DEFAULT '{default}'" if isinstance(default, str) else f' DEFAULT {default}'
+                    if not column.nullable:
+                        ddl += ' NOT NULL'
+                connection.execute(text(ddl))
+
+            for index in table.indexes:
+                if added.intersection(column.name for column in index.columns):
+                    index.create(connection, checkfirst=True)
+
+
+def _register_sqlite_pragmas(engine, config):
+    journal_mode = config['SQLITE_JOURNAL_MODE']
+    synchronous = config['SQLITE_SYNCHRONOUS']
+    busy_timeout = int(config['SQLITE_BUSY_TIMEOUT_MS'])
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+        cursor.execute(f'PRAGMA synchronous={synchronous}')
+        cursor.execute(f'PRAGMA busy_timeout={busy_timeout}')
+        cursor.close()
+
+
+def read_engine():
+    """Engine for read-only list/export queries: the replica if configured, else the primary."""
+    return db.engines.get('replica', db.engine)
+
+
+def read_scalars(statement):
+    """Execute a SELECT against :func:`read_engine` and return the ORM scalar results."""
+    return db.session.scalars(statement, bind_arguments={'bind': read_engine()})
+
+
+def read_rows(statement):
+    """Execute a SELECT against :func:`read_engine` and return the plain rows."""
+    return db.session.execute(statement, bind_arguments={'bind': read_engine()})
+
+
+def read_count(statement):
+    """Number of rows ``statement`` would return, counted on :func:`read_engine`."""
+    count = select(func.count()).select_from(statement.order_by(None).subquery())
+    return db.session.scalar(count, bind_arguments={'bind': read_engine()})
+
+
+def read_stream(statement, batch_size):
+    """Execute a SELECT against :func:`read_engine`, fetching ``batch_size`` rows at a time.
+
+    Uses a server-side cursor where the driver supports one, so iterating the
+    result never holds more than one batch in memory.
+    """
+    return db.session.execute(
+        statement.execution_options(yield_per=batch_size),
+        bind_arguments={'bind': read_engine()}
+    )
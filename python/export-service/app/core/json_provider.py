@@ -0,0 +1,87 @@
+from dataclasses import fields, is_dataclass
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib provider is used instead
+    orjson = None
+
+
+def _default(o):
+    # Dates as ISO 8601, the format to_dict() and orjson use, rather than
+    # Flask's HTTP date format
+    if isinstance(o, date):
+        return o.isoformat()
+    if is_dataclass(o) and not isinstance(o, type):
+        # Shallow, unlike dataclasses.asdict() which deep-copies every value
+        return {field.name: getattr(o, field.name) for field in fields(o)}
+    return DefaultJSONProvider.default(o)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider, writing dates and datetimes as ISO 8601."""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """JSON provider backed by orjson.
+
+    Serializes datetimes, dataclasses and UUIDs in C, and builds response
+    bodies as bytes without an intermediate ``str``. Output is the same as
+    the stdlib provider's apart from non-ASCII text, which is written as
+    UTF-8 instead of escaped. Dicts with non-string keys go through the
+    stdlib encoder, which converts and sorts them differently from orjson.
+    """
+
+    def _options(self):
+        options = 0
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Options orjson has no equivalent for (indent=4, cls=...)
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=_default, option=self._options()).decode()
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj, default=_default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'orjson': OrjsonProvider,
+    'stdlib': StdlibJSONProvider,
+}
+
+
+def init_json(app):
+    """Install the provider named by ``JSON_PROVIDER``, falling back to stdlib without orjson.
+
+    ``JSON_SORT_KEYS`` sets the provider's ``sort_keys``.
+    """
+    name = app.config['JSON_PROVIDER']
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Unknown JSON_PROVIDER '{name}'. Available: {', '.join(JSON_PROVIDERS)}")
+    if name == 'orjson' and orjson is None:
+        app.logger.warning('orjson is not installed, using the stdlib JSON provider')
+        name = 'stdlib'
+    app.json = JSON_PROVIDERS[name](app)
+    app.json.sort_keys = app.config['JSON_SORT_KEYS']
@@ -1,3 +1,6 @@
-from note import Note
+from .change_counter import ChangeCounter
+from .note import Note
+from .note_revision import NoteRevision
+from .export_job import ExportJob
 
-__all__ = ['Note']
+__all__ = ['ChangeCounter', 'Note', 'NoteRevision', 'ExportJob']
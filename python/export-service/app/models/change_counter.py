@@ -0,0 +1,34 @@
+from sqlalchemy import select, update
+from app.core.database import db
+
+
+class ChangeCounter(db.Model):
+    """Named monotonically increasing counters, one row each.
+
+    Incrementing a counter updates its row, which holds the row lock until
+    the transaction commits. Writers that take numbers from the same counter
+    therefore commit in number order, so a reader that has seen number N
+    can never later find a smaller one appear (a database sequence gives no
+    such guarantee).
+    """
+    __tablename__ = 'change_counters'
+
+    NOTES = 'notes'
+    # Highest change_seq of the tombstones purged so far
+    NOTES_PURGED = 'notes_purged'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    @classmethod
+    def next_value(cls, connection, name):
+        """Increment counter ``name`` on ``connection`` and return the new value."""
+        connection.execute(update(cls).where(cls.name == name).values(value=cls.value + 1))
+        return connection.scalar(select(cls.value).where(cls.name == name))
+
+    @classmethod
+    def current_value(cls, connection, name):
+        return connection.scalar(select(cls.value).where(cls.name == name)) or 0
+
+    def __repr__(self):
+        return f'<ChangeCounter {self.name}={self.value}>'
@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+from app.core.database import db
+
+
+class ExportJob(db.Model):
+    __tablename__ = 'export_jobs'
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    note_ids = db.Column(db.JSON, nullable=True)  # None exports every note
+    theme = db.Column(db.String(50), nullable=True)
+    bookmarks = db.Column(db.Boolean, nullable=False, default=False)
+    compact = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(500), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    owner = db.Column(db.String(255), nullable=True)  # 'host:pid' of the process running it
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def is_active(self):
+        return self.status in (self.PENDING, self.RUNNING)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'progress': self.progress,
+            'note_ids': self.note_ids,
+            'theme': self.theme,
+            'bookmarks': self.bookmarks,
+            'compact': self.compact,
+            'filename': self.filename,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+    def __repr__(self):
+        return f'<ExportJob {self.id}: {self.status} {self.progress}%>'
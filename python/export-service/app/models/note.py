@@ -1,5 +1,9 @@
+from dataclasses import dataclass
 from datetime import datetime
+from sqlalchemy import event, select
+from sqlalchemy.orm import object_session
 from app.core.database import db
+from app.models.change_counter import ChangeCounter
 
 
 class Note(db.Model):
@@ -10,16 +14,104 @@ class Note(db.Model):
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped by SQLAlchemy on every UPDATE, which also checks it in the WHERE
+    # clause, so concurrent writers fail with StaleDataError instead of one
+    # silently overwriting the other
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # Position in the sync change feed, set from the 'notes' ChangeCounter
+    # on every insert and update (see below)
+    change_seq = db.Column(db.BigInteger, index=True)
+    # Deleted notes are kept as tombstones so the deletion can be synced
+    deleted_at = db.Column(db.DateTime, index=True)
 
-    def to_dict(self):
-        return {
+    __mapper_args__ = {'version_id_col': version}
+
+    @classmethod
+    def live(cls):
+        """SELECT of the notes that have not been deleted."""
+        return select(cls).where(cls.deleted_at.is_(None))
+
+    @classmethod
+    def get_or_404(cls, note_id):
+        """Like ``Note.query.get_or_404`` but a deleted note (tombstone) is also a 404."""
+        return db.first_or_404(cls.live().where(cls.id == note_id))
+
+    @classmethod
+    def list_rows(cls):
+        """SELECT of the live notes' list fields as plain rows, in :class:`NoteListItem` order."""
+        return (
+            select(cls.id, cls.title, cls.content, cls.created_at, cls.updated_at, cls.version, cls.change_seq)
+            .where(cls.deleted_at.is_(None))
+        )
+
+    @classmethod
+    def export_rows(cls):
+        """SELECT of just the columns exports render, as plain rows rather than ORM objects."""
+        return (
+            select(cls.id, cls.title, cls.content, cls.created_at, cls.updated_at)
+            .where(cls.deleted_at.is_(None))
+        )
+
+    @property
+    def is_deleted(self):
+        return self.deleted_at is not None
+
+    def to_dict(self, include_content=True):
+        data = {
             'id': self.id,
             'title': self.title,
-            'content': self.content,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version,
+            'change_seq': self.change_seq
         }
+        if include_content:
+            data['content'] = self.content
+        else:
+            data['content_length'] = len(self.content)
+        return data
+
+    def to_change_dict(self):
+        """Entry for the change feed: the note, or just its id for a tombstone."""
+        if self.is_deleted:
+            return {
+                'id': self.id,
+                'change_seq': self.change_seq,
+                'deleted': True,
+                'deleted_at': self.deleted_at.isoformat()
+            }
+        return {**self.to_dict(), 'deleted': False}
 
     def __repr__(self):
         return f'<Note {self.id}: {self.title}>'
 
+
+@dataclass(slots=True)
+class NoteListItem:
+    """A note in a list response, built straight from a :meth:`Note.list_rows` row.
+
+    Skips loading ORM objects and building a dict per note; the orjson
+    provider serializes it (datetimes included) in C. Same fields and
+    output as ``Note.to_dict()``.
+    """
+    id: int
+    title: str
+    content: str
+    created_at: datetime
+    updated_at: datetime
+    version: int
+    change_seq: int
+
+
+@event.listens_for(Note, 'before_insert')
+def _assign_change_seq_on_insert(mapper, connection, note):
+    note.change_seq = ChangeCounter.next_value(connection, ChangeCounter.NOTES)
+
+
+@event.listens_for(Note, 'before_update')
+def _assign_change_seq_on_update(mapper, connection, note):
+    # before_update also fires for objects that are dirty without any net
+    # change; those are not written, so they must not take a number either
+    if object_session(note).is_modified(note, include_collections=False):
+        note.change_seq = ChangeCounter.next_value(connection, ChangeCounter.NOTES)
+
@@ -0,0 +1,39 @@
+from datetime import datetime
+from app.core.database import db
+
+
+class NoteRevision(db.Model):
+    """One stored version of a note.
+
+    ``snapshot`` rows hold the full content, ``delta`` rows the edit
+    operations from the previous version; both are zlib-compressed. A
+    version is rebuilt from the nearest snapshot at or before it plus the
+    deltas after that snapshot.
+    """
+    __tablename__ = 'note_revisions'
+    __table_args__ = (
+        db.UniqueConstraint('note_id', 'version', name='uq_note_revisions_note_version'),
+    )
+
+    SNAPSHOT = 'snapshot'
+    DELTA = 'delta'
+
+    id = db.Column(db.Integer, primary_key=True)
+    note_id = db.Column(db.Integer, nullable=False, index=True)
+    version = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(10), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'kind': self.kind,
+            'title': self.title,
+            'size': len(self.data),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<NoteRevision {self.note_id}@{self.version} {self.kind}>'
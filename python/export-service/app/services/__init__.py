@@ -1,3 +1,7 @@
-from export_service import ExportService
+from .export_service import ExportService, ExportedFile, InvalidFilename
+from .exporters import Exporter, EXPORTERS, EXPORT_FORMATS
+from .pdf_themes import PdfTheme, THEMES, DEFAULT_THEME, get_theme
+from .note_revisions import NoteRevisionService, InvalidEdit, apply_ops, diff_ops
+from .note_changes import NoteChangeFeed, ChangesExpired
 
-__all__ = ['ExportService']
+__all__ = ['ExportService', 'ExportedFile', 'InvalidFilename', 'Exporter', 'EXPORTERS', 'EXPORT_FORMATS', 'PdfTheme', 'THEMES', 'DEFAULT_THEME', 'get_theme', 'NoteRevisionService', 'InvalidEdit', 'apply_ops', 'diff_ops', 'NoteChangeFeed', 'ChangesExpired']
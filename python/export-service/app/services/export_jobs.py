@@ -0,0 +1,205 @@
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import select, update
+from ..core.config import Config
+from ..core.database import db, read_count, read_stream
+from ..models.export_job import ExportJob
+from ..models.note import Note
+from .export_service import pdf_filename
+
+
+class ExportQueueFull(Exception):
+    """Raised when a job is submitted while every worker and queue slot is taken."""
+
+
+def _process_owner():
+    """``host:pid`` of this process, as stored in ``ExportJob.owner``."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ExportJobService:
+    """Runs multi-note PDF exports in a bounded local worker pool.
+
+    Job state lives in the ``export_jobs`` table so any process can answer
+    status and download requests; the rendering itself happens in the
+    process that accepted the job. At most ``EXPORT_JOB_WORKERS`` exports run
+    at once and at most ``EXPORT_JOB_MAX_PENDING`` more may wait, so bulk
+    exports cannot take over the process serving the CRUD endpoints.
+
+    Each job records the process that owns it. A job is only started if it
+    is still pending, so one already failed as stalled is not run after
+    all. When a process starts, :meth:`fail_orphaned` fails the jobs of
+    processes on the same host that have gone; those of other hosts fail
+    once they stop reporting progress for ``EXPORT_JOB_TIMEOUT_SECONDS``.
+    """
+
+    def __init__(self, export_service):
+        self.export_service = export_service
+        self.workers = Config.EXPORT_JOB_WORKERS
+        self.timeout = timedelta(seconds=Config.EXPORT_JOB_TIMEOUT_SECONDS)
+        self._slots = threading.BoundedSemaphore(Config.EXPORT_JOB_WORKERS + Config.EXPORT_JOB_MAX_PENDING)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, app, note_ids=None, filename=None, theme=None, bookmarks=False, compact=None):
+        if not self._slots.acquire(blocking=False):
+            raise ExportQueueFull('Too many export jobs in progress, try again later')
+
+        try:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = pdf_filename(filename, f"notes_export_{timestamp}.pdf")
+
+            if compact is None:
+                compact = self.export_service.compact
+
+            job = ExportJob(
+                note_ids=note_ids, filename=filename, theme=theme, bookmarks=bookmarks, compact=compact,
+                owner=_process_owner()
+            )
+            db.session.add(job)
+            db.session.commit()
+
+            self._get_executor().submit(self._run, app, job.id)
+        except Exception:
+            self._slots.release()
+            raise
+
+        return job
+
+    def get(self, job_id):
+        """Return the job with ``job_id`` (or ``None``), failing it if it has stalled."""
+        job = db.session.get(ExportJob, job_id)
+        if job is not None and job.is_active and job.updated_at < datetime.utcnow() - self.timeout:
+            # The process running it most likely died (deploy, OOM kill)
+            self._fail(job, 'Export job timed out')
+        return job
+
+    def fail_orphaned(self):
+        """Fail the unfinished jobs of processes on this host that no longer exist.
+
+        Call when a process starts, before it accepts jobs: jobs carrying
+        its own ``host:pid`` belonged to an earlier process with that pid.
+        Returns the number of jobs failed.
+        """
+        host = socket.gethostname()
+        own = _process_owner()
+        jobs = db.session.scalars(
+            select(ExportJob).where(
+                ExportJob.status.in_((ExportJob.PENDING, ExportJob.RUNNING)),
+                ExportJob.owner.startswith(f'{host}:', autoescape=True)
+            )
+        ).all()
+
+        failed = 0
+        for job in jobs:
+            pid = job.owner.rpartition(':')[2]
+            if job.owner == own or not pid.isdigit() or not _process_alive(int(pid)):
+                self._fail(job, 'Export job was interrupted by a restart')
+                failed += 1
+        return failed
+
+    def _get_executor(self):
+        # Created lazily so gunicorn's preloading master never owns the threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='export-job'
+                )
+            return self._executor
+
+    def _run(self, app, job_id):
+        try:
+            with app.app_context():
+                try:
+                    if not self._claim(job_id):
+                        return
+                    job = db.session.get(ExportJob, job_id)
+                    self._export(job)
+                except Exception as e:
+                    db.session.rollback()
+                    self._fail(db.session.get(ExportJob, job_id), str(e))
+                finally:
+                    db.session.remove()
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _claim(job_id):
+        """Move the job from pending to running in one statement; ``False`` if it was not pending."""
+        result = db.session.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id, ExportJob.status == ExportJob.PENDING)
+            .values(status=ExportJob.RUNNING, owner=_process_owner())
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _export(self, job):
+        statement = Note.export_rows().order_by(Note.created_at.desc())
+        if job.note_ids is not None:
+            statement = statement.where(Note.id.in_(job.note_ids))
+        total = read_count(statement)
+
+        if not total:
+            raise ValueError('No notes found to export')
+
+        job_id = job.id
+        last_reported = [0]
+
+        def on_progress(fraction):
+            # Rendering is reported as 5-99%. Written on its own connection: the
+            # session is busy streaming notes and must not commit mid-stream.
+            percent = 5 + int(fraction * 94)
+            if percent > last_reported[0]:
+                last_reported[0] = percent
+                with db.engine.begin() as connection:
+                    connection.execute(
+                        update(ExportJob).where(ExportJob.id == job_id).values(progress=percent)
+                    )
+
+        exported = self.export_service.export_multiple_notes_to_pdf(
+            read_stream(statement, Config.EXPORT_STREAM_BATCH_SIZE),
+            filename=f"export_job_{job.id}.pdf",
+            theme=job.theme,
+            persist=True,
+            on_progress=on_progress,
+            bookmarks=job.bookmarks,
+            total=total,
+            compact=job.compact
+        )
+
+        job.status = ExportJob.COMPLETED
+        job.progress = 100
+        job.file_path = str(exported.path)
+        job.completed_at = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def _fail(job, message):
+        job.status = ExportJob.FAILED
+        job.error = message
+        job.completed_at = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def result_path(job):
+        """Path of a completed job's PDF, or ``None`` if retention already removed it."""
+        if job.file_path is None:
+            return None
+        path = Path(job.file_path)
+        return path if path.exists() else None
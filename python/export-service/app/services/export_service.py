@@ -1,180 +1,573 @@
+import io
+import itertools
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from reportlab.lib.colors import toColor
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from ..core.config import Config
+from .fragment_cache import FragmentCache
+from .pdf_content import content_flowables, plain_markup
+from .pdf_merge import PageStamp, PdfStitcher
+from .pdf_themes import get_theme
 
 
-class ExportService:
+# Picklable stand-in for a Note, used to ship notes to render processes
+_NoteRow = namedtuple('_NoteRow', ['id', 'title', 'content', 'created_at', 'updated_at'])
 
-    def __init__(self):
-        self.export_dir = Config.EXPORT_DIR
 
-    def export_note_to_pdf(self, note, filename=None):
+def _format_timestamp(value):
+    return value.strftime('%B %d, %Y at %I:%M %p') if value else 'Unknown'
 
-        if filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            safe_title = "".join(c for c in note.title if c.isalnum() or c in (' ', '-', '_')).strip()[:50]
-            filename = f"note_{note.id}_{safe_title}_{timestamp}.pdf"
 
-        filepath = self.export_dir / filename
+def _append_content(story, content, theme):
+    story.extend(content_flowables(content, theme))
 
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            str(filepath),
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
 
-        # Container for the 'Flowable' objects
-        story = []
-
-        # Define styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor='#2c3e50',
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
+def _single_note_story(note, theme):
+    # Container for the 'Flowable' objects
+    story = []
 
-        content_style = ParagraphStyle(
-            'CustomContent',
-            parent=styles['Normal'],
-            fontSize=12,
-            leading=18,
-            textColor='#34495e',
-            alignment=TA_LEFT,
-            spaceAfter=12
-        )
+    # Add title
+    story.append(Paragraph(plain_markup(note.title), theme.title_style))
+    story.append(Spacer(1, theme.title_gap))
 
-        meta_style = ParagraphStyle(
-            'CustomMeta',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor='#7f8c8d',
-            alignment=TA_LEFT
-        )
+    # Add metadata
+    created_str = _format_timestamp(note.created_at)
+    updated_str = _format_timestamp(note.updated_at)
 
-        # Add title
-        story.append(Paragraph(note.title, title_style))
-        story.append(Spacer(1, 0.2 * inch))
+    story.append(Paragraph(f"<b>Created:</b> {created_str}", theme.meta_style))
+    story.append(Paragraph(f"<b>Last Updated:</b> {updated_str}", theme.meta_style))
+    story.append(Spacer(1, theme.section_gap))
 
-        # Add metadata
-        created_str = note.created_at.strftime('%B %d, %Y at %I:%M %p') if note.created_at else 'Unknown'
-        updated_str = note.updated_at.strftime('%B %d, %Y at %I:%M %p') if note.updated_at else 'Unknown'
-
-        story.append(Paragraph(f"<b>Created:</b> {created_str}", meta_style))
-        story.append(Paragraph(f"<b>Last Updated:</b> {updated_str}", meta_style))
-        story.append(Spacer(1, 0.3 * inch))
-
-        # Add content (split by newlines and create paragraphs)
-        content_lines = note.content.split('\n')
-        for line in content_lines:
-            if line.strip():
-                story.append(Paragraph(line, content_style))
-            else:
-                story.append(Spacer(1, 0.1 * inch))
-
-        # Build PDF
-        doc.build(story)
+    _append_content(story, note.content, theme)
 
-        return filepath
+    return story
 
-    def export_multiple_notes_to_pdf(self, notes, filename=None):
 
-        if filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"notes_export_{timestamp}.pdf"
+# Gap between a note's number and its title, as a fraction of the font size
+_NUMBER_GAP = 0.25
 
-        filepath = self.export_dir / filename
 
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            str(filepath),
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
+def _number_label(idx):
+    return f"{idx}."
 
-        story = []
-
-        # Define styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor='#2c3e50',
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
 
-        note_title_style = ParagraphStyle(
-            'NoteTitle',
-            parent=styles['Heading2'],
-            fontSize=18,
-            textColor='#34495e',
-            spaceAfter=15,
-            spaceBefore=20
-        )
+class _NoteHeading(Paragraph):
+    """A note's title with its number hanging in the left margin.
 
-        content_style = ParagraphStyle(
-            'CustomContent',
-            parent=styles['Normal'],
-            fontSize=12,
-            leading=18,
-            textColor='#34495e',
-            alignment=TA_LEFT,
-            spaceAfter=12
-        )
+    The number is drawn beside the paragraph rather than in it, so the title
+    lays out the same wherever the note falls in the export; a cached
+    fragment gets its number stamped on when it is merged instead (see
+    :func:`_number_stamp`). ``number`` is ``None`` for no number.
+    """
+
+    def __init__(self, text, style, *args, number=None, **kwargs):
+        super().__init__(text, style, *args, **kwargs)
+        self.number = number
 
-        meta_style = ParagraphStyle(
-            'CustomMeta',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor='#7f8c8d',
-            alignment=TA_LEFT
+    def drawOn(self, canvas, x, y, _sW=0):
+        super().drawOn(canvas, x, y, _sW)
+        if self.number is None:
+            return
+        style = self.style
+        canvas.saveState()
+        canvas.setFont(style.fontName, style.fontSize)
+        canvas.setFillColor(style.textColor)
+        # ReportLab puts a paragraph's first baseline one font size below its top
+        canvas.drawRightString(
+            x - _NUMBER_GAP * style.fontSize, y + self.height - style.fontSize, _number_label(self.number)
         )
+        canvas.restoreState()
+
 
+def _number_stamp(theme, idx):
+    """Stamp drawing note number ``idx`` on a fragment, where :class:`_NoteHeading` would draw it."""
+    style = theme.note_title_style
+    label = _number_label(idx)
+    x, top = theme.page_top_left()
+    left = x - _NUMBER_GAP * style.fontSize - stringWidth(label, style.fontName, style.fontSize)
+    red, green, blue = toColor(style.textColor).rgb()
+    operators = (
+        f"BT /Stamp {style.fontSize:g} Tf {red:.4g} {green:.4g} {blue:.4g} rg "
+        f"1 0 0 1 {left:.2f} {top - style.fontSize:.2f} Tm ({label}) Tj ET"
+    )
+    return PageStamp(0, style.fontName, operators.encode('ascii'))
+
+
+def _notes_story(notes, first_idx, theme, include_title, bookmarks, numbered=True):
+    """Flowables for ``notes``, numbered from ``first_idx`` unless ``numbered`` is false."""
+    story = []
+
+    if include_title:
         # Add main title
-        story.append(Paragraph("Notes Export", title_style))
-        story.append(Spacer(1, 0.3 * inch))
-
-        # Add each note
-        for idx, note in enumerate(notes, 1):
-            # Add note title
-            story.append(Paragraph(f"{idx}. {note.title}", note_title_style))
-
-            # Add metadata
-            created_str = note.created_at.strftime('%B %d, %Y at %I:%M %p') if note.created_at else 'Unknown'
-            story.append(Paragraph(f"<b>Created:</b> {created_str}", meta_style))
-            story.append(Spacer(1, 0.1 * inch))
-
-            # Add content
-            content_lines = note.content.split('\n')
-            for line in content_lines:
-                if line.strip():
-                    story.append(Paragraph(line, content_style))
-                else:
-                    story.append(Spacer(1, 0.1 * inch))
-
-            # Add page break between notes (except for the last one)
-            if idx < len(notes):
-                story.append(PageBreak())
-
-        # Build PDF
-        doc.build(story)
+        story.append(Paragraph("Notes Export", theme.title_style))
+        story.append(Spacer(1, theme.section_gap))
+
+    # Add each note
+    for idx, note in enumerate(notes, first_idx):
+        # Add page break between notes; parts of a split export start on a
+        # fresh page anyway
+        if idx > first_idx:
+            story.append(PageBreak())
+
+        # Add note title
+        heading = _NoteHeading(plain_markup(note.title), theme.note_title_style, number=idx if numbered else None)
+        if bookmarks:
+            heading.outline_title = f"{idx}. {note.title}"
+        story.append(heading)
+
+        # Add metadata
+        created_str = _format_timestamp(note.created_at)
+        story.append(Paragraph(f"<b>Created:</b> {created_str}", theme.meta_style))
+        story.append(Spacer(1, theme.small_gap))
+
+        _append_content(story, note.content, theme)
+
+    return story
+
+
+def _render_part(args):
+    """Process-pool entry point: render one group of notes, return its bytes and note start pages."""
+    theme_name, first_idx, rows, include_title, bookmarks = args
+    theme = get_theme(theme_name)
+    story = _notes_story(rows, first_idx, theme, include_title, bookmarks)
+    buffer = io.BytesIO()
+    doc = ExportService._build_document(buffer, story, theme)
+    return buffer.getvalue(), doc.note_pages
+
+
+def _render_fragment(args):
+    """Process-pool entry point: render one cacheable fragment to PDF bytes.
+
+    ``kind`` is ``'single'`` for a standalone note export or ``'bundle'`` for
+    a note of a multi-note export. Bundle fragments carry no note number, so
+    one fragment serves the note at any position.
+    """
+    kind, row, theme_name = args
+    theme = get_theme(theme_name)
+    if kind == 'single':
+        story = _single_note_story(row, theme)
+    else:
+        story = _notes_story([row], 1, theme, include_title=False, bookmarks=False, numbered=False)
+    buffer = io.BytesIO()
+    ExportService._build_document(buffer, story, theme)
+    return buffer.getvalue()
+
+
+# Bump whenever the rendered output changes so stale cached fragments are ignored
+_RENDER_VERSION = 3
+
+
+def _fragment_key(args):
+    kind, row, theme_name = args
+    # updated_at changes on every edit
+    return _RENDER_VERSION, kind, row.id, row.updated_at.isoformat(), theme_name
+
+
+def _write_pdf(target, data, compact):
+    """Write the finished PDF ``data`` to ``target``, compacted if ``compact``."""
+    if compact:
+        stitcher = _stitcher(target, compact)
+        stitcher.append(data)
+        stitcher.close()
+    elif isinstance(target, str):
+        Path(target).write_bytes(data)
+    else:
+        target.write(data)
+
+
+def _stitcher(target, compact):
+    # Compact output has its page streams recompressed without ReportLab's
+    # ASCII85 layer, and one copy of the fonts every part brings along
+    return PdfStitcher(target, share_resources=compact, recompress_streams=compact)
+
+
+class _NotesDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that records the page each bookmarked note heading lands on."""
+
+    def __init__(self, target, outline=False, **kwargs):
+        super().__init__(target, **kwargs)
+        self.outline = outline
+        self.note_pages = []  # (title, 0-based page index)
+
+    def afterFlowable(self, flowable):
+        title = getattr(flowable, 'outline_title', None)
+        if title is None:
+            return
+        self.note_pages.append((title, self.page - 1))
+        if self.outline:
+            key = f'note-{len(self.note_pages)}'
+            self.canv.bookmarkPage(key)
+            self.canv.addOutlineEntry(title, key, level=0)
+
+
+class InvalidFilename(ValueError):
+    """Raised when a requested PDF export filename is unusable."""
+
+
+def pdf_filename(filename, default):
+    """The name to give a PDF export asked to be called ``filename``.
+
+    Only the last path component is kept, so a name like ``../../app.py``
+    cannot point a persisted export outside ``EXPORT_DIR``; ``default`` is
+    used when nothing is left. The name must end in ``.pdf``.
+    """
+    if filename is None:
+        return default
+    if not isinstance(filename, str) or '\0' in filename:
+        raise InvalidFilename('filename must be a string')
+    name = Path(filename.replace('\\', '/')).name
+    if name in ('', '.', '..'):
+        return default
+    if not name.lower().endswith('.pdf'):
+        raise InvalidFilename("filename must end in '.pdf'")
+    return name
+
+
+class ExportedFile:
+    """A finished export, either persisted under ``EXPORT_DIR`` or held in a spooled buffer.
+
+    ``build_seconds`` and ``compact`` describe how it was built; they are
+    ``None`` for a file picked up later (e.g. a finished job's download).
+    """
+
+    def __init__(self, filename, path=None, buffer=None, build_seconds=None, compact=None):
+        self.filename = filename
+        self.path = path
+        self.buffer = buffer
+        self.build_seconds = build_seconds
+        self.compact = compact
+
+    @property
+    def size(self):
+        if self.path is not None:
+            return self.path.stat().st_size
+        self.buffer.seek(0, 2)
+        return self.buffer.tell()
+
+    def iter_chunks(self, chunk_size):
+        """Yield the PDF bytes in ``chunk_size`` pieces, closing the buffer when done."""
+        source = self.path.open('rb') if self.path is not None else self.buffer
+        try:
+            source.seek(0)
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            source.close()
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+
 
-        return filepath
+class ExportService:
 
+    def __init__(self):
+        self.export_dir = Config.EXPORT_DIR
+        self.persist = Config.EXPORT_PERSIST
+        self.spool_max_memory = Config.EXPORT_SPOOL_MAX_MEMORY
+        self.retention_seconds = Config.EXPORT_RETENTION_SECONDS
+        self.max_dir_bytes = Config.EXPORT_DIR_MAX_BYTES
+        self.parallel_workers = Config.EXPORT_PARALLEL_WORKERS
+        self.parallel_min_notes = Config.EXPORT_PARALLEL_MIN_NOTES
+        self.parallel_chunk_size = Config.EXPORT_PARALLEL_CHUNK_SIZE
+        self.compact = Config.EXPORT_COMPACT
+        self._process_pool = None
+        self._pool_lock = threading.Lock()
+        self.fragment_cache = None
+        if Config.EXPORT_FRAGMENT_CACHE:
+            self.fragment_cache = FragmentCache(
+                Config.EXPORT_FRAGMENT_CACHE_DIR, Config.EXPORT_FRAGMENT_CACHE_MAX_BYTES
+            )
+
+    def export_note_to_pdf(self, note, filename=None, theme=None, persist=None, compact=None):
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        safe_title = "".join(c for c in note.title if c.isalnum() or c in (' ', '-', '_')).strip()[:50]
+        filename = pdf_filename(filename, f"note_{note.id}_{safe_title}_{timestamp}.pdf")
+
+        theme = get_theme(theme)
+        compact = self.compact if compact is None else compact
+
+        if self.fragment_cache is not None and note.updated_at is not None:
+            row = _NoteRow(note.id, note.title, note.content, note.created_at, note.updated_at)
+            return self._build(filename, persist, compact, lambda target: _write_pdf(
+                target, self._cached_fragment(('single', row, theme.name)), compact
+            ))
+
+        story = _single_note_story(note, theme)
+        return self._build(filename, persist, compact, lambda target: self._build_single_document(
+            target, story, theme, compact
+        ))
+
+    def export_multiple_notes_to_pdf(self, notes, filename=None, theme=None, persist=None, on_progress=None,
+                                     parallel=None, bookmarks=False, total=None, compact=None):
+        """Export ``notes`` into one PDF.
+
+        ``notes`` may be a list or a lazy iterable of note-like rows (anything
+        with ``id``, ``title``, ``content``, ``created_at`` and ``updated_at``),
+        e.g. a ``yield_per`` result. Lazy input is consumed in batches so only
+        one batch of notes is held at a time; pass ``total`` so progress and
+        the automatic parallel decision still work.
+
+        ``compact`` (default ``EXPORT_COMPACT``) trades build time for size:
+        page streams are recompressed without ReportLab's ASCII85 encoding
+        (about a sixth smaller) and, when the PDF is stitched together from
+        parts or cached fragments, the fonts every part carries its own copy
+        of are written once.
+        """
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = pdf_filename(filename, f"notes_export_{timestamp}.pdf")
+
+        theme = get_theme(theme)
+        compact = self.compact if compact is None else compact
+        sized = hasattr(notes, '__len__')
+        if total is None and sized:
+            total = len(notes)
+
+        if parallel is None:
+            parallel = self.parallel_workers > 1 and (total or 0) >= self.parallel_min_notes
+
+        rows = (_NoteRow(n.id, n.title, n.content, n.created_at, n.updated_at) for n in notes)
+
+        if self.fragment_cache is not None:
+            return self._build(filename, persist, compact, lambda target: self._build_from_fragments(
+                target, rows, total, theme, on_progress, bookmarks, parallel, compact
+            ))
+
+        if parallel or not sized:
+            return self._build(filename, persist, compact, lambda target: self._build_in_parts(
+                target, rows, total, theme, on_progress, bookmarks, parallel, compact
+            ))
+
+        story = _notes_story(notes, 1, theme, include_title=True, bookmarks=bookmarks)
+        return self._build(filename, persist, compact, lambda target: self._build_single_document(
+            target, story, theme, compact, on_progress, bookmarks
+        ))
+
+    def _build(self, filename, persist, compact, render):
+        """Run ``render(target)`` against a persisted file or a spooled buffer, timing it."""
+        if persist is None:
+            persist = self.persist
+
+        start = time.perf_counter()
+        if persist:
+            filepath = self.export_dir / filename
+            # Render next to the destination and rename it into place, so a
+            # concurrent download never sees a half-written file. The temp name
+            # does not end in .pdf, so cleanup_exports leaves it alone.
+            fd, temp_path = tempfile.mkstemp(dir=self.export_dir, prefix=f'.{filename}.', suffix='.tmp')
+            os.close(fd)
+            try:
+                render(temp_path)
+                os.replace(temp_path, filepath)
+            except BaseException:
+                Path(temp_path).unlink(missing_ok=True)
+                raise
+            self.cleanup_exports(keep=filepath)
+            return ExportedFile(
+                filename, path=filepath, build_seconds=time.perf_counter() - start, compact=compact
+            )
+
+        # Small exports stay in memory; large ones spill to an anonymous temp
+        # file that disappears when the buffer is closed.
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.spool_max_memory)
+        try:
+            render(buffer)
+        except Exception:
+            buffer.close()
+            raise
+        return ExportedFile(
+            filename, buffer=buffer, build_seconds=time.perf_counter() - start, compact=compact
+        )
+
+    @classmethod
+    def _build_single_document(cls, target, story, theme, compact, on_progress=None, bookmarks=False):
+        """Lay ``story`` out as one document; compact output is rewritten by :class:`PdfStitcher`."""
+        if not compact:
+            cls._build_document(target, story, theme, on_progress, outline=bookmarks)
+            return
+        buffer = io.BytesIO()
+        doc = cls._build_document(buffer, story, theme, on_progress)
+        stitcher = _stitcher(target, compact)
+        # The stitcher writes its own outline from the recorded note pages
+        stitcher.append(buffer.getvalue(), doc.note_pages)
+        stitcher.close()
+
+    @staticmethod
+    def _build_document(target, story, theme, on_progress=None, outline=False):
+        doc = _NotesDocTemplate(target, outline=outline, **theme.document_kwargs())
+
+        if on_progress is not None:
+            # ReportLab reports an estimate of the flowable count, then how many
+            # have been laid out; turn that into a 0..1 fraction.
+            total = [len(story) or 1]
+
+            def report(kind, value):
+                if kind == 'SIZE_EST':
+                    total[0] = value or 1
+                elif kind == 'PROGRESS':
+                    on_progress(min(value / total[0], 1.0))
+
+            doc.setProgressCallBack(report)
+
+        doc.build(story)
+        return doc
+
+    def _batches(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, self.parallel_chunk_size))
+            if not batch:
+                return
+            yield batch
+
+    def _map(self, fn, items, parallel):
+        """``map(fn, items)``, in the process pool when ``parallel`` is set.
+
+        Unlike ``Executor.map`` only a few tasks are kept in flight, so a lazy
+        ``items`` is never drained ahead of the results being consumed.
+        """
+        if not parallel:
+            yield from map(fn, items)
+            return
+
+        pool = self._get_process_pool()
+        in_flight = deque()
+        for item in items:
+            in_flight.append(pool.submit(fn, item))
+            if len(in_flight) >= self.parallel_workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+    @staticmethod
+    def _report(on_progress, done, total):
+        if on_progress is not None and total:
+            on_progress(min(done / total, 1.0))
+
+    def _build_in_parts(self, target, rows, total, theme, on_progress, bookmarks, parallel, compact):
+        """Render groups of notes into separate PDFs and stitch them together.
+
+        Each part keeps the global note numbering and starts on a fresh page,
+        so concatenating the parts reproduces the single-document page breaks.
+        Outline entries are re-based onto the merged page numbers. Parts are
+        written to ``target`` as they arrive, so memory stays flat however
+        many notes are exported.
+        """
+        def parts():
+            first_idx = 1
+            for batch in self._batches(rows):
+                yield theme.name, first_idx, batch, first_idx == 1, bookmarks
+                first_idx += len(batch)
+
+        stitcher = _stitcher(target, compact)
+        done = 0
+        for pdf_bytes, note_pages in self._map(_render_part, parts(), parallel):
+            stitcher.append(pdf_bytes, note_pages)
+            done += self.parallel_chunk_size
+            self._report(on_progress, done, total)
+        stitcher.close()
+
+    def _cached_fragment(self, args):
+        key = _fragment_key(args)
+        data = self.fragment_cache.get(key)
+        if data is None:
+            data = _render_fragment(args)
+            self.fragment_cache.put(key, data)
+        return data
+
+    def _build_from_fragments(self, target, rows, total, theme, on_progress, bookmarks, parallel, compact):
+        """Stitch a multi-note export together from per-note cached fragments.
+
+        Only notes whose fragment is missing (new or edited) are rendered, in
+        the process pool when ``parallel`` is set. Each note's number is
+        stamped on as its fragment is merged. The first note shares its page
+        with the export title, so it is rendered fresh every time.
+        """
+        stitcher = _stitcher(target, compact)
+        idx = 0
+        for batch in self._batches(rows):
+            first_idx = idx + 1
+            idx += len(batch)
+
+            if first_idx == 1:
+                data, note_pages = _render_part((theme.name, 1, batch[:1], True, bookmarks))
+                stitcher.append(data, note_pages)
+                batch = batch[1:]
+                first_idx = 2
+
+            jobs = [('bundle', row, theme.name) for row in batch]
+            # Notes without updated_at have no usable version and are never cached
+            fragments = [
+                self.fragment_cache.get(_fragment_key(job)) if job[1].updated_at is not None else None
+                for job in jobs
+            ]
+            missing = [i for i, data in enumerate(fragments) if data is None]
+            rendered = self._map(_render_fragment, [jobs[i] for i in missing], parallel and len(missing) > 1)
+            for i, data in zip(missing, rendered):
+                fragments[i] = data
+                if jobs[i][1].updated_at is not None:
+                    self.fragment_cache.put(_fragment_key(jobs[i]), data)
+
+            for note_idx, row, data in zip(itertools.count(first_idx), batch, fragments):
+                stitcher.append(
+                    data,
+                    [(f"{note_idx}. {row.title}", 0)] if bookmarks else (),
+                    stamps=[_number_stamp(theme, note_idx)]
+                )
+            self._report(on_progress, idx, total)
+        stitcher.close()
+
+    def _get_process_pool(self):
+        # Spawned rather than forked: exports also run from job threads, and
+        # forking a threaded process is unsafe.
+        with self._pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.parallel_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._process_pool
+
+    def cleanup_exports(self, keep=None):
+        """Apply the retention policy to persisted exports.
+
+        Files older than ``EXPORT_RETENTION_SECONDS`` are removed, then the oldest
+        remaining ones until the directory fits in ``EXPORT_DIR_MAX_BYTES``.
+        ``keep`` (a path) is never deleted. Returns the number of files deleted.
+        """
+        now = time.time()
+        files = []
+        for path in self.export_dir.glob('*.pdf'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        removed = 0
+        total_bytes = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if path == keep:
+                continue
+            if now - mtime <= self.retention_seconds and total_bytes <= self.max_dir_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            removed += 1
+
+        return removed
@@ -0,0 +1,286 @@
+import html
+import io
+import json
+import re
+import tempfile
+import zipfile
+from datetime import datetime
+from .export_service import _format_timestamp
+
+
+# Characters XML 1.0 does not allow, which python-docx refuses to write:
+# control characters other than tab/newline/CR, lone surrogates, U+FFFE/U+FFFF
+_XML_INVALID_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def safe_title(title, limit=50):
+    return "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()[:limit]
+
+
+class Exporter:
+    """Base class for the non-PDF export formats.
+
+    Subclasses render one note with :meth:`render_note` and a multi-note
+    export as an iterator of byte chunks with :meth:`stream_notes`, so
+    responses can start before every note has been read from the database.
+    """
+
+    name = None
+    extension = None
+    mimetype = None
+
+    def default_filename(self, note=None):
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if note is None:
+            return f"notes_export_{timestamp}.{self.extension}"
+        return f"note_{note.id}_{safe_title(note.title)}_{timestamp}.{self.extension}"
+
+    def render_note(self, note):
+        raise NotImplementedError
+
+    def stream_notes(self, notes):
+        raise NotImplementedError
+
+
+class MarkdownExporter(Exporter):
+    name = 'markdown'
+    extension = 'md'
+    mimetype = 'text/markdown'
+
+    def render_note(self, note):
+        return (
+            f"# {note.title}\n\n"
+            f"*Created:* {_format_timestamp(note.created_at)}  \n"
+            f"*Last Updated:* {_format_timestamp(note.updated_at)}\n\n"
+            f"{note.content}\n"
+        ).encode('utf-8')
+
+    def stream_notes(self, notes):
+        yield b"# Notes Export\n"
+        for idx, note in enumerate(notes, 1):
+            yield (
+                f"\n## {idx}. {note.title}\n\n"
+                f"*Created:* {_format_timestamp(note.created_at)}\n\n"
+                f"{note.content}\n"
+            ).encode('utf-8')
+
+
+class HtmlExporter(Exporter):
+    name = 'html'
+    extension = 'html'
+    mimetype = 'text/html'
+
+    _HEAD = (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n'
+        '<style>body{{font-family:Helvetica,Arial,sans-serif;color:#34495e;max-width:48em;margin:2em auto}}'
+        'h1{{color:#2c3e50;text-align:center}}.meta{{color:#7f8c8d;font-size:.85em}}'
+        'section{{page-break-before:always}}</style>\n</head>\n<body>\n'
+    )
+    _TAIL = '</body>\n</html>\n'
+
+    @staticmethod
+    def _content(content):
+        # Blank lines separate paragraphs; single newlines become line breaks
+        blocks = [block for block in content.split('\n\n') if block.strip()]
+        return ''.join(
+            f"<p>{'<br>'.join(html.escape(line) for line in block.split(chr(10)))}</p>\n"
+            for block in blocks
+        )
+
+    def render_note(self, note):
+        title = html.escape(note.title)
+        return (
+            self._HEAD.format(title=title)
+            + f"<h1>{title}</h1>\n"
+            + f"<p class=\"meta\"><b>Created:</b> {_format_timestamp(note.created_at)}<br>"
+            + f"<b>Last Updated:</b> {_format_timestamp(note.updated_at)}</p>\n"
+            + self._content(note.content)
+            + self._TAIL
+        ).encode('utf-8')
+
+    def stream_notes(self, notes):
+        yield (self._HEAD.format(title='Notes Export') + '<h1>Notes Export</h1>\n').encode('utf-8')
+        for idx, note in enumerate(notes, 1):
+            yield (
+                f"<section>\n<h2>{idx}. {html.escape(note.title)}</h2>\n"
+                f"<p class=\"meta\"><b>Created:</b> {_format_timestamp(note.created_at)}</p>\n"
+                f"{self._content(note.content)}</section>\n"
+            ).encode('utf-8')
+        yield self._TAIL.encode('utf-8')
+
+
+class JsonExporter(Exporter):
+    name = 'json'
+    extension = 'json'
+    mimetype = 'application/json'
+
+    @staticmethod
+    def note_dict(note):
+        return {
+            'id': note.id,
+            'title': note.title,
+            'content': note.content,
+            'created_at': _isoformat(note.created_at),
+            'updated_at': _isoformat(note.updated_at)
+        }
+
+    def render_note(self, note):
+        return json.dumps(self.note_dict(note), ensure_ascii=False).encode('utf-8')
+
+    def stream_notes(self, notes):
+        # Emit the array piecewise rather than building the whole list first
+        separator = b'['
+        for note in notes:
+            yield separator + json.dumps(self.note_dict(note), ensure_ascii=False).encode('utf-8')
+            separator = b','
+        yield b']' if separator == b',' else b'[]'
+
+
+class NdjsonExporter(JsonExporter):
+    name = 'ndjson'
+    extension = 'ndjson'
+    mimetype = 'application/x-ndjson'
+
+    def render_note(self, note):
+        return super().render_note(note) + b'\n'
+
+    def stream_notes(self, notes):
+        for note in notes:
+            yield json.dumps(self.note_dict(note), ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+class DocxExporter(Exporter):
+    """Word export through python-docx.
+
+    Unlike the other formats this one is not streamed as it is generated:
+    python-docx keeps the whole document in memory until it is saved, so a
+    multi-note DOCX export costs memory in proportion to the notes in it.
+    Characters XML cannot hold (e.g. control characters pasted into a note)
+    are dropped.
+    """
+
+    name = 'docx'
+    extension = 'docx'
+    mimetype = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+    # DOCX is a zip container whose parts can only be written once the whole
+    # document exists, so the file is built first and then streamed.
+    SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+
+    @staticmethod
+    def _add_note(document, heading, note, level, include_updated):
+        document.add_heading(_XML_INVALID_CHARS.sub('', heading), level=level)
+        meta = document.add_paragraph()
+        meta.add_run('Created: ').bold = True
+        meta.add_run(_format_timestamp(note.created_at))
+        if include_updated:
+            meta.add_run('\n')
+            meta.add_run('Last Updated: ').bold = True
+            meta.add_run(_format_timestamp(note.updated_at))
+        for line in _XML_INVALID_CHARS.sub('', note.content).split('\n'):
+            document.add_paragraph(line)
+
+    def _save(self, document):
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_MEMORY)
+        document.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def render_note(self, note):
+        from docx import Document
+
+        document = Document()
+        self._add_note(document, note.title, note, level=0, include_updated=True)
+        with self._save(document) as buffer:
+            return buffer.read()
+
+    def stream_notes(self, notes):
+        from docx import Document
+
+        document = Document()
+        document.add_heading('Notes Export', level=0)
+        for idx, note in enumerate(notes, 1):
+            if idx > 1:
+                document.add_page_break()
+            self._add_note(document, f"{idx}. {note.title}", note, level=1, include_updated=False)
+
+        with self._save(document) as buffer:
+            while True:
+                chunk = buffer.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, non-seekable sink that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipExporter(Exporter):
+    """One file per note, zipped on the fly.
+
+    The sink is not seekable, so :mod:`zipfile` writes data descriptors after
+    each entry and every note can be sent as soon as it is compressed.
+    """
+
+    name = 'zip'
+    extension = 'zip'
+    mimetype = 'application/zip'
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def _entry_name(self, idx, note):
+        return f"{idx:04d}_{safe_title(note.title) or note.id}.{self.inner.extension}"
+
+    def render_note(self, note):
+        return b''.join(self.stream_notes([note]))
+
+    def stream_notes(self, notes):
+        sink = _ZipStream()
+        with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for idx, note in enumerate(notes, 1):
+                archive.writestr(self._entry_name(idx, note), self.inner.render_note(note))
+                yield sink.drain()
+        # Central directory, written when the archive is closed
+        yield sink.drain()
+
+
+EXPORTERS = {
+    exporter.name: exporter for exporter in (
+        MarkdownExporter(),
+        HtmlExporter(),
+        JsonExporter(),
+        NdjsonExporter(),
+        DocxExporter(),
+        ZipExporter(MarkdownExporter()),
+    )
+}
+
+# Formats accepted by the /api/export/* routes; 'pdf' is handled by ExportService
+EXPORT_FORMATS = ('pdf',) + tuple(EXPORTERS)
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+class FragmentCache:
+    """Size-bounded on-disk cache of rendered PDF fragments.
+
+    Entries are keyed by a tuple that must change whenever the rendered output
+    would (note id, ``updated_at``, theme, ...). Files are written atomically,
+    so several worker processes can share one directory. When the directory
+    grows past ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # computed lazily, then tracked incrementally
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        digest = self._digest(key)
+        return self.directory / digest[:2] / f'{digest}.pdf'
+
+    def get(self, key):
+        """Return the cached bytes for ``key``, or ``None`` on a miss."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # Bump the mtime so eviction treats this entry as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def clear(self):
+        with self._lock:
+            for path in self.directory.glob('*/*.pdf'):
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    def _entries(self):
+        for path in self.directory.glob('*/*.pdf'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # Drop least recently used entries until we are back under 90% of the
+        # limit, so a full cache doesn't rescan the directory on every put.
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
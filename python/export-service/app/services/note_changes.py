@@ -0,0 +1,158 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from ..core.config import Config
+from ..core.database import db, read_engine, read_scalars
+from ..models.change_counter import ChangeCounter
+from ..models.note import Note
+
+
+class ChangesExpired(Exception):
+    """Raised when ``since`` is older than the tombstones still kept; the client must resync in full."""
+
+    def __init__(self, purged_through):
+        super().__init__(
+            f'Changes up to {purged_through} are no longer available, sync from since=0'
+        )
+        self.purged_through = purged_through
+
+
+class NoteChangeFeed:
+    """Incremental sync over the ``change_seq`` numbers of notes.
+
+    Every insert or update of a note takes the next number from the 'notes'
+    counter, and deletes only mark the note as a tombstone, so "everything
+    that changed after N" is an indexed range scan on ``change_seq``.
+    Tombstones older than ``NOTE_TOMBSTONE_RETENTION_DAYS`` are purged; a
+    client whose cursor predates the purge gets :class:`ChangesExpired`.
+    """
+
+    def __init__(self):
+        self.default_limit = Config.NOTE_CHANGES_PAGE_SIZE
+        self.max_limit = Config.NOTE_CHANGES_MAX_PAGE_SIZE
+        self.max_wait = Config.NOTE_CHANGES_MAX_WAIT_SECONDS
+        self.poll_interval = Config.NOTE_CHANGES_POLL_INTERVAL_SECONDS
+        self.max_waiters = Config.NOTE_CHANGES_MAX_WAITERS
+        self._waiters = threading.BoundedSemaphore(self.max_waiters) if self.max_waiters > 0 else None
+        self.retention = timedelta(days=Config.NOTE_TOMBSTONE_RETENTION_DAYS)
+
+    def init_counters(self):
+        """Create the counters and number notes written before the feed existed.
+
+        Run at startup after ``db.create_all()``.
+        """
+        with db.engine.begin() as connection:
+            existing = set(connection.scalars(select(ChangeCounter.name)))
+            for name in (ChangeCounter.NOTES, ChangeCounter.NOTES_PURGED):
+                if name not in existing:
+                    try:
+                        with connection.begin_nested():
+                            connection.execute(insert(ChangeCounter).values(name=name, value=0))
+                    except IntegrityError:
+                        pass  # another process created it first
+
+            # Legacy rows get numbers after everything already numbered, in id
+            # order. updated_at is set to itself: numbering a note is not an
+            # edit, and the column's onupdate would otherwise stamp every
+            # legacy note with the time of the upgrade
+            notes = Note.__table__
+            base = ChangeCounter.current_value(connection, ChangeCounter.NOTES)
+            unnumbered = connection.execute(
+                update(notes)
+                .where(notes.c.change_seq.is_(None))
+                .values(change_seq=notes.c.id + base, updated_at=notes.c.updated_at)
+            ).rowcount
+            if unnumbered:
+                highest = connection.scalar(select(func.max(notes.c.change_seq)))
+                connection.execute(
+                    update(ChangeCounter)
+                    .where(ChangeCounter.name == ChangeCounter.NOTES)
+                    .values(value=highest)
+                )
+
+    def current_seq(self):
+        with read_engine().connect() as connection:
+            return ChangeCounter.current_value(connection, ChangeCounter.NOTES)
+
+    def changes(self, since, limit=None):
+        """Notes and tombstones with ``change_seq > since``, oldest first, at most ``limit``.
+
+        Returns ``(notes, has_more)``.
+        """
+        limit = min(max(1, limit or self.default_limit), self.max_limit)
+        if since > 0:
+            with read_engine().connect() as connection:
+                purged_through = ChangeCounter.current_value(connection, ChangeCounter.NOTES_PURGED)
+            if since < purged_through:
+                raise ChangesExpired(purged_through)
+
+        notes = read_scalars(
+            select(Note)
+            .where(Note.change_seq > since)
+            .order_by(Note.change_seq)
+            .limit(limit + 1)
+        ).all()
+        return notes[:limit], len(notes) > limit
+
+    @contextmanager
+    def wait_slot(self):
+        """Reserve one of the ``NOTE_CHANGES_MAX_WAITERS`` long-poll slots of this process.
+
+        Yields False, without waiting, when they are all taken: the caller
+        answers immediately instead of parking another worker thread.
+        """
+        if self._waiters is None or not self._waiters.acquire(blocking=False):
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            self._waiters.release()
+
+    def wait_for_changes(self, since, timeout):
+        """Block until the counter passes ``since`` or ``timeout`` seconds elapse.
+
+        Polls the counter row, so it sees writes from every worker process.
+        Holds the calling worker thread for the whole wait; call it inside
+        :meth:`wait_slot`.
+        """
+        deadline = time.monotonic() + min(timeout, self.max_wait)
+        # End the session's read transaction: it would otherwise pin a
+        # connection for the whole wait, and on SQLite keep later queries in
+        # this request on the snapshot from before the wait
+        db.session.rollback()
+        while True:
+            # A fresh connection per poll: a long-lived transaction would keep
+            # seeing the same snapshot on SQLite
+            if self.current_seq() > since:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+
+    def delete(self, note):
+        """Turn ``note`` into a tombstone; the caller commits."""
+        note.deleted_at = datetime.utcnow()
+        note.content = ''
+
+    def purge_tombstones(self):
+        """Remove tombstones past the retention period and advance the purge watermark."""
+        cutoff = datetime.utcnow() - self.retention
+        expired = Note.deleted_at.is_not(None) & (Note.deleted_at < cutoff)
+        highest = db.session.scalar(select(func.max(Note.change_seq)).where(expired))
+        if highest is None:
+            return 0
+
+        purged = db.session.execute(
+            Note.__table__.delete().where(expired)
+        ).rowcount
+        db.session.execute(
+            update(ChangeCounter)
+            .where(ChangeCounter.name == ChangeCounter.NOTES_PURGED, ChangeCounter.value < highest)
+            .values(value=highest)
+        )
+        return purged
@@ -0,0 +1,226 @@
+import json
+import re
+import zlib
+from bisect import bisect_right
+from sqlalchemy import delete, select
+from ..core.config import Config
+from ..core.database import db
+from ..models.note_revision import NoteRevision
+
+
+class InvalidEdit(ValueError):
+    """Raised when PATCH operations do not apply cleanly to the base content."""
+
+
+# What PATCH offsets count: Python string indexes (Unicode code points), or
+# UTF-16 code units as JavaScript's String indexes do
+OFFSET_UNITS = ('codepoint', 'utf-16')
+
+_ASTRAL = re.compile('[\U00010000-\U0010ffff]')
+
+
+def _utf16_to_codepoint(content):
+    """Function converting UTF-16 offsets into ``content`` to code point offsets.
+
+    They only differ after characters outside the BMP (e.g. emoji), which
+    take two UTF-16 code units.
+    """
+    # UTF-16 offset at which each such character starts
+    starts = [match.start() + i for i, match in enumerate(_ASTRAL.finditer(content))]
+    if not starts:
+        return lambda offset: offset
+
+    def convert(offset):
+        before = bisect_right(starts, offset - 2)  # ending at or before offset
+        if before < len(starts) and starts[before] == offset - 1:
+            raise InvalidEdit(f'Offset {offset} splits a surrogate pair')
+        return offset - before
+
+    return convert
+
+
+def _parse_op(op):
+    if isinstance(op, dict):
+        start, end, text = op.get('start'), op.get('end', op.get('start')), op.get('text', '')
+    elif isinstance(op, (list, tuple)) and len(op) == 3:
+        start, end, text = op
+    else:
+        raise InvalidEdit('Each operation must be {"start", "end", "text"} or [start, end, text]')
+    if type(start) is not int or type(end) is not int or not isinstance(text, str):
+        raise InvalidEdit('Operation start/end must be integers and text a string')
+    return start, end, text
+
+
+def apply_ops(content, ops, offset_unit='codepoint'):
+    """Apply edit operations to ``content`` and return the new text.
+
+    Each operation replaces ``content[start:end]`` with ``text``; offsets are
+    offsets into the *base* content, so a client can send every change made
+    since its base version without adjusting for earlier ones. They count
+    code points (Python string indexes) unless ``offset_unit`` is
+    ``'utf-16'``. Operations must not overlap. Returns the normalised
+    ``[start, end, text]`` list, in code points, alongside the result, which
+    is what the revision history stores.
+    """
+    if not isinstance(ops, list):
+        raise InvalidEdit('ops must be a list')
+    if offset_unit not in OFFSET_UNITS:
+        raise InvalidEdit(f"offset_unit must be one of: {', '.join(OFFSET_UNITS)}")
+
+    parsed = [_parse_op(op) for op in ops]
+    if offset_unit == 'utf-16':
+        convert = _utf16_to_codepoint(content)
+        parsed = [
+            (convert(start), convert(end), text) if start >= 0 and end >= 0 else (start, end, text)
+            for start, end, text in parsed
+        ]
+    parsed.sort(key=lambda op: (op[0], op[1]))
+    pieces = []
+    position = 0
+    for start, end, text in parsed:
+        if start < position or end < start or end > len(content):
+            raise InvalidEdit(f'Operation [{start}, {end}] is out of range or overlaps another')
+        pieces.append(content[position:start])
+        pieces.append(text)
+        position = end
+    pieces.append(content[position:])
+    return ''.join(pieces), [[start, end, text] for start, end, text in parsed if start != end or text]
+
+
+def _common_prefix_length(a, b):
+    # Binary search on slice equality: the comparisons run in C, so this is
+    # far quicker than a character loop on long notes
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix_length(a, b, limit):
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def diff_ops(old, new):
+    """Operations turning ``old`` into ``new``, for full-content (PUT) updates.
+
+    A single replacement between the common prefix and suffix: exact, linear
+    in the note size, and as small as a real diff for the typical autosave
+    that changed one region.
+    """
+    if old == new:
+        return []
+    prefix = _common_prefix_length(old, new)
+    suffix = _common_suffix_length(old, new, min(len(old), len(new)) - prefix)
+    return [[prefix, len(old) - suffix, new[prefix:len(new) - suffix]]]
+
+
+class NoteRevisionService:
+    """Keeps the version history of notes as compressed deltas and snapshots.
+
+    Every ``NOTE_REVISION_SNAPSHOT_INTERVAL`` versions, or when an edit
+    rewrites most of the note, the full content is stored; the versions in
+    between store only their edit operations. Reconstructing any version
+    therefore reads one snapshot and at most ``interval - 1`` small deltas.
+    Callers add revisions inside their own transaction and commit it.
+    """
+
+    def __init__(self, snapshot_interval=None):
+        self.snapshot_interval = max(1, snapshot_interval or Config.NOTE_REVISION_SNAPSHOT_INTERVAL)
+
+    @staticmethod
+    def _encode(value):
+        return zlib.compress(value.encode('utf-8'))
+
+    @staticmethod
+    def _decode(data):
+        return zlib.decompress(data).decode('utf-8')
+
+    def _add(self, note_id, version, kind, title, payload):
+        db.session.add(NoteRevision(
+            note_id=note_id,
+            version=version,
+            kind=kind,
+            title=title,
+            data=self._encode(payload)
+        ))
+
+    def record_created(self, note):
+        """Store the first version of a newly created (and flushed) note."""
+        self._add(note.id, note.version, NoteRevision.SNAPSHOT, note.title, note.content)
+
+    def record_update(self, note, previous_version, previous_title, previous_content, ops):
+        """Store ``note``'s new version, given the version it was edited from.
+
+        ``note`` must already be flushed so its version has been bumped.
+        """
+        last_snapshot = db.session.scalar(
+            select(NoteRevision.version)
+            .where(NoteRevision.note_id == note.id, NoteRevision.kind == NoteRevision.SNAPSHOT)
+            .order_by(NoteRevision.version.desc())
+            .limit(1)
+        )
+        if last_snapshot is None:
+            # Note created before history was kept: start it from the
+            # content this edit was based on
+            self._add(note.id, previous_version, NoteRevision.SNAPSHOT, previous_title, previous_content)
+            last_snapshot = previous_version
+
+        delta = json.dumps(ops, ensure_ascii=False, separators=(',', ':'))
+        if note.version - last_snapshot >= self.snapshot_interval or len(delta) * 2 > len(note.content):
+            self._add(note.id, note.version, NoteRevision.SNAPSHOT, note.title, note.content)
+        else:
+            self._add(note.id, note.version, NoteRevision.DELTA, note.title, delta)
+
+    def history(self, note_id):
+        return db.session.scalars(
+            select(NoteRevision)
+            .where(NoteRevision.note_id == note_id)
+            .order_by(NoteRevision.version.desc())
+        ).all()
+
+    def at_version(self, note_id, version):
+        """Return ``(revision, content)`` for ``version`` of a note, or ``None`` if it was not kept."""
+        snapshot = db.session.scalars(
+            select(NoteRevision)
+            .where(
+                NoteRevision.note_id == note_id,
+                NoteRevision.kind == NoteRevision.SNAPSHOT,
+                NoteRevision.version <= version
+            )
+            .order_by(NoteRevision.version.desc())
+            .limit(1)
+        ).first()
+        if snapshot is None:
+            return None
+
+        revision = snapshot
+        content = self._decode(snapshot.data)
+        if snapshot.version != version:
+            deltas = db.session.scalars(
+                select(NoteRevision)
+                .where(
+                    NoteRevision.note_id == note_id,
+                    NoteRevision.version > snapshot.version,
+                    NoteRevision.version <= version
+                )
+                .order_by(NoteRevision.version)
+            ).all()
+            if not deltas or deltas[-1].version != version:
+                return None
+            for revision in deltas:
+                content, _ = apply_ops(content, json.loads(self._decode(revision.data)))
+        return revision, content
+
+    def delete_history(self, note_id):
+        db.session.execute(delete(NoteRevision).where(NoteRevision.note_id == note_id))
@@ -0,0 +1,121 @@
+import re
+from xml.sax.saxutils import escape
+from reportlab.platypus import Paragraph, Preformatted, Spacer
+
+# Consecutive text lines are merged into one Paragraph, but capped: ReportLab
+# re-wraps the remainder of a paragraph every time it splits across a page,
+# so a single huge block would cost quadratic layout time.
+MAX_BLOCK_LINES = 20
+
+_FENCE = re.compile(r'^\s*(```|~~~)')
+_HEADING = re.compile(r'^(#{1,3})\s+(.*)$')
+_BULLET = re.compile(r'^(\s*)[-*+]\s+(.*)$')
+_ORDERED = re.compile(r'^(\s*)(\d+)[.)]\s+(.*)$')
+_HARD_BREAK = re.compile(r'(  |\\)$')
+
+# One pass over the escaped text: code spans first so their contents are left
+# alone, then bold, then italics.
+_INLINE = re.compile(
+    r'`(?P<code>[^`]+)`'
+    r'|\*\*(?P<bold>[^*]+)\*\*'
+    r'|__(?P<bold2>[^_]+)__'
+    r'|\*(?P<italic>[^*\s][^*]*)\*'
+    r'|(?<!\w)_(?P<italic2>[^_\s][^_]*)_(?!\w)'
+)
+
+
+def _inline_sub(match):
+    if match.group('code') is not None:
+        return f'<font face="Courier">{match.group("code")}</font>'
+    bold = match.group('bold') or match.group('bold2')
+    if bold is not None:
+        return f'<b>{bold}</b>'
+    return f'<i>{match.group("italic") or match.group("italic2")}</i>'
+
+
+def inline_markup(text):
+    """Escape ``text`` for ReportLab's paragraph parser and convert inline Markdown."""
+    return _INLINE.sub(_inline_sub, escape(text))
+
+
+def plain_markup(text):
+    """Escape ``text`` so it is rendered literally inside a Paragraph."""
+    return escape(text)
+
+
+def content_flowables(content, theme):
+    """Turn note content (plain text or light Markdown) into flowables.
+
+    Handles ``#`` headings, fenced code blocks, ``-``/``*``/``1.`` list items
+    and blank-line separated paragraphs. As in Markdown, consecutive lines
+    form one paragraph unless a line ends in two spaces or a backslash (a
+    hard break). Any ``<`` or ``&`` in the note is escaped, so user text can
+    never break the PDF build.
+    """
+    flowables = []
+    block = []
+    code = None
+
+    def flush_block(continued=False):
+        if block:
+            style = theme.content_continued_style if continued else theme.content_style
+            text = ''.join(block).rstrip(' ')
+            if text.endswith('<br/>'):
+                text = text[:-len('<br/>')]
+            flowables.append(Paragraph(text, style))
+            block.clear()
+
+    for line in content.split('\n'):
+        if code is not None:
+            if _FENCE.match(line):
+                flowables.append(Preformatted('\n'.join(code), theme.code_style))
+                code = None
+            else:
+                code.append(line)
+            continue
+
+        if _FENCE.match(line):
+            flush_block()
+            code = []
+            continue
+
+        if not line.strip():
+            flush_block()
+            if not flowables or not isinstance(flowables[-1], Spacer):
+                flowables.append(Spacer(1, theme.small_gap))
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            flush_block()
+            flowables.append(Paragraph(inline_markup(heading.group(2)), theme.content_heading_style))
+            continue
+
+        bullet = _BULLET.match(line)
+        ordered = None if bullet else _ORDERED.match(line)
+        if bullet or ordered:
+            flush_block()
+            if bullet:
+                indent, marker, text = bullet.group(1), '•', bullet.group(2)
+            else:
+                indent, marker, text = ordered.group(1), f'{ordered.group(2)}.', ordered.group(3)
+            depth = len(indent.expandtabs(4)) // 2
+            flowables.append(Paragraph(
+                inline_markup(text),
+                theme.list_styles[min(depth, len(theme.list_styles) - 1)],
+                bulletText=marker
+            ))
+            continue
+
+        hard_break = _HARD_BREAK.search(line)
+        text = inline_markup((line[:hard_break.start()] if hard_break else line).strip())
+        block.append(text + ('<br/>' if hard_break else ' '))
+        if len(block) >= MAX_BLOCK_LINES:
+            flush_block(continued=True)
+
+    if code is not None:
+        # Unterminated fence: keep what we have rather than dropping it
+        flowables.append(Preformatted('\n'.join(code), theme.code_style))
+    flush_block()
+
+    return flowables
@@ -0,0 +1,299 @@
+import hashlib
+import io
+import zlib
+from array import array
+from collections import namedtuple
+from pathlib import Path
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject, DecodedStreamObject, DictionaryObject, IndirectObject, NameObject, NumberObject,
+    StreamObject, create_string_object
+)
+
+
+# Resources every ReportLab part carries its own identical copy of; with
+# ``share_resources`` each distinct one is written once
+_SHARED_TYPES = {'/Font', '/FontDescriptor', '/Encoding', '/ExtGState'}
+
+# Stream encodings that recompress_streams may replace: ReportLab's default
+# ASCII85 on top of Flate makes page content about a quarter bigger
+_RECOMPRESSIBLE_FILTERS = {'/ASCII85Decode', '/FlateDecode'}
+
+# Text drawn over page ``page_index`` of an appended PDF: ``operators`` is
+# content stream source that selects the standard-14 ``font`` as /Stamp
+PageStamp = namedtuple('PageStamp', ['page_index', 'font', 'operators'])
+
+
+class PdfStitcher:
+    """Concatenates PDFs into ``target`` part by part, without building the result in memory.
+
+    ``pypdf.PdfWriter`` keeps every appended page and its resources until it
+    is written out, so a stitched export used memory in proportion to the
+    whole document. Here each part's pages and the objects they reference
+    are written to ``target`` as soon as the part is appended and the part
+    is dropped; only the byte offsets of the objects written, the ids of
+    the pages and the digests of shared resources are kept until
+    :meth:`close` writes the page tree and cross-reference table.
+
+    Outline entries are written one behind (each needs the id of the next),
+    so bookmarks add no per-entry memory either. ``target`` is a path or a
+    binary file object positioned where the PDF should start.
+
+    :class:`PageStamp` adds text to a page as it is copied, so a part can be
+    reused (e.g. from a cache) with details that differ between exports.
+
+    ``recompress_streams`` rewrites ASCII85/Flate encoded streams as plain
+    Flate at the highest compression level.
+    """
+
+    def __init__(self, target, share_resources=False, recompress_streams=False):
+        if isinstance(target, (str, Path)):
+            self._file = open(target, 'wb')
+            self._owns_file = True
+        else:
+            self._file = target
+            self._owns_file = False
+        self.share_resources = share_resources
+        self.recompress_streams = recompress_streams
+        self._position = 0
+        self._offsets = array('q', [0])  # by object number; 0 is the free-list head
+        self._pages = array('q')
+        self._shared = {}  # digest of a shared resource -> its object number
+        self._outline_count = 0
+        self._pending_outline = None  # (id, title, page id, previous id)
+        self._first_outline = None
+        self._outline_id = None
+        self._stamp_fonts = {}  # base font -> object number
+        self._save_state_id = None
+
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._pages_id = self._allocate()
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def append(self, data, outline=(), stamps=()):
+        """Append every page of the PDF ``data``.
+
+        ``outline`` is ``(title, 0-based page index within data)`` pairs to
+        bookmark; ``stamps`` is :class:`PageStamp` entries to draw (those on
+        one page must use the same font).
+        """
+        reader = PdfReader(io.BytesIO(data))
+        ids = {}
+        queue = []
+        first_page = len(self._pages)
+        stamps_by_page = {}
+        for stamp in stamps:
+            stamps_by_page.setdefault(stamp.page_index, []).append(stamp)
+
+        pages = list(reader.pages)
+        for page in pages:
+            page_id = self._allocate()
+            ids[page.indirect_reference.idnum] = page_id
+            self._pages.append(page_id)
+
+        def reference(obj):
+            """New object number for the part's indirect object ``obj``, writing shared ones now."""
+            if obj.idnum in ids:
+                return ids[obj.idnum]
+            resolved = obj.get_object()
+            if self.share_resources and self._is_shared(resolved):
+                serialized = self._serialize(copy(resolved))
+                digest = hashlib.sha1(serialized).digest()
+                if digest not in self._shared:
+                    self._shared[digest] = self._allocate()
+                    self._write_object(self._shared[digest], serialized)
+                ids[obj.idnum] = self._shared[digest]
+            else:
+                ids[obj.idnum] = self._allocate()
+                queue.append((ids[obj.idnum], resolved))
+            return ids[obj.idnum]
+
+        def copy(obj):
+            """``obj`` with the part's object numbers replaced by ours."""
+            if isinstance(obj, IndirectObject):
+                return IndirectObject(reference(obj), 0, None)
+            if isinstance(obj, StreamObject):
+                # Streams can only be indirect objects; write inline ones
+                # (e.g. contents added by pypdf) separately
+                number = self._allocate()
+                queue.append((number, obj))
+                return IndirectObject(number, 0, None)
+            if isinstance(obj, DictionaryObject):
+                return DictionaryObject({key: copy(value) for key, value in obj.items()})
+            if isinstance(obj, ArrayObject):
+                return ArrayObject(copy(value) for value in obj)
+            return obj
+
+        for page_index, page in enumerate(pages):
+            # reader.pages has already copied attributes inherited from the
+            # part's page tree (MediaBox, Resources, ...) onto each page
+            page_dict = DictionaryObject({
+                key: copy(value) for key, value in page.items() if key != '/Parent'
+            })
+            if page_index in stamps_by_page:
+                # The stamp font joins the page's own fonts, in a copy of its
+                # resources (which other pages of the part may share)
+                resources = page.get('/Resources')
+                resources = resources.get_object() if resources is not None else DictionaryObject()
+                fonts = resources.get('/Font')
+                fonts = fonts.get_object() if fonts is not None else DictionaryObject()
+                resources = DictionaryObject({key: copy(value) for key, value in resources.items()})
+                resources[NameObject('/Font')] = DictionaryObject({key: copy(value) for key, value in fonts.items()})
+                page_dict[NameObject('/Resources')] = resources
+                self._stamp(page_dict, stamps_by_page[page_index])
+            page_dict[NameObject('/Parent')] = IndirectObject(self._pages_id, 0, None)
+            self._write_object(ids[page.indirect_reference.idnum], self._serialize(page_dict))
+
+            while queue:
+                number, obj = queue.pop()
+                if isinstance(obj, StreamObject):
+                    obj = self._copy_stream(obj, copy)
+                else:
+                    obj = copy(obj)
+                self._write_object(number, self._serialize(obj))
+
+        for title, page_index in outline:
+            self._add_outline_item(title, self._pages[first_page + page_index])
+
+    def close(self):
+        """Write the page tree, outline, catalog and cross-reference table."""
+        kids = ArrayObject(IndirectObject(page_id, 0, None) for page_id in self._pages)
+        self._write_object(self._pages_id, self._serialize(DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): kids,
+            NameObject('/Count'): NumberObject(len(self._pages)),
+        })))
+
+        catalog = DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): IndirectObject(self._pages_id, 0, None),
+        })
+        if self._pending_outline is not None:
+            last_id = self._pending_outline[0]
+            self._flush_outline_item(None)
+            self._write_object(self._outline_id, self._serialize(DictionaryObject({
+                NameObject('/Type'): NameObject('/Outlines'),
+                NameObject('/First'): IndirectObject(self._first_outline, 0, None),
+                NameObject('/Last'): IndirectObject(last_id, 0, None),
+                NameObject('/Count'): NumberObject(self._outline_count),
+            })))
+            catalog[NameObject('/Outlines')] = IndirectObject(self._outline_id, 0, None)
+            catalog[NameObject('/PageMode')] = NameObject('/UseOutlines')
+
+        catalog_id = self._allocate()
+        self._write_object(catalog_id, self._serialize(catalog))
+
+        xref_position = self._position
+        lines = [f'xref\n0 {len(self._offsets)}\n0000000000 65535 f \n']
+        lines.extend(f'{offset:010d} 00000 n \n' for offset in self._offsets[1:])
+        self._write(''.join(lines).encode('ascii'))
+        trailer = self._serialize(DictionaryObject({
+            NameObject('/Size'): NumberObject(len(self._offsets)),
+            NameObject('/Root'): IndirectObject(catalog_id, 0, None),
+        }))
+        self._write(b'trailer\n' + trailer + f'\nstartxref\n{xref_position}\n%%EOF\n'.encode('ascii'))
+
+        if self._owns_file:
+            self._file.close()
+
+    def _copy_stream(self, obj, copy):
+        stream = DecodedStreamObject()
+        stream.update({key: copy(value) for key, value in obj.items() if key != '/Length'})
+        filters = obj.get('/Filter')
+        filters = [filters] if isinstance(filters, NameObject) else list(filters or ())
+        if self.recompress_streams and filters and '/DecodeParms' not in obj \
+                and set(filters) <= _RECOMPRESSIBLE_FILTERS:
+            stream[NameObject('/Filter')] = NameObject('/FlateDecode')
+            stream.set_data(zlib.compress(obj.get_data(), 9))
+        else:
+            # The raw, still encoded bytes: copied as they are
+            stream.set_data(obj._data)
+        return stream
+
+    def _stamp(self, page_dict, stamps):
+        """Draw ``stamps`` after the page's own content, in a clean graphics state.
+
+        ``page_dict`` is the copied page, with resources of its own.
+        """
+        if self._save_state_id is None:
+            self._save_state_id = self._write_stream(b'q\n')
+        contents = page_dict.get('/Contents')
+        contents = list(contents) if isinstance(contents, ArrayObject) else [contents] if contents else []
+        operators = b'\nQ\n' + b'\n'.join(stamp.operators for stamp in stamps)
+        page_dict[NameObject('/Contents')] = ArrayObject([
+            IndirectObject(self._save_state_id, 0, None), *contents,
+            IndirectObject(self._write_stream(operators), 0, None),
+        ])
+
+        fonts = page_dict['/Resources']['/Font']
+        fonts[NameObject('/Stamp')] = IndirectObject(self._stamp_font(stamps[0].font), 0, None)
+
+    def _stamp_font(self, base_font):
+        if base_font not in self._stamp_fonts:
+            number = self._allocate()
+            self._write_object(number, self._serialize(DictionaryObject({
+                NameObject('/Type'): NameObject('/Font'),
+                NameObject('/Subtype'): NameObject('/Type1'),
+                NameObject('/BaseFont'): NameObject(f'/{base_font}'),
+                NameObject('/Encoding'): NameObject('/WinAnsiEncoding'),
+            })))
+            self._stamp_fonts[base_font] = number
+        return self._stamp_fonts[base_font]
+
+    def _write_stream(self, data):
+        stream = DecodedStreamObject()
+        stream.set_data(data)
+        number = self._allocate()
+        self._write_object(number, self._serialize(stream))
+        return number
+
+    def _add_outline_item(self, title, page_id):
+        if self._outline_id is None:
+            self._outline_id = self._allocate()
+        item_id = self._allocate()
+        if self._pending_outline is None:
+            self._first_outline = item_id
+        else:
+            self._flush_outline_item(item_id)
+        previous_id = self._pending_outline[0] if self._pending_outline is not None else None
+        self._pending_outline = (item_id, title, page_id, previous_id)
+        self._outline_count += 1
+
+    def _flush_outline_item(self, next_id):
+        item_id, title, page_id, previous_id = self._pending_outline
+        item = DictionaryObject({
+            NameObject('/Title'): create_string_object(title),
+            NameObject('/Parent'): IndirectObject(self._outline_id, 0, None),
+            NameObject('/Dest'): ArrayObject([IndirectObject(page_id, 0, None), NameObject('/Fit')]),
+        })
+        if previous_id is not None:
+            item[NameObject('/Prev')] = IndirectObject(previous_id, 0, None)
+        if next_id is not None:
+            item[NameObject('/Next')] = IndirectObject(next_id, 0, None)
+        self._write_object(item_id, self._serialize(item))
+
+    @staticmethod
+    def _is_shared(obj):
+        return isinstance(obj, DictionaryObject) and not isinstance(obj, StreamObject) \
+            and obj.get('/Type') in _SHARED_TYPES
+
+    @staticmethod
+    def _serialize(obj):
+        buffer = io.BytesIO()
+        obj.write_to_stream(buffer)
+        return buffer.getvalue()
+
+    def _allocate(self):
+        self._offsets.append(0)
+        return len(self._offsets) - 1
+
+    def _write_object(self, number, serialized):
+        self._offsets[number] = self._position
+        self._write(f'{number} 0 obj\n'.encode('ascii') + serialized + b'\nendobj\n')
+
+    def _write(self, data):
+        self._file.write(data)
+        self._position += len(data)
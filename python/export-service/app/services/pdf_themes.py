@@ -0,0 +1,165 @@
+from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+
+# ReportLab's sample stylesheet is only used as the parent of our styles, so
+# build it once per process instead of once per export.
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+
+class PdfTheme:
+    """Page geometry and paragraph styles for one export look.
+
+    Themes are immutable once built and shared by every export in the process.
+    """
+
+    # ReportLab's default Frame padding
+    FRAME_PADDING = 6
+
+    def __init__(self, name, pagesize=letter, margins=(72, 72, 72, 18),
+                 font='Helvetica', bold_font='Helvetica-Bold', font_size=12,
+                 title_color='#2c3e50', text_color='#34495e', meta_color='#7f8c8d'):
+        self.name = name
+        self.pagesize = pagesize
+        self.right_margin, self.left_margin, self.top_margin, self.bottom_margin = margins
+
+        scale = font_size / 12
+        heading1 = _SAMPLE_STYLES['Heading1']
+        heading2 = _SAMPLE_STYLES['Heading2']
+        normal = _SAMPLE_STYLES['Normal']
+
+        self.title_style = ParagraphStyle(
+            f'{name}-Title',
+            parent=heading1,
+            fontName=bold_font,
+            fontSize=24 * scale,
+            leading=heading1.leading * scale,
+            textColor=title_color,
+            spaceAfter=30 * scale,
+            alignment=TA_CENTER
+        )
+
+        self.note_title_style = ParagraphStyle(
+            f'{name}-NoteTitle',
+            parent=heading2,
+            fontName=bold_font,
+            fontSize=18 * scale,
+            leading=heading2.leading * scale,
+            textColor=text_color,
+            spaceAfter=15 * scale,
+            spaceBefore=20 * scale
+        )
+
+        self.content_style = ParagraphStyle(
+            f'{name}-Content',
+            parent=normal,
+            fontName=font,
+            fontSize=font_size,
+            leading=18 * scale,
+            textColor=text_color,
+            alignment=TA_LEFT,
+            spaceAfter=12 * scale
+        )
+
+        self.meta_style = ParagraphStyle(
+            f'{name}-Meta',
+            parent=normal,
+            fontName=font,
+            fontSize=10 * scale,
+            leading=normal.leading * scale,
+            textColor=meta_color,
+            alignment=TA_LEFT
+        )
+
+        # Used for all but the last piece of a paragraph that was split up
+        self.content_continued_style = ParagraphStyle(
+            f'{name}-ContentContinued',
+            parent=self.content_style,
+            spaceAfter=0
+        )
+
+        self.content_heading_style = ParagraphStyle(
+            f'{name}-ContentHeading',
+            parent=self.content_style,
+            fontName=bold_font,
+            fontSize=14 * scale,
+            leading=18 * scale,
+            textColor=title_color,
+            spaceBefore=6 * scale,
+            spaceAfter=6 * scale
+        )
+
+        self.list_styles = [
+            ParagraphStyle(
+                f'{name}-List{depth}',
+                parent=self.content_style,
+                leftIndent=(18 + 18 * depth) * scale,
+                bulletIndent=(6 + 18 * depth) * scale,
+                bulletFontName=font,
+                spaceAfter=4 * scale
+            )
+            for depth in range(3)
+        ]
+
+        self.code_style = ParagraphStyle(
+            f'{name}-Code',
+            parent=normal,
+            fontName='Courier',
+            fontSize=10 * scale,
+            leading=13 * scale,
+            textColor=text_color,
+            backColor='#f4f6f7',
+            leftIndent=6 * scale,
+            rightIndent=6 * scale,
+            borderPadding=4 * scale,
+            spaceBefore=6 * scale,
+            spaceAfter=12 * scale
+        )
+
+        # Vertical gaps used between blocks of a note
+        self.small_gap = 0.1 * inch * scale
+        self.title_gap = 0.2 * inch * scale
+        self.section_gap = 0.3 * inch * scale
+
+    def page_top_left(self):
+        """Where a flowable that starts a page is drawn: its left edge and the top of its box.
+
+        The frames of a ``SimpleDocTemplate`` are inset from the margins by
+        ``FRAME_PADDING``, and space before the first flowable on a page is
+        dropped.
+        """
+        return self.left_margin + self.FRAME_PADDING, self.pagesize[1] - self.top_margin - self.FRAME_PADDING
+
+    def document_kwargs(self):
+        return {
+            'pagesize': self.pagesize,
+            'rightMargin': self.right_margin,
+            'leftMargin': self.left_margin,
+            'topMargin': self.top_margin,
+            'bottomMargin': self.bottom_margin,
+        }
+
+    def __repr__(self):
+        return f'<PdfTheme {self.name}>'
+
+
+DEFAULT_THEME = 'default'
+
+THEMES = {
+    theme.name: theme for theme in (
+        PdfTheme(DEFAULT_THEME),
+        PdfTheme('a4', pagesize=A4),
+        PdfTheme('serif', pagesize=A4, font='Times-Roman', bold_font='Times-Bold',
+                 title_color='#1a1a1a', text_color='#1a1a1a', meta_color='#555555'),
+        PdfTheme('compact', margins=(48, 48, 48, 18), font_size=10),
+    )
+}
+
+
+def get_theme(name=None):
+    """Return the registered theme called ``name`` (the default theme if ``None``).
+
+    Raises ``KeyError`` for unknown names.
+    """
+    return THEMES[name or DEFAULT_THEME]
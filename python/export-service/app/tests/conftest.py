@@ -0,0 +1,59 @@
+import pytest
+
+from app.core.config import Config
+from app.core.database import db
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build the app on a SQLite database in ``tmp_path``; keyword arguments override app config.
+
+    Services read the ``Config`` class directly, so their settings are
+    changed with ``monkeypatch`` instead.
+    """
+    created = []
+
+    def make(**overrides):
+        from main import create_app
+
+        class TestConfig(Config):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/notes.db'
+
+        for name, value in overrides.items():
+            setattr(TestConfig, name, value)
+
+        app = create_app(TestConfig)
+        created.append(app)
+        return app
+
+    yield make
+
+    for app in created:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def export_service(tmp_path, monkeypatch):
+    """The export endpoints' service, writing nothing outside ``tmp_path``, with no fragment cache."""
+    from app.api.endpoints import export
+
+    service = export.export_service
+    monkeypatch.setattr(service, 'export_dir', tmp_path / 'exports')
+    monkeypatch.setattr(service, 'persist', False)
+    monkeypatch.setattr(service, 'fragment_cache', None)
+    service.export_dir.mkdir(exist_ok=True)
+    return service
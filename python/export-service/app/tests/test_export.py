@@ -0,0 +1,146 @@
+import io
+
+import pytest
+from pypdf import PdfReader
+
+
+def _create_notes(client, count):
+    for i in range(1, count + 1):
+        response = client.post('/api/notes', json={'title': f'Note {i}', 'content': f'Body of note {i}'})
+        assert response.status_code == 201
+
+
+def test_bulk_export_is_stitched_from_parts(client, export_service, monkeypatch):
+    monkeypatch.setattr(export_service, 'parallel_chunk_size', 2)
+    _create_notes(client, 5)
+
+    response = client.post('/api/export/all', json={'parallel': False, 'bookmarks': True})
+
+    assert response.status_code == 200
+    reader = PdfReader(io.BytesIO(response.get_data()))
+    assert len(reader.pages) == 5
+    assert len(reader.outline) == 5
+    assert 'Notes Export' in reader.pages[0].extract_text()
+    assert int(response.headers['X-Export-Size']) == len(response.get_data())
+
+
+def test_parallel_export_matches_the_serial_one(client, export_service, monkeypatch):
+    monkeypatch.setattr(export_service, 'parallel_chunk_size', 2)
+    monkeypatch.setattr(export_service, 'parallel_workers', 2)
+    monkeypatch.setattr(export_service, '_process_pool', None)
+    _create_notes(client, 7)
+    payload = {'note_ids': list(range(1, 8)), 'bookmarks': True}
+
+    try:
+        parallel = client.post('/api/export/notes', json={**payload, 'parallel': True})
+        assert export_service._process_pool is not None
+    finally:
+        if export_service._process_pool is not None:
+            export_service._process_pool.shutdown()
+    serial = client.post('/api/export/notes', json={**payload, 'parallel': False})
+
+    assert parallel.status_code == 200
+    reader = PdfReader(io.BytesIO(parallel.get_data()))
+    assert len(reader.pages) == 7
+    assert [item.title for item in reader.outline] == [f'{i}. Note {i}' for i in range(1, 8)]
+    assert [reader.get_destination_page_number(item) for item in reader.outline] == list(range(7))
+    assert [page.extract_text() for page in reader.pages] == \
+        [page.extract_text() for page in PdfReader(io.BytesIO(serial.get_data())).pages]
+
+
+def _note_numbers(pdf_bytes):
+    """The note number on each page, with where it is drawn."""
+    numbers = []
+    for page in PdfReader(io.BytesIO(pdf_bytes)).pages:
+        found = []
+
+        def visit(text, cm, tm, font, size):
+            text = text.strip()
+            if text.endswith('.') and text[:-1].isdigit():
+                found.append((text, round(cm[4] + tm[4], 1), round(cm[5] + tm[5], 1)))
+
+        page.extract_text(visitor_text=visit)
+        numbers.append(found)
+    return numbers
+
+
+def test_cached_fragments_are_numbered_where_they_land(client, export_service, monkeypatch, tmp_path):
+    from app.services.fragment_cache import FragmentCache
+
+    monkeypatch.setattr(export_service, 'parallel_chunk_size', 2)
+    _create_notes(client, 4)
+    uncached = client.post('/api/export/notes', json={'note_ids': [1, 2, 3, 4], 'parallel': False})
+
+    cache = FragmentCache(tmp_path / 'fragments', 10 * 1024 * 1024)
+    monkeypatch.setattr(export_service, 'fragment_cache', cache)
+    cached = client.post('/api/export/notes', json={'note_ids': [1, 2, 3, 4], 'parallel': False})
+
+    # Same numbers in the same places as notes rendered in one go
+    assert _note_numbers(cached.get_data()) == _note_numbers(uncached.get_data())
+    assert [page[0][0] for page in _note_numbers(cached.get_data())] == ['1.', '2.', '3.', '4.']
+
+    # Note 3 moves up to second place: its fragment is reused, numbered 2
+    entries = sorted(path.name for path in (tmp_path / 'fragments').rglob('*.pdf'))
+    reordered = client.post('/api/export/notes', json={'note_ids': [1, 3, 4], 'parallel': False})
+    assert PdfReader(io.BytesIO(reordered.get_data())).pages[1].extract_text().startswith('Note 3')
+    assert [page[0][0] for page in _note_numbers(reordered.get_data())] == ['1.', '2.', '3.']
+    assert sorted(path.name for path in (tmp_path / 'fragments').rglob('*.pdf')) == entries
+
+
+def test_compact_exports_are_smaller_with_the_same_content(client, export_service):
+    client.post('/api/notes', json={'title': 'Long note', 'content': 'Some words in a line.\n' * 400})
+    _create_notes(client, 3)
+
+    for path, payload in (
+        ('/api/export/note/1', {}),
+        ('/api/export/all', {'parallel': False, 'bookmarks': True}),
+        ('/api/export/notes', {'note_ids': [1, 2, 3, 4], 'bookmarks': True}),
+    ):
+        plain = client.post(path, json={**payload, 'compact': False})
+        compact = client.post(path, json={**payload, 'compact': True})
+
+        assert compact.headers['X-Export-Compact'] == 'true'
+        assert len(compact.get_data()) < 0.9 * len(plain.get_data())
+        plain_reader = PdfReader(io.BytesIO(plain.get_data()))
+        compact_reader = PdfReader(io.BytesIO(compact.get_data()))
+        assert [page.extract_text() for page in compact_reader.pages] == \
+            [page.extract_text() for page in plain_reader.pages]
+        assert [item.title for item in compact_reader.outline] == [item.title for item in plain_reader.outline]
+
+
+def test_export_filename_cannot_leave_the_export_dir(client, export_service, monkeypatch):
+    monkeypatch.setattr(export_service, 'persist', True)
+    _create_notes(client, 1)
+
+    response = client.post('/api/export/note/1', json={'filename': '../../escaped.pdf'})
+
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'] == 'attachment; filename=escaped.pdf'
+    assert [path.name for path in export_service.export_dir.iterdir()] == ['escaped.pdf']
+    assert not (export_service.export_dir.parent.parent / 'escaped.pdf').exists()
+
+
+@pytest.mark.parametrize('path', ['/api/export/note/1', '/api/export/notes', '/api/export/all', '/api/export/jobs'])
+def test_export_filename_must_be_a_pdf(client, export_service, path):
+    _create_notes(client, 1)
+
+    response = client.post(path, json={'note_ids': [1], 'filename': 'main.py'})
+
+    assert response.status_code == 400
+    assert list(export_service.export_dir.iterdir()) == []
+
+
+def test_failed_persisted_export_keeps_the_previous_file(export_service):
+    previous = export_service.export_dir / 'notes.pdf'
+    previous.write_bytes(b'%PDF previous')
+
+    def render(target):
+        with open(target, 'wb') as f:
+            f.write(b'%PDF partial')
+        raise RuntimeError('render failed')
+
+    with pytest.raises(RuntimeError):
+        export_service._build('notes.pdf', True, None, render)
+
+    assert [path.name for path in export_service.export_dir.iterdir()] == ['notes.pdf']
+    assert previous.read_bytes() == b'%PDF previous'
@@ -0,0 +1,101 @@
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+from sqlalchemy import inspect
+
+from app.core.database import db
+from app.models.export_job import ExportJob
+
+
+def _wait_until_finished(client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        data = client.get(f'/api/export/jobs/{job_id}').get_json()['data']
+        if data['status'] not in (ExportJob.PENDING, ExportJob.RUNNING):
+            return data
+        time.sleep(0.05)
+    raise AssertionError(f'export job {job_id} did not finish')
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_job_runs_to_completion(client, export_service):
+    client.post('/api/notes', json={'title': 'Note', 'content': 'Body'})
+
+    response = client.post('/api/export/jobs', json={})
+    assert response.status_code == 202
+    job = _wait_until_finished(client, response.get_json()['data']['id'])
+
+    assert job['status'] == ExportJob.COMPLETED
+    assert job['progress'] == 100
+    download = client.get(f"/api/export/jobs/{job['id']}/download")
+    assert download.get_data().startswith(b'%PDF')
+
+
+def test_job_failed_before_it_started_is_not_run(app, export_service):
+    from app.api.endpoints.export import export_job_service as service
+
+    with app.app_context():
+        job = ExportJob(filename='x.pdf', status=ExportJob.FAILED, error='Export job timed out')
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+
+    service._slots.acquire()  # released by _run, as for a submitted job
+    service._run(app, job_id)
+
+    with app.app_context():
+        job = db.session.get(ExportJob, job_id)
+        assert job.status == ExportJob.FAILED
+        assert job.error == 'Export job timed out'
+        assert job.file_path is None
+
+
+def test_jobs_of_exited_processes_are_failed_on_startup(app, export_service):
+    from app.api.endpoints.export import export_job_service as service
+
+    host = socket.gethostname()
+    owners = {
+        'dead': f'{host}:{_dead_pid()}',
+        'alive': f'{host}:{os.getppid()}',
+        'other_host': f'not-{host}:1',
+    }
+    with app.app_context():
+        for name, owner in owners.items():
+            db.session.add(ExportJob(id=name, filename='x.pdf', status=ExportJob.RUNNING, owner=owner))
+        db.session.commit()
+
+        assert service.fail_orphaned() == 1
+        statuses = {job.id: job.status for job in db.session.scalars(db.select(ExportJob))}
+
+    assert statuses == {'dead': ExportJob.FAILED, 'alive': ExportJob.RUNNING, 'other_host': ExportJob.RUNNING}
+
+
+def test_upgrade_adds_the_owner_column(tmp_path, make_app):
+    connection = sqlite3.connect(tmp_path / 'notes.db')
+    connection.execute(
+        'CREATE TABLE export_jobs (id VARCHAR(32) NOT NULL PRIMARY KEY, status VARCHAR(20) NOT NULL, '
+        'progress INTEGER NOT NULL, note_ids JSON, theme VARCHAR(50), bookmarks BOOLEAN NOT NULL, '
+        "compact BOOLEAN DEFAULT '0' NOT NULL, filename VARCHAR(255) NOT NULL, file_path VARCHAR(500), "
+        'error TEXT, created_at DATETIME, updated_at DATETIME, completed_at DATETIME)'
+    )
+    connection.execute(
+        "INSERT INTO export_jobs (id, status, progress, bookmarks, filename) VALUES ('old', 'running', 40, 0, 'x.pdf')"
+    )
+    connection.commit()
+    connection.close()
+
+    app = make_app()
+
+    with app.app_context():
+        assert 'owner' in {column['name'] for column in inspect(db.engine).get_columns('export_jobs')}
+        # Without an owner it is left to the stalled-job timeout
+        assert db.session.get(ExportJob, 'old').status == ExportJob.RUNNING
@@ -0,0 +1,36 @@
+import io
+
+import pytest
+from docx import Document
+
+
+@pytest.mark.parametrize('path', ['/api/export/note/1', '/api/export/all'])
+def test_docx_export_drops_characters_xml_cannot_hold(client, export_service, path):
+    client.post('/api/notes', json={'title': 'Bell\x07 title', 'content': 'Tab\tkept\x00\nForm\x0cfeed'})
+
+    response = client.post(path, json={'format': 'docx'})
+
+    assert response.status_code == 200
+    text = [paragraph.text for paragraph in Document(io.BytesIO(response.get_data())).paragraphs]
+    assert any(line.endswith('Bell title') for line in text)
+    assert 'Tab\tkept' in text
+    assert 'Formfeed' in text
+
+
+@pytest.mark.parametrize('export_format, content_type', [
+    ('pdf', 'application/pdf'),
+    ('markdown', 'text/markdown; charset=utf-8'),
+    ('html', 'text/html; charset=utf-8'),
+    ('json', 'application/json'),
+    ('ndjson', 'application/x-ndjson'),
+    ('docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    ('zip', 'application/zip'),
+])
+@pytest.mark.parametrize('path', ['/api/export/note/1', '/api/export/all'])
+def test_export_content_type(client, export_service, path, export_format, content_type):
+    client.post('/api/notes', json={'title': 'Note', 'content': 'Body'})
+
+    response = client.post(path, json={'format': export_format})
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == content_type
@@ -0,0 +1,62 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+PROVIDERS = ['orjson', 'stdlib']
+
+# Unsorted at every level, with keys that sort differently as numbers and as strings
+PAYLOAD = {
+    'success': True,
+    'data': {'total': Decimal('12.50'), 'count': 3, 'ratio': 0.25},
+    'pages': {10: 'ten', 2: 'two', 1.5: 'one and a half', True: 'true'},
+    'items': [{'z': None, 'a': [1, 'two', {'y': 1, 'x': 2}]}],
+}
+
+
+def _body(app, obj):
+    with app.app_context():
+        return app.json.response(obj).get_data()
+
+
+@pytest.mark.parametrize('provider', PROVIDERS)
+def test_output_matches_flasks_default_provider(make_app, provider):
+    app = make_app(JSON_PROVIDER=provider)
+
+    with app.app_context():
+        expected = DefaultJSONProvider(app).response(PAYLOAD).get_data()
+
+    assert _body(app, PAYLOAD) == expected
+
+
+@pytest.mark.parametrize('provider', PROVIDERS)
+def test_dates_are_iso_8601(make_app, provider):
+    app = make_app(JSON_PROVIDER=provider)
+    moment = datetime(2024, 2, 29, 13, 45, 7, 120000)
+
+    body = json.loads(_body(app, {'at': moment, 'on': moment.date(), 'whole': datetime(2024, 1, 1)}))
+
+    # As Note.to_dict() writes them
+    assert body == {'at': moment.isoformat(), 'on': date(2024, 2, 29).isoformat(), 'whole': '2024-01-01T00:00:00'}
+
+
+@pytest.mark.parametrize('provider', PROVIDERS)
+def test_keys_are_left_in_order_without_json_sort_keys(make_app, provider):
+    app = make_app(JSON_PROVIDER=provider, JSON_SORT_KEYS=False)
+
+    body = json.loads(_body(app, PAYLOAD))
+
+    assert list(body) == ['success', 'data', 'pages', 'items']
+    assert list(body['pages']) == ['10', '2', '1.5', 'true']
+    assert list(body['items'][0]) == ['z', 'a']
+    assert body['data']['total'] == '12.50'
+
+
+@pytest.mark.parametrize('provider', PROVIDERS)
+def test_unserializable_values_raise(make_app, provider):
+    app = make_app(JSON_PROVIDER=provider)
+
+    with app.app_context(), pytest.raises(TypeError):
+        app.json.dumps({'value': object()})
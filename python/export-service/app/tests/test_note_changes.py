@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+from app.core.database import db
+
+
+BASELINE_SCHEMA = '''
+CREATE TABLE notes (
+    id INTEGER NOT NULL PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    content TEXT NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME
+)
+'''
+
+
+def _baseline_database(tmp_path, count):
+    """A notes table as created before versions, the change feed and tombstones existed."""
+    connection = sqlite3.connect(tmp_path / 'notes.db')
+    connection.execute(BASELINE_SCHEMA)
+    connection.executemany(
+        'INSERT INTO notes (id, title, content, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+        [
+            (i, f'Note {i}', f'Content {i}', f'2023-01-0{i} 10:00:00.000000', f'2023-02-0{i} 12:30:00.000000')
+            for i in range(1, count + 1)
+        ]
+    )
+    connection.commit()
+    connection.close()
+
+
+def test_upgrade_numbers_legacy_notes_without_touching_updated_at(tmp_path, make_app):
+    _baseline_database(tmp_path, 3)
+
+    app = make_app()
+
+    with app.app_context():
+        rows = db.session.execute(
+            db.text('SELECT id, updated_at, version, change_seq FROM notes ORDER BY id')
+        ).all()
+    assert [row.updated_at for row in rows] == [f'2023-02-0{i} 12:30:00.000000' for i in (1, 2, 3)]
+    assert [row.version for row in rows] == [1, 1, 1]
+    assert [row.change_seq for row in rows] == [1, 2, 3]
+
+    response = app.test_client().get('/api/notes/changes?since=0')
+    body = response.get_json()
+    assert [change['updated_at'] for change in body['data']] == [
+        datetime(2023, 2, i, 12, 30).isoformat() for i in (1, 2, 3)
+    ]
+    assert body['next_since'] == 3
+
+    # A second start must not renumber anything
+    make_app()
+    with app.app_context():
+        assert db.session.scalars(db.text('SELECT change_seq FROM notes ORDER BY id')).all() == [1, 2, 3]
+
+
+def test_upgrade_creates_indexes_of_added_columns(tmp_path, make_app):
+    _baseline_database(tmp_path, 1)
+
+    app = make_app()
+
+    with app.app_context():
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('notes')}
+    assert {'ix_notes_change_seq', 'ix_notes_deleted_at'} <= indexes
+
+
+def test_long_poll_answers_at_once_when_no_wait_slot_is_free(client, monkeypatch):
+    from app.api.endpoints import notes
+
+    monkeypatch.setattr(notes.change_feed, '_waiters', threading.BoundedSemaphore(1))
+    notes.change_feed._waiters.acquire()
+
+    start = time.monotonic()
+    response = client.get('/api/notes/changes?since=0&wait=10')
+
+    assert time.monotonic() - start < 2
+    assert response.status_code == 200
+    assert response.get_json()['data'] == []
+    assert response.headers['Retry-After'] == '10'
+
+
+def test_long_poll_returns_when_a_note_changes(app, client, monkeypatch):
+    from app.api.endpoints import notes
+
+    monkeypatch.setattr(notes.change_feed, '_waiters', threading.BoundedSemaphore(1))
+    monkeypatch.setattr(notes.change_feed, 'poll_interval', 0.05)
+
+    def create_later():
+        time.sleep(0.3)
+        app.test_client().post('/api/notes', json={'title': 'New', 'content': 'Body'})
+
+    writer = threading.Thread(target=create_later)
+    writer.start()
+    response = client.get('/api/notes/changes?since=0&wait=10')
+    writer.join()
+
+    body = response.get_json()
+    assert [change['title'] for change in body['data']] == ['New']
+    assert 'Retry-After' not in response.headers
+
+
+def _changes(client, since, limit=None):
+    response = client.get(f'/api/notes/changes?since={since}' + (f'&limit={limit}' if limit else ''))
+    return response.status_code, response.get_json()
+
+
+def test_changes_are_paged_in_change_order(client):
+    for i in range(1, 6):
+        client.post('/api/notes', json={'title': f'Note {i}', 'content': 'Body'})
+    client.put('/api/notes/2', json={'content': 'Edited'})
+
+    titles, since, has_more = [], 0, True
+    while has_more:
+        status, body = _changes(client, since, limit=2)
+        assert status == 200
+        titles.append([change['title'] for change in body['data']])
+        since, has_more = body['next_since'], body['has_more']
+
+    # Note 2 moved to the end when it was edited
+    assert titles == [['Note 1', 'Note 3'], ['Note 4', 'Note 5'], ['Note 2']]
+    status, body = _changes(client, since)
+    assert body['data'] == [] and body['next_since'] == since and not body['has_more']
+
+
+def test_deleted_notes_come_back_as_tombstones(client):
+    client.post('/api/notes', json={'title': 'Note', 'content': 'Body'})
+    since = _changes(client, 0)[1]['next_since']
+
+    client.delete('/api/notes/1')
+
+    status, body = _changes(client, since)
+    assert [(change['id'], change['deleted']) for change in body['data']] == [(1, True)]
+    assert 'content' not in body['data'][0]
+    assert client.get('/api/notes').get_json()['count'] == 0
+
+
+def test_cursor_older_than_purged_tombstones_expires(app, client, monkeypatch):
+    from app.core.config import Config
+
+    for i in range(1, 4):
+        client.post('/api/notes', json={'title': f'Note {i}', 'content': 'Body'})
+    old_cursor = _changes(client, 0)[1]['next_since']
+    client.delete('/api/notes/1')
+    tombstone_seq = _changes(client, old_cursor)[1]['next_since']
+
+    monkeypatch.setattr(Config, 'NOTE_TOMBSTONE_RETENTION_DAYS', 0)
+    result = app.test_cli_runner().invoke(args=['purge-tombstones'])
+    assert 'Purged 1 tombstone' in result.output
+
+    status, body = _changes(client, old_cursor)
+    assert status == 410
+    assert body['purged_through'] == tombstone_seq
+    # A full resync no longer sees the purged note; cursors past the purge still work
+    assert [change['id'] for change in _changes(client, 0)[1]['data']] == [2, 3]
+    assert _changes(client, tombstone_seq)[0] == 200
@@ -0,0 +1,114 @@
+import pytest
+
+from app.services.note_revisions import InvalidEdit, apply_ops
+
+
+def _create_note(client, content):
+    response = client.post('/api/notes', json={'title': 'Note', 'content': content})
+    assert response.status_code == 201
+    return response.get_json()['data']
+
+
+def _patch(client, note_id, base_version, ops, **extra):
+    return client.patch(f'/api/notes/{note_id}', json={'base_version': base_version, 'ops': ops, **extra})
+
+
+@pytest.mark.parametrize('ops', [
+    [[0, 3, 'x'], [2, 4, 'y']],  # overlapping
+    [[5, 4, 'x']],  # end before start
+    [[0, 99, 'x']],  # past the end
+    [[-1, 0, 'x']],
+])
+def test_patch_rejects_invalid_ops(client, ops):
+    note = _create_note(client, 'hello world')
+
+    response = _patch(client, note['id'], note['version'], ops)
+
+    assert response.status_code == 400
+    assert client.get(f"/api/notes/{note['id']}").get_json()['data']['content'] == 'hello world'
+
+
+def test_patch_on_a_stale_version_conflicts(client):
+    note = _create_note(client, 'hello world')
+    assert _patch(client, note['id'], note['version'], [[0, 5, 'HELLO']]).status_code == 200
+
+    response = _patch(client, note['id'], note['version'], [[6, 11, 'there']])
+
+    assert response.status_code == 409
+    assert response.get_json()['current_version'] == note['version'] + 1
+    assert client.get(f"/api/notes/{note['id']}").get_json()['data']['content'] == 'HELLO world'
+
+
+def test_revisions_are_rebuilt_across_snapshots(client, monkeypatch):
+    from app.api.endpoints.notes import revision_service
+
+    monkeypatch.setattr(revision_service, 'snapshot_interval', 3)
+    content = 'line\n' * 20
+    note = _create_note(client, content)
+    expected = {note['version']: content}
+
+    version = note['version']
+    for i in range(7):
+        ops = [[i * 5, i * 5 + 4, f'edit {i}']]
+        content, _ = apply_ops(content, ops)
+        response = _patch(client, note['id'], version, ops)
+        assert response.status_code == 200
+        version = response.get_json()['data']['version']
+        expected[version] = content
+
+    history = client.get(f"/api/notes/{note['id']}/revisions").get_json()['data']
+    assert [revision['kind'] for revision in reversed(history)] == \
+        ['snapshot', 'delta', 'delta', 'snapshot', 'delta', 'delta', 'snapshot', 'delta']
+    for version, content in expected.items():
+        revision = client.get(f"/api/notes/{note['id']}/revisions/{version}").get_json()['data']
+        assert revision['content'] == content
+
+
+def test_put_stores_a_diff_of_the_full_content(client):
+    original = 'The quick brown fox jumps over the lazy dog. ' * 10
+    note = _create_note(client, original)
+    updated = original.replace('lazy', 'sleepy', 1)
+
+    response = client.put(f"/api/notes/{note['id']}", json={'content': updated})
+
+    assert response.status_code == 200
+    history = client.get(f"/api/notes/{note['id']}/revisions").get_json()['data']
+    assert history[0]['kind'] == 'delta'
+    assert client.get(f"/api/notes/{note['id']}/revisions/{note['version']}").get_json()['data']['content'] == original
+    assert client.get(f"/api/notes/{note['id']}/revisions/{note['version'] + 1}").get_json()['data']['content'] \
+        == updated
+
+
+def test_patch_offsets_can_count_utf16_code_units(client):
+    note = _create_note(client, 'a\U0001F600b')
+
+    # JavaScript: 'a😀b'.indexOf('b') == 3
+    assert _patch(client, note['id'], note['version'], [[3, 4, 'c']], offset_unit='utf-16').status_code == 200
+    assert client.get(f"/api/notes/{note['id']}").get_json()['data']['content'] == 'a\U0001F600c'
+
+
+def test_utf16_offsets_inside_a_surrogate_pair_are_rejected():
+    with pytest.raises(InvalidEdit):
+        apply_ops('a\U0001F600b', [[2, 2, 'x']], offset_unit='utf-16')
+
+
+def test_patch_appends_without_a_base_version(client):
+    note = _create_note(client, 'first')
+
+    responses = [
+        client.patch(f"/api/notes/{note['id']}", json={'append': 'second'}),
+        client.patch(f"/api/notes/{note['id']}", json={'append': 'third', 'separator': ' | '}),
+    ]
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[-1].get_json()['data']['version'] == note['version'] + 2
+    assert client.get(f"/api/notes/{note['id']}").get_json()['data']['content'] == 'first\n\nsecond | third'
+    assert client.get(f"/api/notes/{note['id']}/revisions/{note['version'] + 1}").get_json()['data']['content'] \
+        == 'first\n\nsecond'
+
+
+def test_patch_append_checks_a_base_version_when_given(client):
+    note = _create_note(client, 'first')
+
+    assert _patch(client, note['id'], note['version'] + 1, [], append='x').status_code == 409
+    assert client.patch(f"/api/notes/{note['id']}", json={'append': 'x', 'ops': []}).status_code == 400
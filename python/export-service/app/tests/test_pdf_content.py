@@ -0,0 +1,95 @@
+import io
+
+from pypdf import PdfReader
+from reportlab.platypus import Paragraph, Preformatted, SimpleDocTemplate, Spacer
+
+from app.services.pdf_content import MAX_BLOCK_LINES, content_flowables, inline_markup, plain_markup
+from app.services.pdf_themes import get_theme
+
+THEME = get_theme()
+
+
+def _paragraphs(flowables):
+    return [flowable for flowable in flowables if isinstance(flowable, Paragraph)]
+
+
+def _render(flowables):
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, **THEME.document_kwargs()).build(flowables)
+    return PdfReader(io.BytesIO(buffer.getvalue()))
+
+
+def test_inline_markup():
+    assert inline_markup('**bold** and __bold__') == '<b>bold</b> and <b>bold</b>'
+    assert inline_markup('*italic* and _italic_') == '<i>italic</i> and <i>italic</i>'
+    assert inline_markup('call `f(**kwargs)`') == 'call <font face="Courier">f(**kwargs)</font>'
+    # Underscores inside words and lone asterisks are left alone
+    assert inline_markup('snake_case_name 2 * 3') == 'snake_case_name 2 * 3'
+
+
+def test_markup_is_escaped():
+    assert plain_markup('a < b & c > d') == 'a &lt; b &amp; c &gt; d'
+    assert inline_markup('**<b>** & `<i>`') == \
+        '<b>&lt;b&gt;</b> &amp; <font face="Courier">&lt;i&gt;</font>'
+
+
+def test_code_fences_are_kept_verbatim():
+    flowables = content_flowables('before\n```\nif a < b:\n    **x**\n```\nafter', THEME)
+
+    code = [flowable for flowable in flowables if isinstance(flowable, Preformatted)]
+    assert len(code) == 1
+    assert code[0].lines == ['if a < b:', '    **x**']
+    assert [paragraph.text for paragraph in _paragraphs(flowables)] == ['before', 'after']
+
+
+def test_unterminated_code_fence_is_not_dropped():
+    flowables = content_flowables('~~~\nleft open', THEME)
+
+    assert isinstance(flowables[-1], Preformatted)
+    assert flowables[-1].lines == ['left open']
+
+
+def test_lists_and_headings():
+    content = '# Title\n- one\n  * nested\n1. first\n2) second'
+
+    paragraphs = _paragraphs(content_flowables(content, THEME))
+
+    assert [paragraph.text for paragraph in paragraphs] == ['Title', 'one', 'nested', 'first', 'second']
+    assert paragraphs[0].style is THEME.content_heading_style
+    assert [paragraph.bulletText for paragraph in paragraphs[1:]] == ['•', '•', '1.', '2.']
+    assert paragraphs[1].style is THEME.list_styles[0]
+    assert paragraphs[2].style is THEME.list_styles[1]
+
+
+def test_paragraph_lines_are_joined_unless_hard_broken():
+    flowables = content_flowables('one\ntwo  \nthree\\\nfour\n\n\nnext', THEME)
+
+    assert [paragraph.text for paragraph in _paragraphs(flowables)] == ['one two<br/>three<br/>four', 'next']
+    assert sum(isinstance(flowable, Spacer) for flowable in flowables) == 1
+
+
+def test_long_blocks_are_split():
+    flowables = content_flowables('\n'.join(['line'] * (MAX_BLOCK_LINES + 1)), THEME)
+
+    paragraphs = _paragraphs(flowables)
+    assert len(paragraphs) == 2
+    assert paragraphs[0].style is THEME.content_continued_style
+    assert paragraphs[1].style is THEME.content_style
+
+
+def test_flowables_render():
+    content = (
+        '# Heading with <tags> & ampersands\n'
+        'Text with **bold**, *italic*, `code` and a stray </para> tag\n'
+        '- item with <b>\n'
+        '  - nested & item\n'
+        '1. ordered > item\n'
+        '```\n<xml attr="1">&amp;</xml>\n```\n'
+    )
+
+    reader = _render(content_flowables(content, THEME))
+
+    text = ''.join(page.extract_text() for page in reader.pages)
+    for expected in ('Heading with <tags> & ampersands', 'a stray </para> tag', 'item with <b>',
+                     'nested & item', 'ordered > item', '<xml attr="1">&amp;</xml>'):
+        assert expected in text
@@ -0,0 +1,59 @@
+import io
+from datetime import datetime
+
+from pypdf import PdfReader
+
+from app.services.export_service import _NoteRow, _render_part
+from app.services.pdf_merge import PdfStitcher
+
+
+def _part(first_idx, count):
+    now = datetime(2024, 5, 1, 9, 30)
+    rows = [
+        _NoteRow(i, f'Note {i} ünï', f'Line one of {i}\n\n- a list item', now, now)
+        for i in range(first_idx, first_idx + count)
+    ]
+    return _render_part(('default', first_idx, rows, first_idx == 1, True))
+
+
+def _stitch(parts, **kwargs):
+    target = io.BytesIO()
+    stitcher = PdfStitcher(target, **kwargs)
+    for data, note_pages in parts:
+        stitcher.append(data, note_pages)
+    stitcher.close()
+    return PdfReader(io.BytesIO(target.getvalue()), strict=True)
+
+
+def test_stitched_pages_keep_their_order_and_outline():
+    reader = _stitch([_part(1, 3), _part(4, 2)])
+
+    assert len(reader.pages) == 5
+    assert [item.title for item in reader.outline] == [f'{i}. Note {i} ünï' for i in range(1, 6)]
+    assert [reader.get_destination_page_number(item) for item in reader.outline] == [0, 1, 2, 3, 4]
+    assert 'Notes Export' in reader.pages[0].extract_text()
+    assert reader.pages[3].extract_text().split('\n')[:2] == ['Note 4 ünï', '4.']
+
+
+def test_shared_resources_are_written_once():
+    parts = [_part(1, 2), _part(3, 2), _part(5, 2)]
+
+    plain = _stitch(parts)
+    shared = _stitch(parts, share_resources=True)
+
+    def fonts(reader):
+        return {
+            page['/Resources']['/Font'].get_object().raw_get('/F1').idnum for page in reader.pages
+        }
+
+    assert len(fonts(plain)) == 3
+    assert len(fonts(shared)) == 1
+    assert [page.extract_text() for page in shared.pages] == [page.extract_text() for page in plain.pages]
+
+
+def test_without_bookmarks_there_is_no_outline():
+    data, _ = _part(1, 2)
+    reader = _stitch([(data, [])])
+
+    assert len(reader.pages) == 2
+    assert '/Outlines' not in reader.trailer['/Root']
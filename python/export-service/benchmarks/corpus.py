@@ -0,0 +1,81 @@
+"""Deterministic synthetic note corpora for the export-service benchmarks."""
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert
+
+# (label, share of notes, content lines range)
+CONTENT_PROFILES = (
+    ('small', 0.6, (1, 8)),
+    ('medium', 0.3, (20, 80)),
+    ('large', 0.1, (300, 800)),
+)
+
+_WORDS = (
+    'meeting notes action item follow up draft review budget roadmap design '
+    'release customer feedback summary idea research question answer decision '
+    'deadline priority owner status blocked done todo next week sprint'
+).split()
+
+
+def _line(rng):
+    return ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(6, 16))).capitalize() + '.'
+
+
+def _content(rng):
+    roll = rng.random()
+    for _, share, (low, high) in CONTENT_PROFILES:
+        if roll < share:
+            break
+        roll -= share
+    lines = []
+    for _ in range(rng.randint(low, high)):
+        # Mostly prose, with the occasional blank line and list item
+        kind = rng.random()
+        if kind < 0.1:
+            lines.append('')
+        elif kind < 0.2:
+            lines.append(f'- {_line(rng)}')
+        else:
+            lines.append(_line(rng))
+    return '\n'.join(lines)
+
+
+def generate_rows(count, seed=0):
+    """Yield ``count`` note rows as dicts; the same ``seed`` always gives the same corpus."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        created = start + timedelta(minutes=i * 7)
+        yield {
+            'title': f'{rng.choice(_WORDS).capitalize()} {rng.choice(_WORDS)} #{i}',
+            'content': _content(rng),
+            'created_at': created,
+            'updated_at': created + timedelta(minutes=rng.randint(0, 600)),
+        }
+
+
+def seed_database(app, db, note_model, count, seed=0, batch_size=2000):
+    """Insert a corpus of ``count`` notes unless the database already holds exactly that many."""
+    with app.app_context():
+        existing = db.session.query(note_model).count()
+        if existing == count:
+            return False
+        if existing:
+            db.session.query(note_model).delete()
+
+        batch = []
+        for row in generate_rows(count, seed):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                db.session.execute(insert(note_model), batch)
+                batch.clear()
+        if batch:
+            db.session.execute(insert(note_model), batch)
+        db.session.commit()
+        return True
+
+
+def corpus_path(data_dir, count, seed):
+    return Path(data_dir) / f'corpus_{count}_{seed}.db'
@@ -0,0 +1,91 @@
+"""Compare export formats on the same synthetic corpus.
+
+Seeds a temporary SQLite database, then times ``POST /api/export/all`` and
+a single-note export for every format through the Flask test client and
+reports latency and output size relative to PDF.
+
+Usage (from python/export-service)::
+
+    python -m benchmarks.export_formats_benchmark --notes 500 --lines 40
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+
+def timed(client, path, payload, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.post(path, json=payload)
+        size = len(response.get_data())
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_data()[:200]
+    return statistics.median(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--notes', type=int, default=500)
+    parser.add_argument('--lines', type=int, default=40, help='content lines per note')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    # Set before the app is imported: the export service reads Config when
+    # its module loads, not the app config
+    os.environ['EXPORT_FRAGMENT_CACHE'] = 'false'
+    os.environ['EXPORT_PERSIST'] = 'false'
+    from app.core.config import Config
+    from app.core.database import db
+    from app.models.note import Note
+    from app.services import EXPORT_FORMATS
+    from main import create_app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchmarkConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp}/bench.db'
+
+        app = create_app(BenchmarkConfig)
+        with app.app_context():
+            line = 'The quick brown fox jumps over the lazy dog. ' * 2
+            db.session.add_all([
+                Note(title=f'Note {i}', content='\n'.join([line] * args.lines))
+                for i in range(args.notes)
+            ])
+            db.session.commit()
+            note_id = db.session.scalars(db.select(Note.id).limit(1)).one()
+
+        client = app.test_client()
+        results = {}
+        from app.api.endpoints.export import export_service
+        assert export_service.fragment_cache is None
+
+        for export_format in EXPORT_FORMATS:
+            bulk_s, bulk_bytes = timed(client, '/api/export/all', {'format': export_format}, args.repeat)
+            single_s, single_bytes = timed(
+                client, f'/api/export/note/{note_id}', {'format': export_format}, args.repeat
+            )
+            results[export_format] = {
+                'bulk_ms': round(bulk_s * 1000, 1),
+                'bulk_bytes': bulk_bytes,
+                'single_ms': round(single_s * 1000, 2),
+                'single_bytes': single_bytes,
+            }
+
+    pdf_ms = results['pdf']['bulk_ms']
+    for export_format, result in results.items():
+        result['bulk_speedup_vs_pdf'] = round(pdf_ms / result['bulk_ms'], 1)
+        print(f'{export_format}: {json.dumps(result)}')
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
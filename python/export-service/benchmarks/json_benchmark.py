@@ -0,0 +1,89 @@
+"""Compare JSON serialization paths for the note list.
+
+Seeds a temporary SQLite database with a synthetic corpus (see
+``benchmarks/corpus.py``) and times, for each JSON provider:
+
+* ``orm_to_dict`` loading ORM ``Note`` objects and ``to_dict()`` per note (the old list path)
+* ``rows``        ``Note.list_rows()`` rows as :class:`NoteListItem` (the current list path)
+* ``endpoint``    ``GET /api/notes`` end to end through the Flask test client
+
+Usage (from python/export-service)::
+
+    python -m benchmarks.json_benchmark --notes 10000 --output json.json
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.core.config import Config
+from app.core.database import db, read_rows
+from app.models.note import Note, NoteListItem
+from benchmarks.corpus import seed_database
+from main import create_app
+
+
+def orm_to_dict(app):
+    notes = db.session.scalars(Note.live().order_by(Note.updated_at.desc())).all()
+    return app.json.response({'success': True, 'data': [note.to_dict() for note in notes]})
+
+
+def rows(app):
+    notes = [NoteListItem(*row) for row in read_rows(Note.list_rows().order_by(Note.updated_at.desc()))]
+    return app.json.response({'success': True, 'data': notes})
+
+
+def timed(fn, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        response = fn()
+        size = len(response.get_data())
+        timings.append(time.perf_counter() - start)
+    return {'p50_ms': round(statistics.median(timings) * 1000, 1), 'bytes': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--notes', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for provider in ('stdlib', 'orjson'):
+            class BenchmarkConfig(Config):
+                SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp}/bench.db'
+                JSON_PROVIDER = provider
+
+            app = create_app(BenchmarkConfig)
+            seed_database(app, db, Note, args.notes, args.seed)
+            client = app.test_client()
+            with app.app_context():
+                results[provider] = {
+                    'orm_to_dict': timed(lambda: orm_to_dict(app), args.repeat),
+                    'rows': timed(lambda: rows(app), args.repeat),
+                    'endpoint': timed(lambda: client.get('/api/notes'), args.repeat),
+                }
+                db.session.remove()
+                for engine in db.engines.values():
+                    engine.dispose()
+
+    baseline = results['stdlib']['orm_to_dict']['p50_ms']
+    for provider, paths in results.items():
+        for path, result in paths.items():
+            result['speedup_vs_old'] = round(baseline / result['p50_ms'], 2)
+            print(f'{provider:<7} {path:<12} {json.dumps(result)}')
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Throughput benchmark: Flask dev server vs. the gunicorn production mode.
+
+Starts the export-service as a real HTTP server in each mode, seeds a few
+notes, then drives a mix of note reads and single-note PDF exports from
+concurrent clients and reports throughput and latency per mode.
+
+Usage (from python/export-service)::
+
+    python -m benchmarks.serving_benchmark --clients 16 --requests 400
+"""
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+MODES = {
+    'dev': [sys.executable, 'main.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+}
+
+
+def request(base_url, method, path, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(
+        base_url + path, data=data, method=method,
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(req, timeout=120) as response:
+        return response.status, response.read()
+
+
+def wait_until_healthy(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if request(base_url, 'GET', '/health')[0] == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server at {base_url} did not become healthy')
+
+
+def start_server(mode, port, workdir, workers):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f'sqlite:///{workdir}/{mode}.db',
+        WEB_BIND=f'127.0.0.1:{port}',
+        WEB_CONCURRENCY=str(workers),
+    )
+    return subprocess.Popen(
+        MODES[mode], cwd=SERVICE_DIR, env=env, start_new_session=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(process):
+    # SIGTERM the whole group: the dev server's reloader runs a child process
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def run(base_url, note_ids, total_requests, clients, export_ratio):
+    latencies = []
+    errors = 0
+
+    def one_request(i):
+        note_id = note_ids[i % len(note_ids)]
+        start = time.perf_counter()
+        try:
+            if (i % 100) < export_ratio * 100:
+                request(base_url, 'POST', f'/api/export/note/{note_id}')
+            else:
+                request(base_url, 'GET', '/api/notes')
+            ok = True
+        except OSError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for elapsed, ok in pool.map(one_request, range(total_requests)):
+            latencies.append(elapsed)
+            errors += not ok
+    wall_time = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': total_requests,
+        'clients': clients,
+        'wall_time_s': round(wall_time, 3),
+        'throughput_rps': round(total_requests / wall_time, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--export-ratio', type=float, default=0.5)
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=sorted(MODES))
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    base_url = f'http://127.0.0.1:{args.port}'
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            process = start_server(mode, args.port, tmp, args.workers)
+            try:
+                wait_until_healthy(base_url)
+                note_ids = []
+                for i in range(20):
+                    _, body = request(base_url, 'POST', '/api/notes', {
+                        'title': f'Benchmark note {i}',
+                        'content': '\n'.join(f'Line {n} of note {i}' for n in range(200)),
+                    })
+                    note_ids.append(json.loads(body)['data']['id'])
+                results[mode] = run(base_url, note_ids, args.requests, args.clients, args.export_ratio)
+            finally:
+                stop_server(process)
+            print(f'{mode}: {json.dumps(results[mode])}')
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Check that stitching a multi-part PDF export runs in flat memory.
+
+Renders one part of ``--part-notes`` synthetic notes, then stitches it
+``N`` times into a temporary file for each ``--parts`` count, each run in a
+fresh process so its peak RSS is its own. With ``--writer stitcher`` (what
+exports use) peak RSS must not grow by more than ``--max-growth-mb`` from
+the smallest to the largest run, otherwise the script exits with status 1.
+``--writer pypdf`` runs the same with ``pypdf.PdfWriter`` for comparison.
+
+Usage (from python/export-service)::
+
+    python -m benchmarks.stitch_memory --parts 20 200
+    python -m benchmarks.stitch_memory --parts 20 200 --writer pypdf
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _run(parts, args, queue):
+    # Runs in a child process
+    sys.path.insert(0, str(SERVICE_DIR))
+    from app.services.export_service import _NoteRow, _render_part
+    from app.services.pdf_merge import PdfStitcher
+    from benchmarks.corpus import generate_rows
+
+    rows = [
+        _NoteRow(i, row['title'], row['content'], row['created_at'], row['updated_at'])
+        for i, row in enumerate(generate_rows(args.part_notes, args.seed), 1)
+    ]
+    data, note_pages = _render_part(('default', 1, rows, True, True))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as target:
+        if args.writer == 'stitcher':
+            stitcher = PdfStitcher(target)
+            for _ in range(parts):
+                stitcher.append(data, note_pages)
+            stitcher.close()
+        else:
+            from pypdf import PdfReader, PdfWriter
+            writer = PdfWriter()
+            for _ in range(parts):
+                offset = len(writer.pages)
+                writer.append(PdfReader(io.BytesIO(data)), import_outline=False)
+                for title, page_index in note_pages:
+                    writer.add_outline_item(title, offset + page_index)
+            writer.write(target)
+        size = target.tell()
+
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({
+        'parts': parts,
+        'notes': parts * args.part_notes,
+        'pdf_mb': round(size / 1024 / 1024, 1),
+        'wall_time_s': round(time.perf_counter() - start, 2),
+        'peak_rss_mb': round(peak_rss_kb / 1024, 1),
+        'rss_growth_mb': round((peak_rss_kb - rss_before) / 1024, 1),
+    })
+
+
+def run(parts, args):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run, args=(parts, args, queue))
+    process.start()
+    try:
+        return queue.get(timeout=args.timeout)
+    finally:
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--parts', type=int, nargs='+', default=[20, 200])
+    parser.add_argument('--part-notes', type=int, default=50, help='notes per part (EXPORT_PARALLEL_CHUNK_SIZE)')
+    parser.add_argument('--writer', choices=('stitcher', 'pypdf'), default='stitcher')
+    parser.add_argument('--max-growth-mb', type=float, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=1800)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    results = []
+    for parts in sorted(args.parts):
+        result = run(parts, args)
+        results.append(result)
+        print(f'{args.writer:<8} {json.dumps(result)}')
+
+    growth = results[-1]['peak_rss_mb'] - results[0]['peak_rss_mb']
+    print(f'peak RSS growth from {results[0]["notes"]} to {results[-1]["notes"]} notes: {growth:.1f} MB')
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'writer': args.writer, 'results': results}, indent=2))
+
+    if args.writer == 'stitcher' and growth > args.max_growth_mb:
+        print(f'FAIL: more than {args.max_growth_mb} MB', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""Export-service benchmark suite.
+
+Seeds SQLite databases with synthetic corpora (see ``benchmarks/corpus.py``)
+and measures, through the Flask test client:
+
+* ``list_notes``    GET /api/notes
+* ``get_note``      GET /api/notes/<id>
+* ``export_single`` POST /api/export/note/<id> (PDF)
+* ``export_bulk``   POST /api/export/notes (PDF) for up to ``--bulk-max-notes`` notes
+* ``export_bulk_compact`` the same with ``compact`` on; compare ``mean_response_bytes``
+
+Each scenario runs in a fresh process so its peak RSS is its own. Results,
+with the git commit and settings, are written as JSON so runs can be
+compared across commits with ``--compare``.
+
+Services read their settings from the environment when the app is
+imported, so ``--fragment-cache on|off`` is passed to each scenario process
+as ``EXPORT_FRAGMENT_CACHE``; ``default`` leaves the environment alone and
+``both`` runs every scenario twice, suffixing ``+fragment_cache`` to the
+cached run. Each scenario process gets an empty cache, so its first export
+is cold; use ``--bulk-iterations`` above 1 to see warm ones. Every result
+records whether the cache was actually on.
+
+Usage (from python/export-service)::
+
+    python -m benchmarks.suite --sizes 1000 10000 --output bench.json
+    python -m benchmarks.suite --sizes 1000 --compare bench.json
+    python -m benchmarks.suite --sizes 1000 --scenarios export_bulk --fragment-cache both --bulk-iterations 3
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = ('list_notes', 'get_note', 'export_single', 'export_bulk', 'export_bulk_compact')
+
+# --fragment-cache choice -> EXPORT_FRAGMENT_CACHE of each run (None: as configured)
+FRAGMENT_CACHE_RUNS = {'default': (None,), 'on': ('true',), 'off': ('false',), 'both': ('false', 'true')}
+
+
+def _make_app(db_path):
+    from app.core.config import Config
+    from main import create_app
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+
+    return create_app(BenchmarkConfig)
+
+
+def _requests_for(scenario, note_ids, args, rng):
+    if scenario == 'list_notes':
+        return [('get', '/api/notes', None)] * args.list_iterations
+    if scenario == 'get_note':
+        return [('get', f'/api/notes/{rng.choice(note_ids)}', None) for _ in range(args.iterations)]
+    if scenario == 'export_single':
+        return [('post', f'/api/export/note/{rng.choice(note_ids)}', None) for _ in range(args.iterations)]
+    bulk_ids = note_ids[:args.bulk_max_notes]
+    payload = {'note_ids': bulk_ids, 'compact': scenario == 'export_bulk_compact'}
+    return [('post', '/api/export/notes', payload)] * args.bulk_iterations
+
+
+def _run_scenario(db_path, scenario, fragment_cache, args, queue):
+    # Runs in a child process. Set before the app is imported: the export
+    # service reads Config when its module loads, not the app config
+    os.environ['EXPORT_PERSIST'] = 'false'
+    if fragment_cache is not None:
+        os.environ['EXPORT_FRAGMENT_CACHE'] = fragment_cache
+    cache_dir = tempfile.TemporaryDirectory()
+    os.environ['EXPORT_FRAGMENT_CACHE_DIR'] = cache_dir.name
+
+    sys.path.insert(0, str(SERVICE_DIR))
+    from app.api.endpoints.export import export_service
+    from app.core.database import db
+    from app.models.note import Note
+
+    app = _make_app(db_path)
+    with app.app_context():
+        note_ids = [row[0] for row in db.session.query(Note.id).order_by(Note.id)]
+    client = app.test_client()
+    rng = random.Random(args.seed)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    latencies = []
+    response_bytes = 0
+    start = time.perf_counter()
+    for method, path, payload in _requests_for(scenario, note_ids, args, rng):
+        t0 = time.perf_counter()
+        response = getattr(client, method)(path, json=payload)
+        body = response.get_data()
+        latencies.append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            raise RuntimeError(f'{scenario}: {path} returned {response.status_code}: {body[:200]!r}')
+        response_bytes += len(body)
+    wall_time = time.perf_counter() - start
+
+    latencies.sort()
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({
+        'requests': len(latencies),
+        'wall_time_s': round(wall_time, 4),
+        'throughput_rps': round(len(latencies) / wall_time, 2),
+        'p50_ms': round(statistics.median(latencies) * 1000, 3),
+        'p95_ms': round(latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+        'mean_response_bytes': response_bytes // len(latencies),
+        'peak_rss_mb': round(peak_rss_kb / 1024, 1),
+        'rss_growth_mb': round((peak_rss_kb - rss_before) / 1024, 1),
+        'fragment_cache': export_service.fragment_cache is not None,
+    })
+    cache_dir.cleanup()
+
+
+def run_scenario(db_path, scenario, fragment_cache, args):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_scenario, args=(str(db_path), scenario, fragment_cache, args, queue))
+    process.start()
+    try:
+        result = queue.get(timeout=args.timeout)
+    finally:
+        process.join()
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVICE_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())['results']
+    print(f'\nCompared with {baseline_path}:')
+    for size, scenarios in results.items():
+        for scenario, result in scenarios.items():
+            before = baseline.get(size, {}).get(scenario)
+            if not before:
+                continue
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+            rss = result['peak_rss_mb'] - before['peak_rss_mb']
+            print(f'  {size:>7} {scenario:<14} p50 {before["p50_ms"]:>10.2f} -> {result["p50_ms"]:>10.2f} ms '
+                  f'({change:+.1f}%)  peak RSS {rss:+.1f} MB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=50, help='requests for per-note scenarios')
+    parser.add_argument('--list-iterations', type=int, default=5)
+    parser.add_argument('--bulk-iterations', type=int, default=1)
+    parser.add_argument('--bulk-max-notes', type=int, default=1000)
+    parser.add_argument('--fragment-cache', choices=FRAGMENT_CACHE_RUNS, default='default',
+                        help='PDF fragment cache: as configured, on, off, or each scenario with it off and on')
+    parser.add_argument('--data-dir', default=str(SERVICE_DIR / 'benchmarks' / 'data'),
+                        help='where seeded corpora are kept between runs')
+    parser.add_argument('--timeout', type=int, default=3600, help='seconds per scenario')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(SERVICE_DIR))
+    from app.core.database import db
+    from app.models.note import Note
+    from benchmarks.corpus import corpus_path, seed_database
+
+    Path(args.data_dir).mkdir(parents=True, exist_ok=True)
+    results = {}
+    for size in args.sizes:
+        db_path = corpus_path(args.data_dir, size, args.seed)
+        start = time.perf_counter()
+        if seed_database(_make_app(db_path), db, Note, size, args.seed):
+            print(f'seeded {size} notes in {time.perf_counter() - start:.1f}s')
+
+        results[str(size)] = {}
+        for scenario in args.scenarios:
+            for fragment_cache in FRAGMENT_CACHE_RUNS[args.fragment_cache]:
+                name = scenario + ('+fragment_cache' if args.fragment_cache == 'both' and fragment_cache == 'true' else '')
+                result = run_scenario(db_path, scenario, fragment_cache, args)
+                results[str(size)][name] = result
+                print(f'{size:>7} {name:<14} {json.dumps(result)}')
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+from app.core.config import Config
+
+bind = Config.WEB_BIND
+# Each worker can have, on top of its request threads:
+#   EXPORT_JOB_WORKERS job threads rendering background exports, and
+#   EXPORT_PARALLEL_WORKERS render processes for large exports.
+# So up to workers * (1 + EXPORT_PARALLEL_WORKERS) processes compete for
+# the CPUs. EXPORT_PARALLEL_WORKERS defaults to cpu_count // workers to keep
+# that near the CPU count; raise it only together with fewer workers (e.g.
+# WEB_CONCURRENCY=2 EXPORT_PARALLEL_WORKERS=4 on 8 cores for an
+# export-heavy deployment).
+workers = Config.WEB_CONCURRENCY
+threads = Config.WEB_THREADS
+# Threaded workers, so a change-feed long-poll (capped at
+# NOTE_CHANGES_MAX_WAITERS per worker) parks a thread, not the whole worker
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = Config.WEB_GRACEFUL_TIMEOUT
+keepalive = Config.WEB_KEEPALIVE
+
+# Recycle workers periodically so memory held by large PDF builds is returned
+max_requests = Config.WEB_MAX_REQUESTS
+max_requests_jitter = Config.WEB_MAX_REQUESTS_JITTER
+
+# Import the app once in the master so workers share its memory copy-on-write
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections opened in the master while preloading (create_all) must not
+    # be shared across processes; give each worker a fresh pool.
+    from wsgi import app
+    from app.core.database import db
+    from app.api.endpoints.export import export_job_service
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+        # A worker replacing one that crashed fails the export jobs it left
+        export_job_service.fail_orphaned()
@@ -1,8 +1,11 @@
-from flask import Flask, send_from_directory
+from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 from app.core.config import Config
-from app.core.database import db
+from app.core.database import add_missing_columns, db, init_db
+from app.core.json_provider import init_json
 from app.api.endpoints import notes_bp, export_bp
+from app.api.endpoints.export import export_job_service
+from app.services import ExportService, NoteChangeFeed
 
 
 def create_app(config_class=Config):
@@ -10,8 +13,10 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
 
     # Initialize extensions
-    db.init_app(app)
-    CORS(app)  # Enable CORS for frontend
+    init_db(app)
+    init_json(app)
+    # Enable CORS for frontend; let it read the export size/time headers
+    CORS(app, expose_headers=['X-Export-Size', 'X-Export-Build-Time', 'X-Export-Compact'])
 
     # Register blueprints
     app.register_blueprint(notes_bp, url_prefix='/api/notes')
@@ -22,13 +27,35 @@ def create_app(config_class=Config):
     def index():
         return send_from_directory(app.static_folder, 'index.html')
 
+    # Liveness/readiness probe; deliberately does not touch the database
+    @app.route('/health')
+    def health_check():
+        return jsonify({'status': 'healthy'}), 200
+
+    # Prune persisted exports, e.g. from cron: flask --app wsgi cleanup-exports
+    @app.cli.command('cleanup-exports')
+    def cleanup_exports():
+        removed = ExportService().cleanup_exports()
+        print(f'Removed {removed} expired export(s) from {Config.EXPORT_DIR}')
+
+    # Drop tombstones of long-deleted notes: flask --app wsgi purge-tombstones
+    @app.cli.command('purge-tombstones')
+    def purge_tombstones():
+        removed = NoteChangeFeed().purge_tombstones()
+        db.session.commit()
+        print(f'Purged {removed} tombstone(s) older than {Config.NOTE_TOMBSTONE_RETENTION_DAYS} days')
+
     # Create database tables
     with app.app_context():
         db.create_all()
+        add_missing_columns()
+        NoteChangeFeed().init_counters()
+        export_job_service.fail_orphaned()
 
     return app
 
 
 if __name__ == '__main__':
     app = create_app()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    host, port = Config.WEB_BIND.rsplit(':', 1)
+    app.run(debug=True, host=host, port=int(port))